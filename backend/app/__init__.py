@@ -8,7 +8,10 @@ from flask_cors import CORS
 from app.config import Config
 from app.database import db
 # Import all models so db.create_all() registers every table
+from app.models.queue_change import QueueChange  # noqa: F401
+from app.models.queue_entry_archive import QueueEntryArchive  # noqa: F401
 from app.models.queue_event import QueueEvent  # noqa: F401
+from app.models.queue_event_rollup import QueueEventRollup  # noqa: F401
 
 
 def create_app(config_class=Config):
@@ -26,14 +29,49 @@ def create_app(config_class=Config):
     db.init_app(app)
     CORS(app)
 
+    # Buffered (or background-thread) event persistence
+    from app.event_writer import create_event_sink
+    app.extensions["queuewise_events"] = create_event_sink(app)
+
+    # In-process fan-out of queue changes to SSE subscribers
+    from app.pubsub import QueueBroker
+    app.extensions["queuewise_broker"] = QueueBroker()
+
+    # Per-queue read-through cache for status/summary/preview
+    from app.cache import QueueStateCache
+    app.extensions["queuewise_cache"] = (
+        QueueStateCache(app.config["QUEUE_CACHE_MAX_QUEUES"], app.config["QUEUE_CACHE_MAX_BYTES"])
+        if app.config["QUEUE_CACHE_ENABLED"] else None
+    )
+
+    # Closed-bucket results of GET /queues/<id>/analytics
+    from app.analytics import BucketCache
+    app.extensions["queuewise_analytics"] = BucketCache(app.config["ANALYTICS_CACHE_MAX_BUCKETS"])
+
+    # Tail the shared change log so other workers' writes reach this one
+    from app.change_feed import register_change_feed
+    register_change_feed(app)
+
+    # Optional background sweep of expired events (see app/retention.py)
+    from app.retention import register_retention
+    register_retention(app)
+
     # Register request tracing + API versioning middleware
     from app.logging_utils import register_request_tracing
     register_request_tracing(app)
 
+    # Per-request SQL statement counts, DB time and slow-query log
+    from app.logging_utils import register_query_instrumentation
+    register_query_instrumentation(app)
+
     # Register blueprints
     from app.routes.queue_routes import queue_bp
     app.register_blueprint(queue_bp)
 
+    # Prometheus text exposition at GET /metrics
+    from app.routes.metrics_routes import register_metrics
+    register_metrics(app)
+
     # Serve React frontend in production (catch-all for client-side routing)
     @app.route('/')
     @app.route('/<path:path>')
@@ -46,8 +84,10 @@ def create_app(config_class=Config):
             return send_from_directory(static_dir, 'index.html')
         return 'Frontend not built. Run: cd frontend && npm run build', 404
 
-    # Create database tables
+    # Create database tables, then upgrade tables that already existed
+    from app.migrations import upgrade_schema
     with app.app_context():
         db.create_all()
+        upgrade_schema()
 
     return app
@@ -5,12 +5,37 @@ This module NEVER modifies queue ordering or validates actions —
 it only produces text for display.
 """
 
-from typing import List
+from typing import Dict, List, Optional
 
+from app.estimator import DEFAULT_RATE, ServiceRate
 from app.models.queue_entry import EntryStatus, QueueEntry
 
 
-def explain_wait_time(entries: List[QueueEntry], user_name: str) -> str:
+def _minutes(minutes: int) -> str:
+    return f"{minutes} minute{'' if minutes == 1 else 's'}"
+
+
+def _wait_message(user_name: str, people_ahead: int, rate: Optional[ServiceRate] = None) -> str:
+    """Format the wait-time message for a user with N people ahead.
+
+    `rate` is the queue's measured service time (app/estimator.py);
+    without one, ~3 minutes per person is assumed.
+    """
+    if people_ahead == 0:
+        return f"{user_name}, you're next! Please be ready."
+
+    estimated_minutes, spread = (rate or DEFAULT_RATE).wait_minutes(people_ahead)
+    estimate = f"~{estimated_minutes} ± {_minutes(spread)}" if spread else f"~{_minutes(estimated_minutes)}"
+
+    return (
+        f"{user_name}, there {'is' if people_ahead == 1 else 'are'} "
+        f"{people_ahead} {'person' if people_ahead == 1 else 'people'} "
+        f"ahead of you. Estimated wait: {estimate}."
+    )
+
+
+def explain_wait_time(entries: List[QueueEntry], user_name: str,
+                      rate: Optional[ServiceRate] = None) -> str:
     """Generate a friendly wait-time explanation for a specific user."""
     waiting = [e for e in entries if e.status == EntryStatus.WAITING]
 
@@ -24,38 +49,60 @@ def explain_wait_time(entries: List[QueueEntry], user_name: str) -> str:
     if user_position is None:
         return f"{user_name} is not currently waiting in this queue."
 
-    if user_position == 0:
-        return f"{user_name}, you're next! Please be ready."
+    return _wait_message(user_name, user_position, rate)
 
-    people_ahead = user_position
-    # Rough estimate: ~3 minutes per person (a reasonable clinic/salon default)
-    estimated_minutes = people_ahead * 3
 
-    return (
-        f"{user_name}, there {'is' if people_ahead == 1 else 'are'} "
-        f"{people_ahead} {'person' if people_ahead == 1 else 'people'} "
-        f"ahead of you. Estimated wait: ~{estimated_minutes} minutes."
-    )
+def explain_wait_position(user_name: str, people_ahead: int,
+                          rate: Optional[ServiceRate] = None) -> str:
+    """Wait-time explanation for a user whose rank in line is already known."""
+    return _wait_message(user_name, people_ahead, rate)
 
 
-def explain_queue_status(entries: List[QueueEntry]) -> str:
-    """Generate an overall summary of the queue."""
+def explain_all_wait_times(entries: List[QueueEntry], people_ahead: int = 0,
+                           rate: Optional[ServiceRate] = None) -> Dict[str, str]:
+    """Generate wait-time explanations for every WAITING user in one pass.
+
+    Equivalent to calling explain_wait_time() for each waiting user,
+    but linear in the number of entries instead of quadratic.  For one
+    page of a longer queue, pass `people_ahead`: the number of WAITING
+    entries before the page.
+    """
+    messages: Dict[str, str] = {}
+    for entry in entries:
+        if entry.status != EntryStatus.WAITING:
+            continue
+        if entry.user_name not in messages:
+            messages[entry.user_name] = _wait_message(entry.user_name, people_ahead, rate)
+        people_ahead += 1
+    return messages
+
+
+def explain_queue_status(entries: List[QueueEntry], served_count: Optional[int] = None) -> str:
+    """Generate an overall summary of the queue.
+
+    Pass `served_count` (e.g. from an aggregate query) to call this with
+    only the WAITING slice instead of the queue's full history.
+    """
     waiting = [e for e in entries if e.status == EntryStatus.WAITING]
-    served = [e for e in entries if e.status == EntryStatus.SERVED]
+    if served_count is None:
+        served_count = sum(1 for e in entries if e.status == EntryStatus.SERVED)
+    return explain_queue_counts(len(waiting), served_count, waiting[0].user_name if waiting else None)
+
 
-    if not waiting and not served:
+def explain_queue_counts(waiting_count: int, served_count: int, next_up: Optional[str]) -> str:
+    """explain_queue_status() from counts alone (no entries loaded)."""
+    if not waiting_count and not served_count:
         return "This queue is empty. Be the first to join!"
 
-    if not waiting:
+    if not waiting_count:
         return (
-            f"All {len(served)} {'person has' if len(served) == 1 else 'people have'} "
+            f"All {served_count} {'person has' if served_count == 1 else 'people have'} "
             f"been served. The queue is now clear."
         )
 
-    next_up = waiting[0].user_name
     return (
-        f"{len(waiting)} {'person' if len(waiting) == 1 else 'people'} waiting. "
-        f"{len(served)} already served. "
+        f"{waiting_count} {'person' if waiting_count == 1 else 'people'} waiting. "
+        f"{served_count} already served. "
         f"Next up: {next_up}."
     )
 
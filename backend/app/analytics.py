@@ -0,0 +1,206 @@
+"""Vectorized per-bucket analytics over a queue's entry history.
+
+GET /queues/<id>/analytics reports, for each hour or day:
+
+  joined          entries that joined in the bucket
+  served/skipped  entries served/skipped in the bucket (throughput)
+  skip_rate       skipped / (served + skipped)
+  wait_p50/p90    seconds from joining to being served
+  service_p50/p90 seconds the person took at the head of the line
+
+The joined_at / served_at / skipped_at columns of queue_entries and
+queue_entries_archive are streamed in chunks (repo.iter_entry_times)
+into NumPy arrays; bucketing and the percentiles are computed with
+array operations, never a Python loop per entry.  Service time is
+measured the way the wait estimator measures it (app/estimator.py):
+from the later of the person's join and the previous serve/skip,
+shared among everyone completed at the same instant, capped at
+WAIT_ESTIMATE_MAX_SAMPLE_SECONDS.  Because of the cap, looking back
+that far for the previous completion makes every bucket's numbers
+independent of the range it was computed in.
+
+Closed buckets cannot change any more, so their results are kept in
+a BucketCache and only open buckets (the current one) are recomputed.
+Entries served before served_at existed have no timestamps and are
+not counted.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app import metrics
+
+BUCKETS = {"hour": 3600, "day": 86400}
+
+# A bucket counts as closed this long after it ends (commit lag)
+CLOSE_GRACE = timedelta(seconds=60)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_seconds(moment: datetime) -> float:
+    """Naive-UTC datetime -> epoch seconds."""
+    return (moment - _EPOCH).total_seconds()
+
+
+def from_seconds(seconds: float) -> datetime:
+    """Epoch seconds -> naive-UTC datetime."""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def _epoch_seconds(values: Sequence[Optional[datetime]]) -> np.ndarray:
+    """Datetimes (None allowed) -> float epoch seconds (NaN for None)."""
+    stamps = np.array(values, dtype="datetime64[us]")
+    missing = np.isnat(stamps)
+    seconds = stamps.astype("int64") / 1e6
+    seconds[missing] = np.nan
+    return seconds
+
+
+def load_columns(chunks: Iterable[Sequence[tuple]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate (joined_at, served_at, skipped_at) row chunks into arrays.
+
+    Returns (joined, completed, served): epoch seconds of the join,
+    epoch seconds of the serve or skip (NaN while waiting), and
+    whether the entry was served.
+    """
+    joined, completed, served = [], [], []
+    for rows in chunks:
+        if not rows:
+            continue
+        joined_at, served_at, skipped_at = zip(*rows)
+        served_s = _epoch_seconds(served_at)
+        is_served = ~np.isnan(served_s)
+        joined.append(_epoch_seconds(joined_at))
+        completed.append(np.where(is_served, served_s, _epoch_seconds(skipped_at)))
+        served.append(is_served)
+    if not joined:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=bool)
+    return np.concatenate(joined), np.concatenate(completed), np.concatenate(served)
+
+
+def grouped_percentiles(groups: np.ndarray, values: np.ndarray, n: int,
+                        quantiles: Sequence[float]) -> List[np.ndarray]:
+    """Linear-interpolated percentiles of `values` per group 0..n-1.
+
+    Same results as np.percentile(..., method="linear") per group, for
+    all groups at once: one lexsort, then index arithmetic.  Groups
+    with no values get NaN.
+    """
+    if not len(values):
+        return [np.full(n, np.nan) for _ in quantiles]
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=n)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = len(ordered) - 1
+    results = []
+    for q in quantiles:
+        pos = starts + np.maximum(counts - 1, 0) * q
+        lo = np.clip(np.floor(pos).astype(np.int64), 0, last)
+        hi = np.clip(np.ceil(pos).astype(np.int64), 0, last)
+        frac = pos - np.floor(pos)
+        value = ordered[lo] * (1 - frac) + ordered[hi] * frac
+        results.append(np.where(counts > 0, value, np.nan))
+    return results
+
+
+def bucket_stats(joined: np.ndarray, completed: np.ndarray, served: np.ndarray,
+                 start: float, size: int, n: int, cap: float) -> List[dict]:
+    """Statistics for n buckets of `size` seconds from epoch second `start`.
+
+    Completions before `start` are only used as the "previous
+    completion" of a serve; pass at least `cap` seconds of them.
+    """
+    end = start + n * size
+
+    in_range = (joined >= start) & (joined < end)
+    joins = np.bincount(((joined[in_range] - start) // size).astype(np.int64), minlength=n)
+
+    done = ~np.isnan(completed)
+    timeline = np.sort(completed[done])
+    window = done & (completed >= start) & (completed < end)
+    at = completed[window]
+    group = ((at - start) // size).astype(np.int64)
+    was_served = served[window]
+    served_n = np.bincount(group[was_served], minlength=n)
+    skipped_n = np.bincount(group[~was_served], minlength=n)
+
+    serve_at = at[was_served]
+    serve_joined = joined[window][was_served]
+    serve_group = group[was_served]
+    wait = serve_at - serve_joined
+    left = np.searchsorted(timeline, serve_at, "left")
+    right = np.searchsorted(timeline, serve_at, "right")
+    previous = np.where(left > 0, timeline[np.maximum(left - 1, 0)], -np.inf)
+    clock = np.maximum(serve_joined, previous)
+    service = np.minimum((serve_at - clock) / (right - left), cap)
+
+    wait_p50, wait_p90 = grouped_percentiles(serve_group, wait, n, (0.5, 0.9))
+    service_p50, service_p90 = grouped_percentiles(serve_group, service, n, (0.5, 0.9))
+    finished = served_n + skipped_n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        skip_rate = skipped_n / finished
+
+    def _num(value, digits=1):
+        return None if np.isnan(value) else round(float(value), digits)
+
+    return [
+        {
+            "start": from_seconds(start + i * size).isoformat(),
+            "end": from_seconds(start + (i + 1) * size).isoformat(),
+            "joined": int(joins[i]),
+            "served": int(served_n[i]),
+            "skipped": int(skipped_n[i]),
+            "skip_rate": _num(skip_rate[i], 3),
+            "wait_p50_seconds": _num(wait_p50[i]),
+            "wait_p90_seconds": _num(wait_p90[i]),
+            "service_p50_seconds": _num(service_p50[i]),
+            "service_p90_seconds": _num(service_p90[i]),
+        }
+        for i in range(n)
+    ]
+
+
+# (queue_id, bucket size, bucket start in epoch seconds)
+BucketKey = Tuple[int, int, int]
+
+
+class BucketCache:
+    """Thread-safe LRU of closed-bucket results."""
+
+    def __init__(self, max_buckets: int = 50000):
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[BucketKey, dict]" = OrderedDict()
+
+    def get_many(self, keys: Iterable[BucketKey]) -> Dict[BucketKey, dict]:
+        """Return the cached results among `keys`."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                result = self._buckets.get(key)
+                if result is not None:
+                    self._buckets.move_to_end(key)
+                    found[key] = result
+        return found
+
+    def put(self, key: BucketKey, result: dict):
+        with self._lock:
+            self._buckets[key] = result
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                metrics.incr("analytics_cache_evictions_total")
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
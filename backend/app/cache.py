@@ -0,0 +1,198 @@
+"""In-process read-through cache of per-queue state.
+
+Status, summary and preview reads are answered from a QueueSnapshot
+held here instead of re-querying the database.  A snapshot holds the
+queue's metadata and version, its status counts and service-time estimate, the head and tail of
+the waiting line and the rendered AI explanations — never the whole
+line, so its size does not grow with the queue.  Status pages are
+added to it as they are read (up to MAX_PAGES per queue).
+
+Consistency:
+  - Mutating service functions invalidate a queue's snapshot after
+    their transaction commits (repo.on_commit), before subscribers
+    are notified.
+  - Each queue has an invalidation generation.  A reader records it
+    before loading from the database and put() discards the snapshot
+    if an invalidation happened in between, so a slow reader can never
+    re-insert state that is already stale.
+
+Eviction is LRU, bounded both by number of queues and by an estimate
+of the memory the snapshots hold.  Hits, misses and evictions are
+counted in app.metrics.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app import metrics
+from app.estimator import DEFAULT_RATE, ServiceRate
+from app.models.queue_entry import EntryStatus, QueueEntry
+
+# Status pages kept per snapshot
+MAX_PAGES = 8
+
+# Rough per-object costs used for the memory bound (bytes)
+_SNAPSHOT_OVERHEAD = 1024
+_ENTRY_OVERHEAD = 200
+
+
+class EntryView(NamedTuple):
+    """Immutable, session-independent copy of a QueueEntry row."""
+    id: int
+    user_name: str
+    position: int
+    status: EntryStatus
+    joined_at: datetime
+    served_at: Optional[datetime] = None
+    skipped_at: Optional[datetime] = None
+
+    @classmethod
+    def of(cls, entry: QueueEntry) -> "EntryView":
+        return cls(entry.id, entry.user_name, entry.position, entry.status, entry.joined_at,
+                   entry.served_at, entry.skipped_at)
+
+
+class StatusPage(NamedTuple):
+    """One page of GET /status: entries, cursor and their wait explanations."""
+    entries: Tuple[EntryView, ...]
+    next_cursor: Optional[int]
+    wait_explanations: Dict[str, str]
+
+
+# (after_position, limit, status filter)
+PageKey = Tuple[int, int, Optional[EntryStatus]]
+
+
+@dataclass
+class QueueSnapshot:
+    """Everything the read endpoints need to answer for one queue."""
+    queue_id: int
+    name: str
+    status: str
+    version: int
+    counts: Dict[EntryStatus, int]
+    # First few WAITING entries (enough for the preview) and the last one
+    head: Tuple[EntryView, ...]
+    last_waiting: Optional[EntryView]
+    explanation: str
+    estimated_wait: str
+    # Measured time per person (app/estimator.py), as of `version`
+    rate: ServiceRate = DEFAULT_RATE
+    pages: Dict[PageKey, StatusPage] = field(default_factory=dict)
+    size_bytes: int = field(default=0, compare=False)
+
+    @property
+    def waiting_count(self) -> int:
+        return self.counts.get(EntryStatus.WAITING, 0)
+
+    def estimate_size(self) -> int:
+        rows = len(self.head) + sum(len(p.entries) for p in self.pages.values())
+        text = sum(
+            len(k) + len(v) for p in self.pages.values() for k, v in p.wait_explanations.items()
+        )
+        text += len(self.explanation) + len(self.estimated_wait) + len(self.name)
+        return _SNAPSHOT_OVERHEAD + rows * _ENTRY_OVERHEAD + text
+
+
+class QueueStateCache:
+    """Thread-safe LRU of QueueSnapshots keyed by queue id."""
+
+    def __init__(self, max_queues: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_queues = max_queues
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, QueueSnapshot]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._bytes = 0
+
+    def get(self, queue_id: int) -> Optional[QueueSnapshot]:
+        """Return the cached snapshot (marking it recently used) or None."""
+        with self._lock:
+            snapshot = self._snapshots.get(queue_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(queue_id)
+        metrics.incr("queue_cache_hits_total" if snapshot else "queue_cache_misses_total")
+        return snapshot
+
+    def version(self, queue_id: int) -> Optional[int]:
+        """Version of the cached snapshot, or None; not counted as a hit or miss."""
+        snapshot = self._snapshots.get(queue_id)
+        return snapshot.version if snapshot is not None else None
+
+    def generation(self, queue_id: int) -> int:
+        """Invalidation generation to pass back to put()."""
+        return self._generations.get(queue_id, 0)
+
+    def put(self, snapshot: QueueSnapshot, generation: int) -> bool:
+        """Store a snapshot unless the queue was invalidated since `generation`."""
+        snapshot.size_bytes = snapshot.estimate_size()
+        with self._lock:
+            if self._generations.get(snapshot.queue_id, 0) != generation:
+                metrics.incr("queue_cache_stale_puts_total")
+                return False
+            if snapshot.size_bytes > self.max_bytes:
+                return False
+            self._discard(snapshot.queue_id)
+            self._snapshots[snapshot.queue_id] = snapshot
+            self._bytes += snapshot.size_bytes
+            while len(self._snapshots) > self.max_queues or self._bytes > self.max_bytes:
+                oldest = next(iter(self._snapshots))
+                self._discard(oldest)
+                metrics.incr("queue_cache_evictions_total")
+            self._report()
+        return True
+
+    def put_page(self, snapshot: QueueSnapshot, key: PageKey, page: StatusPage,
+                 generation: int) -> bool:
+        """Attach a status page to a cached snapshot (same staleness rules as put)."""
+        with self._lock:
+            if (self._generations.get(snapshot.queue_id, 0) != generation
+                    or self._snapshots.get(snapshot.queue_id) is not snapshot):
+                return False
+            self._bytes -= snapshot.size_bytes
+            snapshot.pages[key] = page
+            while len(snapshot.pages) > MAX_PAGES:
+                snapshot.pages.pop(next(iter(snapshot.pages)))
+            snapshot.size_bytes = snapshot.estimate_size()
+            self._bytes += snapshot.size_bytes
+            while self._bytes > self.max_bytes and self._snapshots:
+                self._discard(next(iter(self._snapshots)))
+                metrics.incr("queue_cache_evictions_total")
+            self._report()
+        return True
+
+    def invalidate(self, queue_id: int):
+        """Drop a queue's snapshot and reject in-flight puts for it."""
+        with self._lock:
+            self._generations[queue_id] = self._generations.get(queue_id, 0) + 1
+            self._discard(queue_id)
+            self._report()
+
+    def clear(self):
+        with self._lock:
+            for queue_id in list(self._snapshots):
+                self._generations[queue_id] = self._generations.get(queue_id, 0) + 1
+            self._snapshots.clear()
+            self._bytes = 0
+            self._report()
+
+    def stats(self) -> dict:
+        return {
+            "queues": len(self._snapshots),
+            "bytes": self._bytes,
+            "hits": metrics.get("queue_cache_hits_total"),
+            "misses": metrics.get("queue_cache_misses_total"),
+            "evictions": metrics.get("queue_cache_evictions_total"),
+        }
+
+    def _discard(self, queue_id: int):
+        snapshot = self._snapshots.pop(queue_id, None)
+        if snapshot is not None:
+            self._bytes -= snapshot.size_bytes
+
+    def _report(self):
+        metrics.set_gauge("queue_cache_queues", len(self._snapshots))
+        metrics.set_gauge("queue_cache_bytes", self._bytes)
@@ -0,0 +1,194 @@
+"""Cross-worker change notifications via the shared queue_changes log.
+
+The state cache (app/cache.py) and the SSE broker (app/pubsub.py)
+live in one process, but gunicorn runs several.  Every successful
+mutation therefore also appends a QueueChange row in its own
+transaction (repo.record_change), tagged with the writing process's
+origin token.  Each process runs a ChangeFeed thread that tails the
+log every CHANGE_POLL_INTERVAL seconds — an indexed range scan on the
+primary key that returns nothing most of the time — and for each row
+written by another process:
+
+  - invalidates the queue's cached snapshot, and
+  - publishes the change to the local broker, waking SSE subscribers.
+
+A process's own changes are skipped: they were already handled after
+commit.  No external service is needed; the database every worker
+already shares is the channel.
+
+Ordering: seq order is not commit order on a database with concurrent
+writers (PostgreSQL): a transaction holding seq 6 can commit after
+seq 7 was read.  The tailer therefore remembers every seq it passed
+over as a gap and re-reads its gaps on each poll (one IN list on the
+primary key) until the row shows up or CHANGE_GAP_TIMEOUT_SECONDS
+passes — sequence values of rolled-back transactions never appear.
+A change committed later than that is missed.  If more than MAX_GAPS
+are open at once the whole cache is cleared and the gaps dropped.
+SQLite admits one writer at a time, so there are no gaps there.
+
+Failure handling: if a poll fails, or the feed was stalled longer than
+the log is retained, rows may have been missed — the whole cache is
+cleared so no stale snapshot survives.
+
+The thread is started lazily on the first request of each process
+(ensure_running), so it also runs in workers forked from a preloaded
+master.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from flask import Flask
+
+from app import metrics
+
+logger = logging.getLogger("queuewise")
+
+# Open gaps tracked before giving up and clearing the whole cache
+MAX_GAPS = 1000
+
+metrics.describe("change_feed_lag_seconds", "Delay before another worker's change was applied.",
+                 multiprocess_mode="max")
+
+
+class ChangeFeed:
+    """Tails queue_changes and applies other workers' changes locally."""
+
+    def __init__(self, app: Flask):
+        self._app = app
+        self.poll_interval = app.config.get("CHANGE_POLL_INTERVAL", 0.05)
+        self.retention = app.config.get("CHANGE_LOG_RETENTION_SECONDS", 3600)
+        self.gap_timeout = app.config.get("CHANGE_GAP_TIMEOUT_SECONDS", 10.0)
+        self.origin: Optional[str] = None
+        self._last_seq = 0
+        # seq not seen yet (below _last_seq) -> monotonic time it was passed over
+        self._gaps: Dict[int, float] = {}
+        self._last_ok = 0.0
+        self._last_trim = 0.0
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the tailer for this process if it isn't running yet."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # New process (or forked worker): new identity, fresh position
+                self._pid = os.getpid()
+                self.origin = uuid.uuid4().hex
+                self._thread = None
+                from app.repositories import queue_repository as repo
+                with self._app.app_context():
+                    self._last_seq = repo.get_latest_change_seq()
+                self._gaps = {}
+                self._last_ok = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="queuewise-change-feed", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the tailer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def poll(self) -> int:
+        """Apply every change logged since the last poll. Returns rows applied."""
+        from app.repositories import queue_repository as repo
+        with self._app.app_context():
+            rows = repo.get_changes_since(self._last_seq, self._gaps)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        cache = self._app.extensions.get("queuewise_cache")
+        broker = self._app.extensions["queuewise_broker"]
+        applied = 0
+        for seq, queue_id, origin, changed_at in rows:
+            if seq > self._last_seq:
+                passed = time.monotonic()
+                for missing in range(self._last_seq + 1, seq):
+                    self._gaps[missing] = passed
+                self._last_seq = seq
+            elif self._gaps.pop(seq, None) is None:
+                continue
+            if origin is not None and origin == self.origin:
+                continue
+            if cache is not None:
+                cache.invalidate(queue_id)
+            broker.publish(queue_id)
+            applied += 1
+            if changed_at is not None:
+                lag = (now - changed_at.replace(tzinfo=None)).total_seconds()
+                metrics.set_gauge("change_feed_lag_seconds", round(max(lag, 0.0), 6))
+        self._expire_gaps()
+        metrics.incr("change_feed_polls_total")
+        if applied:
+            metrics.incr("change_feed_applied_total", applied)
+        return applied
+
+    def _expire_gaps(self):
+        """Stop waiting for gaps older than gap_timeout; clear the cache on overflow."""
+        if len(self._gaps) > MAX_GAPS:
+            metrics.incr("change_feed_gaps_expired_total", len(self._gaps))
+            self._gaps = {}
+            self._clear_cache()
+            return
+        cutoff = time.monotonic() - self.gap_timeout
+        expired = [seq for seq, passed in self._gaps.items() if passed < cutoff]
+        for seq in expired:
+            del self._gaps[seq]
+        if expired:
+            metrics.incr("change_feed_gaps_expired_total", len(expired))
+
+    def trim(self) -> int:
+        """Delete log rows older than the retention window."""
+        from app.repositories import queue_repository as repo
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention)
+        with self._app.app_context():
+            return repo.trim_changes(cutoff)
+
+    # -- tailer thread --------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if time.monotonic() - self._last_ok > self.retention:
+                    # Rows we never saw may already be trimmed
+                    self._clear_cache()
+                self.poll()
+                self._last_ok = time.monotonic()
+                if time.monotonic() - self._last_trim > min(self.retention, 60):
+                    self.trim()
+                    self._last_trim = time.monotonic()
+            except Exception:
+                metrics.incr("change_feed_errors_total")
+                logger.exception("Change feed poll failed; clearing queue state cache")
+                self._clear_cache()
+                self._stop.wait(min(self.poll_interval * 20, 1.0))
+
+    def _clear_cache(self):
+        cache = self._app.extensions.get("queuewise_cache")
+        if cache is not None:
+            cache.clear()
+
+
+def register_change_feed(app: Flask):
+    """Create the app's ChangeFeed (if enabled) and start it on first request."""
+    if not app.config.get("CHANGE_FEED_ENABLED"):
+        app.extensions["queuewise_changes"] = None
+        return
+    feed = ChangeFeed(app)
+    app.extensions["queuewise_changes"] = feed
+
+    @app.before_request
+    def _start_change_feed():
+        feed.ensure_running()
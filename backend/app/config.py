@@ -5,6 +5,12 @@ import os
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
 
+def _ttls(raw: str) -> dict:
+    """Parse "ACTION=seconds,ACTION=seconds" into {action: seconds}."""
+    pairs = (item.split("=", 1) for item in raw.split(",") if "=" in item)
+    return {action.strip(): int(seconds) for action, seconds in pairs}
+
+
 class Config:
     """Base configuration with sensible defaults."""
 
@@ -14,9 +20,92 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Serve/skip retries after losing a race for the head of the line
+    CLAIM_MAX_RETRIES = int(os.environ.get("CLAIM_MAX_RETRIES", 3))
+
+    # Entries per GET /status page (?limit= is capped at the max)
+    STATUS_PAGE_DEFAULT = int(os.environ.get("STATUS_PAGE_DEFAULT", 100))
+    STATUS_PAGE_MAX = int(os.environ.get("STATUS_PAGE_MAX", 500))
+
+    # Most events per GET /events page (?format=ndjson is unbounded)
+    EVENTS_PAGE_MAX = int(os.environ.get("EVENTS_PAGE_MAX", 1000))
+
+    # Upper bound for ?count=N on PATCH /serve and /skip
+    BULK_ACTION_MAX = int(os.environ.get("BULK_ACTION_MAX", 100))
+
+    # Most queues accepted by GET /queues/status?ids=...
+    DASHBOARD_MAX_QUEUES = int(os.environ.get("DASHBOARD_MAX_QUEUES", 50))
+
+    # Wait estimates (see app/estimator.py): EWMA weight of each serve,
+    # time per person before a queue has samples, and the longest gap
+    # between serves still counted as service
+    WAIT_ESTIMATE_ALPHA = float(os.environ.get("WAIT_ESTIMATE_ALPHA", 0.2))
+    WAIT_ESTIMATE_DEFAULT_SECONDS = float(os.environ.get("WAIT_ESTIMATE_DEFAULT_SECONDS", 180))
+    WAIT_ESTIMATE_MAX_SAMPLE_SECONDS = float(os.environ.get("WAIT_ESTIMATE_MAX_SAMPLE_SECONDS", 3600))
+
+    # Analytics (GET /queues/<id>/analytics): most buckets per request,
+    # rows fetched per chunk, and closed-bucket results kept in memory
+    ANALYTICS_MAX_BUCKETS = int(os.environ.get("ANALYTICS_MAX_BUCKETS", 1000))
+    ANALYTICS_CHUNK_SIZE = int(os.environ.get("ANALYTICS_CHUNK_SIZE", 10000))
+    ANALYTICS_CACHE_MAX_BUCKETS = int(os.environ.get("ANALYTICS_CACHE_MAX_BUCKETS", 50000))
+
+    # Server-Sent Events stream (GET /queues/<id>/stream)
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", 15))
+    SSE_RETRY_MS = int(os.environ.get("SSE_RETRY_MS", 3000))
+
+    # Per-queue state cache for read endpoints (see app/cache.py)
+    QUEUE_CACHE_ENABLED = os.environ.get("QUEUE_CACHE_ENABLED", "true").lower() == "true"
+    QUEUE_CACHE_MAX_QUEUES = int(os.environ.get("QUEUE_CACHE_MAX_QUEUES", 1000))
+    QUEUE_CACHE_MAX_BYTES = int(os.environ.get("QUEUE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # Cross-worker change notifications (see app/change_feed.py)
+    CHANGE_FEED_ENABLED = os.environ.get("CHANGE_FEED_ENABLED", "true").lower() == "true"
+    CHANGE_POLL_INTERVAL = float(os.environ.get("CHANGE_POLL_INTERVAL", 0.05))
+    CHANGE_LOG_RETENTION_SECONDS = int(os.environ.get("CHANGE_LOG_RETENTION_SECONDS", 3600))
+    # How long a skipped seq is re-checked in case its transaction commits late
+    CHANGE_GAP_TIMEOUT_SECONDS = float(os.environ.get("CHANGE_GAP_TIMEOUT_SECONDS", 10))
+
+    # Event retention (see app/retention.py). Events older than their
+    # action's TTL are rolled up hourly, archived and deleted in batches.
+    EVENT_RETENTION_SECONDS = int(os.environ.get("EVENT_RETENTION_SECONDS", 90 * 86400))
+    EVENT_RETENTION_TTLS = _ttls(os.environ.get("EVENT_RETENTION_TTLS", "JOIN_ATTEMPT=604800"))
+    EVENT_RETENTION_BATCH_SIZE = int(os.environ.get("EVENT_RETENTION_BATCH_SIZE", 1000))
+    EVENT_RETENTION_BATCH_PAUSE = float(os.environ.get("EVENT_RETENTION_BATCH_PAUSE", 0.05))
+    EVENT_ARCHIVE_DIR = os.environ.get("EVENT_ARCHIVE_DIR", "/tmp/queuewise-archive")
+    EVENT_RETENTION_SCHEDULER = os.environ.get("EVENT_RETENTION_SCHEDULER", "").lower() == "true"
+    EVENT_RETENTION_INTERVAL = float(os.environ.get("EVENT_RETENTION_INTERVAL", 3600))
+    # SERVED/SKIPPED entries move to queue_entries_archive after this long
+    ENTRY_ARCHIVE_AFTER_SECONDS = int(os.environ.get("ENTRY_ARCHIVE_AFTER_SECONDS", 7 * 86400))
+    ENTRY_ARCHIVE_BATCH_SIZE = int(os.environ.get("ENTRY_ARCHIVE_BATCH_SIZE", 1000))
+
+    # Event persistence (see app/event_writer.py). By default BLOCKED
+    # events are buffered and bulk-inserted; EVENT_WRITER_ASYNC moves
+    # every event onto a background writer thread.
+    EVENT_WRITER_ASYNC = os.environ.get("EVENT_WRITER_ASYNC", "").lower() == "true"
+    EVENT_BATCH_SIZE = int(os.environ.get("EVENT_BATCH_SIZE", 50))
+    EVENT_FLUSH_INTERVAL = float(os.environ.get("EVENT_FLUSH_INTERVAL", 5.0))
+    EVENT_QUEUE_MAXSIZE = int(os.environ.get("EVENT_QUEUE_MAXSIZE", 10000))
+    EVENT_ENQUEUE_TIMEOUT = float(os.environ.get("EVENT_ENQUEUE_TIMEOUT", 0.05))
+    EVENT_WRITE_RETRIES = int(os.environ.get("EVENT_WRITE_RETRIES", 5))
+    # Longest a timeline read waits for the async writer to catch up
+    EVENT_READ_FLUSH_TIMEOUT = float(os.environ.get("EVENT_READ_FLUSH_TIMEOUT", 1.0))
+
+    # SQL instrumentation: statements slower than this (ms) are logged
+    # with their request_id; 0 turns the slow-query log off
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 100))
+
+    # GET /metrics: under gunicorn with several workers, point
+    # METRICS_MULTIPROC_DIR at a directory they share (emptied before
+    # start) so every scrape adds up all workers; each writes its
+    # totals there every METRICS_FLUSH_INTERVAL seconds
+    METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 1.0))
+
 
 class TestConfig(Config):
     """Overrides for test runs — uses in-memory SQLite."""
 
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     TESTING = True
+    # The tailer thread would share the in-memory connection
+    CHANGE_FEED_ENABLED = False
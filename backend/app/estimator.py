@@ -0,0 +1,144 @@
+"""Per-queue service-time estimator behind the wait-time messages.
+
+Each queue keeps an exponentially weighted mean and variance of the
+time one person takes at the head of the line (Queue.service_time_*).
+A serve turns the time since the previous serve or skip — or since the
+person joined, if the line was empty until then — into a sample, capped
+at WAIT_ESTIMATE_MAX_SAMPLE_SECONDS.  Both the sample and the state
+update are computed in O(1) inside the serve's own UPDATE of the queue
+row, against the clock as committed, so concurrent serves never
+measure the same interval twice.  clock_update() and serve_update()
+build the SQL for it; repo.bump_version only applies them.  Reads take the state from the queue row,
+held in the state cache, so no estimate ever scans history.
+
+The update is the incremental EWMA of mean and variance:
+
+    diff  = x - mean
+    mean += w * diff
+    var   = (1 - w) * (var + w * diff²)
+
+with w = WAIT_ESTIMATE_ALPHA.  Serving n people at once applies one
+step with w = 1 - (1 - alpha)^n, which weighs the mean exactly like n
+single steps.  Until a queue has a sample, WAIT_ESTIMATE_DEFAULT_SECONDS
+(3 minutes) is used.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Tuple
+
+from sqlalchemy import DateTime, Float, case, func, literal, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.queue import Queue
+
+
+class ServiceRate(NamedTuple):
+    """A queue's estimated time per person."""
+
+    mean_seconds: float
+    stddev_seconds: float = 0.0
+    samples: int = 0
+
+    def wait_minutes(self, people_ahead: int) -> Tuple[int, int]:
+        """(expected minutes, ± minutes) for someone with people_ahead before them.
+
+        Service times are treated as independent, so the spread grows
+        with the square root of the number of people ahead.
+        """
+        minutes = max(1, round(people_ahead * self.mean_seconds / 60))
+        spread = round(math.sqrt(people_ahead) * self.stddev_seconds / 60)
+        return minutes, spread
+
+
+DEFAULT_RATE = ServiceRate(180.0)
+
+
+def rate_of(queue, default_seconds: float = 180.0) -> ServiceRate:
+    """The ServiceRate stored on a queue row (the default until it has samples)."""
+    if not queue.service_samples or queue.service_time_mean is None:
+        return ServiceRate(default_seconds)
+    variance = max(queue.service_time_var or 0.0, 0.0)
+    return ServiceRate(queue.service_time_mean, math.sqrt(variance), queue.service_samples)
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """Naive UTC, the form SQLite hands back, so stored and fresh times compare."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def sample_weight(alpha: float, n: int = 1) -> float:
+    """EWMA weight of n samples applied in one step."""
+    return 1 - (1 - alpha) ** n
+
+
+def ewma_update(mean, variance, x, weight):
+    """One EWMA step; works on floats and on SQL column expressions alike."""
+    diff = x - mean
+    return mean + weight * diff, (1 - weight) * (variance + weight * diff * diff)
+
+
+# --- SQL for the queue row's UPDATE (applied by repo.bump_version) ---
+
+class epoch_seconds(FunctionElement):
+    """A DateTime column or value as seconds, for subtraction inside SQL."""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(epoch_seconds)
+def _epoch_seconds_sqlite(element, compiler, **kw):
+    return f"(julianday({compiler.process(element.clauses, **kw)}) * 86400.0)"
+
+
+@compiles(epoch_seconds, "postgresql")
+def _epoch_seconds_postgresql(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+def clock_update(completed_at: datetime) -> Dict[str, object]:
+    """Move the queue's service clock forward to `completed_at` (never back)."""
+    at = literal(naive_utc(completed_at), DateTime)
+    return {"last_completed_at": case(
+        (Queue.last_completed_at > at, Queue.last_completed_at), else_=at
+    )}
+
+
+def service_sample(now: datetime, joined_at: datetime, served: int, cap: float):
+    """SQL for the seconds per person of `served` people finished at `now`.
+
+    The clock starts at the later of the row's own last_completed_at
+    and the first person's join, so time the line stood empty is not
+    counted.  Reading last_completed_at in the UPDATE itself means
+    concurrent serves (other workers, retried claims) each measure from
+    the completion committed just before them, never the same interval
+    twice.  Samples are clamped to [0, cap] (a break with people
+    waiting is not service).
+    """
+    joined = literal(naive_utc(joined_at), DateTime)
+    start = case(
+        (or_(Queue.last_completed_at.is_(None), Queue.last_completed_at < joined), joined),
+        else_=Queue.last_completed_at,
+    )
+    per_person = (epoch_seconds(literal(naive_utc(now), DateTime)) - epoch_seconds(start)) / served
+    return case((per_person <= 0, 0.0), (per_person >= cap, cap), else_=per_person)
+
+
+def serve_update(completed_at: datetime, joined_at: datetime, served: int,
+                 weight: float, cap: float) -> Dict[str, object]:
+    """Column values folding one serve of `served` people into the EWMA.
+
+    Includes clock_update(completed_at); the sample is measured against
+    the clock before that update (service_sample).
+    """
+    x = service_sample(completed_at, joined_at, served, cap)
+    mean, var = ewma_update(func.coalesce(Queue.service_time_mean, x), Queue.service_time_var, x, weight)
+    return {
+        **clock_update(completed_at),
+        "service_time_mean": mean,
+        "service_time_var": var,
+        "service_samples": Queue.service_samples + served,
+    }
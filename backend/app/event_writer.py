@@ -0,0 +1,310 @@
+"""Batched and asynchronous persistence for queue events.
+
+Two sinks share the same interface (add / flush / drain):
+
+EventBatcher (default)
+
+SUCCESS events are written inside the action's own unit of work (see
+logging_utils.log_event), so a state change and its QueueEvent row
+share one commit.  BLOCKED attempts change no state, and committing
+each one on its own costs an fsync per rejected request — a kiosk
+retrying a paused queue would dominate write throughput.  They are
+buffered here instead and written with a single bulk insert when:
+
+  - the buffer reaches EVENT_BATCH_SIZE rows,
+  - the oldest buffered row is older than EVENT_FLUSH_INTERVAL seconds,
+  - the next SUCCESS event commits (rows ride along in its transaction),
+  - the event timeline is read, or the process exits.
+
+AsyncEventWriter (EVENT_WRITER_ASYNC=True)
+  Every event — SUCCESS included — is put on a bounded in-process
+  queue and a background thread bulk-inserts it in batches of up to
+  EVENT_BATCH_SIZE rows, at least every EVENT_FLUSH_INTERVAL seconds.
+  The request path only pays for a queue put, so serve/skip latency no
+  longer includes the event insert (the state change and its event are
+  then no longer atomic).  Nothing is dropped silently:
+    - when the queue is full for EVENT_ENQUEUE_TIMEOUT seconds the
+      caller writes the row synchronously (backpressure),
+    - failed batches are retried with backoff; rows are only given up
+      after EVENT_WRITE_RETRIES attempts, and that is logged and counted.
+  Backpressure and lag are reported through app.metrics.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+import weakref
+from typing import List, Optional, Tuple
+
+from flask import Flask, has_app_context
+
+from app import metrics
+
+logger = logging.getLogger("queuewise")
+
+_live_batchers = weakref.WeakSet()
+
+metrics.describe("event_writer_lag_seconds", "Age of the oldest event in the last batch written.",
+                 multiprocess_mode="max")
+metrics.describe("event_writer_batch_lag_seconds", "Age of the oldest event in each batch written.")
+metrics.describe("event_writer_queue_depth", "Events waiting for the background writer.")
+metrics.describe("event_writer_queue_depth_max", "Most events ever waiting for the writer.",
+                 multiprocess_mode="max")
+
+
+class EventBatcher:
+    """Thread-safe in-process buffer of pending BLOCKED QueueEvent rows."""
+
+    # SUCCESS events are written in the caller's transaction
+    asynchronous = False
+
+    def __init__(self, app: Flask):
+        self._app = app
+        self.batch_size = app.config.get("EVENT_BATCH_SIZE", 50)
+        self.flush_interval = app.config.get("EVENT_FLUSH_INTERVAL", 5.0)
+        self._rows: List[dict] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        _live_batchers.add(self)
+
+    def add(self, row: dict):
+        """Buffer one event row, flushing if the batch is full or stale."""
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            due = (
+                len(self._rows) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def drain(self) -> List[dict]:
+        """Remove and return every buffered row."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        return rows
+
+    def requeue(self, rows: List[dict]):
+        """Put drained rows back (oldest first) after their write failed.
+
+        Never writes: this runs from rollback hooks, where the session
+        cannot be used.
+        """
+        if not rows:
+            return
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows[:0] = rows
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        """Write all buffered rows with one bulk insert. Returns the row count.
+
+        `timeout` is accepted for parity with AsyncEventWriter; the
+        insert runs inline.
+        """
+        rows = self.drain()
+        if not rows:
+            return 0
+        from app.repositories import queue_repository as repo
+        if has_app_context():
+            repo.add_events(rows)
+        else:
+            with self._app.app_context():
+                repo.add_events(rows)
+        return len(rows)
+
+
+_STOP = object()
+# Put on the queue by flush(): write the batch being gathered right away
+_FLUSH = object()
+
+
+class AsyncEventWriter:
+    """Bounded queue of event rows drained by a background writer thread."""
+
+    asynchronous = True
+
+    def __init__(self, app: Flask, start: bool = True):
+        self._app = app
+        self.batch_size = app.config.get("EVENT_BATCH_SIZE", 50)
+        self.flush_interval = app.config.get("EVENT_FLUSH_INTERVAL", 5.0)
+        self.enqueue_timeout = app.config.get("EVENT_ENQUEUE_TIMEOUT", 0.05)
+        self.max_retries = app.config.get("EVENT_WRITE_RETRIES", 5)
+        self._queue: "queue.Queue[Tuple[float, dict]]" = queue.Queue(
+            maxsize=app.config.get("EVENT_QUEUE_MAXSIZE", 10000)
+        )
+        self._thread: Optional[threading.Thread] = None
+        _live_batchers.add(self)
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the writer thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="queuewise-event-writer", daemon=True
+            )
+            self._thread.start()
+
+    def add(self, row: dict):
+        """Enqueue one row; write it inline if the queue stays full."""
+        try:
+            self._queue.put((time.monotonic(), row), timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: write inline, in the caller's transaction when
+            # there is one (a second connection would wait on its lock)
+            metrics.incr("event_writer_backpressure_total")
+            if has_app_context():
+                from app.repositories import queue_repository as repo
+                repo.add_events([row])
+                metrics.incr("event_writer_written_total")
+            else:
+                self._write([row])
+            return
+        metrics.incr("event_writer_enqueued_total")
+        depth = self._queue.qsize()
+        metrics.set_gauge("event_writer_queue_depth", depth)
+        metrics.max_gauge("event_writer_queue_depth_max", depth)
+
+    def drain(self) -> List[dict]:
+        """Nothing is held for the caller's transaction in async mode."""
+        return []
+
+    def requeue(self, rows: List[dict]):
+        """Enqueue rows again (drain() never hands any out in async mode)."""
+        for row in rows:
+            self.add(row)
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        """Block until every row enqueued so far has been written.
+
+        Asks the writer thread to write its partial batch at once
+        rather than wait out EVENT_FLUSH_INTERVAL.  Gives up after
+        `timeout` seconds, if given.
+        """
+        pending = self._queue.qsize()
+        if self._thread is None or not self._thread.is_alive():
+            return self._drain_inline()
+        if not self._queue.unfinished_tasks:
+            return 0
+        try:
+            self._queue.put_nowait((time.monotonic(), _FLUSH))
+        except queue.Full:
+            pass  # a full queue fills the batch anyway
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.005)
+        return pending
+
+    def shutdown(self, timeout: float = 10.0):
+        """Write everything still queued and stop the writer thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put((time.monotonic(), _STOP))
+            self._thread.join(timeout)
+        self._drain_inline()
+
+    def stats(self) -> dict:
+        """Current queue depth plus the writer's counters."""
+        snapshot = metrics.snapshot()
+        stats = {k: v for k, v in snapshot.items() if k.startswith("event_writer_")}
+        stats["event_writer_queue_depth"] = self._queue.qsize()
+        return stats
+
+    # -- writer thread --------------------------------------------------
+
+    def _run(self):
+        while True:
+            batch: List[Tuple[float, dict]] = []
+            item = self._queue.get()
+            stop = item[1] is _STOP
+            # Sentinels are queue tasks too; task_done them with the batch
+            sentinels = 1 if stop or item[1] is _FLUSH else 0
+            if not sentinels:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item[1] is _STOP or item[1] is _FLUSH:
+                        # A flush() is waiting: write the partial batch now
+                        sentinels = 1
+                        stop = item[1] is _STOP
+                        break
+                    batch.append(item)
+
+            if batch:
+                lag = time.monotonic() - batch[0][0]
+                self._write([row for _, row in batch])
+                metrics.set_gauge("event_writer_lag_seconds", round(lag, 6))
+                metrics.observe("event_writer_batch_lag_seconds", lag)
+                metrics.set_gauge("event_writer_queue_depth", self._queue.qsize())
+            for _ in range(len(batch) + sentinels):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _drain_inline(self) -> int:
+        rows = []
+        while True:
+            try:
+                _, row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not _STOP and row is not _FLUSH:
+                rows.append(row)
+            self._queue.task_done()
+        if rows:
+            self._write(rows)
+        return len(rows)
+
+    def _write(self, rows: List[dict]):
+        """Bulk-insert rows in a fresh app context, retrying with backoff."""
+        from app.repositories import queue_repository as repo
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with self._app.app_context():
+                    repo.add_events(rows)
+                metrics.incr("event_writer_written_total", len(rows))
+                metrics.incr("event_writer_batches_total")
+                return
+            except Exception:
+                metrics.incr("event_writer_write_errors_total")
+                if attempt == self.max_retries:
+                    metrics.incr("event_writer_dropped_total", len(rows))
+                    logger.exception(
+                        "Dropping %d events after %d failed write attempts",
+                        len(rows), attempt,
+                    )
+                    return
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))
+
+
+def create_event_sink(app: Flask):
+    """Return the event sink configured for this app."""
+    if app.config.get("EVENT_WRITER_ASYNC"):
+        return AsyncEventWriter(app)
+    return EventBatcher(app)
+
+
+@atexit.register
+def _flush_all_on_exit():
+    for sink in list(_live_batchers):
+        try:
+            if isinstance(sink, AsyncEventWriter):
+                sink.shutdown()
+            else:
+                sink.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered events on exit")
@@ -3,18 +3,33 @@
 Provides:
   1. Request tracing — UUID request_id per request on flask.g + X-Request-ID header.
   2. Structured JSON logging — log_event() with request_id from g context.
-  3. Event persistence — persist_event() writes to QueueEvent table.
-  4. API versioning — X-API-Version header on every response.
+  3. Event persistence — _persist_events() writes to QueueEvent table.
+     SUCCESS events join the caller's unit of work; BLOCKED events are
+     batched.  With EVENT_WRITER_ASYNC every event goes to a background
+     writer thread instead (see app/event_writer.py).
+  4. Change notification — SUCCESS events wake up SSE subscribers
+     (app/pubsub.py) once the action commits.
+  5. API versioning — X-API-Version header on every response.
+  6. SQL instrumentation — statements and DB time per request in
+     X-DB-Queries / X-DB-Time-ms and in the request's JSON log record;
+     statements over SLOW_QUERY_MS are logged with their request_id.
+  7. Metrics — request latency and DB time histograms per endpoint and
+     per-action SUCCESS/BLOCKED counters in app.metrics (GET /metrics).
 
 None of these modify business logic or routes.
 """
 
 import logging
 import json
+import time
 import uuid
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
-from flask import Flask, g, request as flask_request
+from flask import Flask, current_app, g, has_request_context, request as flask_request
+from sqlalchemy import event
+
+from app import metrics
 
 logger = logging.getLogger("queuewise")
 logger.setLevel(logging.INFO)
@@ -27,6 +42,12 @@ if not logger.handlers:
 # Current API version — single source of truth
 API_VERSION = "v1"
 
+metrics.describe("http_request_duration_seconds", "Request latency by method, route and status.")
+metrics.describe("http_request_db_seconds", "Time spent in SQL per request, by route.")
+metrics.describe("db_statement_seconds_total", "Time spent executing SQL statements.")
+metrics.describe("db_statements_total", "SQL statements executed.")
+metrics.describe("queue_actions_total", "Queue actions by action, result and blocking rule_code.")
+
 
 def _get_request_id() -> str:
     """Get the current request_id from Flask g context, or generate one."""
@@ -38,31 +59,112 @@ def _get_request_id() -> str:
 
 def log_event(queue_id: int, action: str, result: str, extra: Optional[dict] = None):
     """Emit a structured log entry AND persist to event table."""
+    log_events(queue_id, [(action, result, extra)])
+
+
+def log_events(queue_id: int, events: List[Tuple[str, str, Optional[dict]]]):
+    """log_event() for several (action, result, extra) events at once.
+
+    All rows are persisted with a single bulk insert, and subscribers
+    are notified once if any event is a SUCCESS.
+    """
     request_id = _get_request_id()
-    record = {
-        "request_id": request_id,
+    rows = []
+    for action, result, extra in events:
+        record = {
+            "request_id": request_id,
+            "queue_id": queue_id,
+            "action": action,
+            "result": result,
+        }
+        if extra:
+            record.update(extra)
+        logger.info(json.dumps(record))
+        rows.append(_event_row(queue_id, action, result, extra, request_id))
+        metrics.incr("queue_actions_total", labels={
+            "action": action,
+            "result": result,
+            "rule_code": (extra or {}).get("rule_code", ""),
+        })
+
+    # Persist to database for the /events endpoint
+    _persist_events(queue_id, rows)
+
+    if any(result == "SUCCESS" for _, result, _ in events):
+        _notify_subscribers(queue_id)
+
+
+def _notify_subscribers(queue_id: int):
+    """Wake up stream subscribers for this queue after the action commits."""
+    try:
+        from app.pubsub import notify_queue_changed
+        notify_queue_changed(queue_id)
+    except Exception:
+        logger.exception("Failed to notify subscribers for queue %s", queue_id)
+
+
+def _event_row(queue_id: int, action: str, result: str,
+               extra: Optional[dict], request_id: str) -> dict:
+    """Build one QueueEvent row."""
+    return {
         "queue_id": queue_id,
         "action": action,
         "result": result,
+        "detail": json.dumps(extra) if extra else "",
+        "request_id": request_id,
+        "created_at": datetime.now(timezone.utc),
     }
-    if extra:
-        record.update(extra)
-
-    logger.info(json.dumps(record))
 
-    # Persist to database for the /events endpoint
-    _persist_event(queue_id, action, result, extra, request_id)
 
+def _persist_events(queue_id: int, rows: List[dict]):
+    """Write event rows to the QueueEvent table. Fails silently if out of app context.
 
-def _persist_event(queue_id: int, action: str, result: str,
-                   extra: Optional[dict], request_id: str):
-    """Write event to QueueEvent table. Fails silently if out of app context."""
+    BLOCKED events (and every event when the sink is asynchronous) are
+    handed to the app's event sink.  Any other event is added to the
+    current transaction together with whatever is buffered, so inside
+    repo.unit_of_work() it commits with the state change it describes.
+    That insert runs in a SAVEPOINT, and buffered rows are put back if
+    it fails or the transaction rolls back.  Failures never propagate,
+    but they are logged and counted.
+    """
     try:
         from app.repositories import queue_repository as repo
-        detail = json.dumps(extra) if extra else ""
-        repo.add_event(queue_id, action, result, detail, request_id)
+        sink = current_app.extensions["queuewise_events"]
+        immediate = []
+        for row in rows:
+            if sink.asynchronous or row["result"] == "BLOCKED":
+                sink.add(row)
+            else:
+                immediate.append(row)
+        if immediate:
+            buffered = sink.drain()
+            # In a SAVEPOINT: a failed insert must not fail the action
+            # it describes.  Buffered rows go back to the sink if the
+            # write or the surrounding transaction fails.
+            if repo.add_events_in_savepoint(buffered + immediate, buffered):
+                repo.on_rollback(lambda: sink.requeue(buffered))
+            else:
+                sink.requeue(buffered)
+                metrics.incr("event_persist_errors_total", len(immediate))
+                logger.error("Failed to persist %d event(s) for queue %s", len(immediate), queue_id)
     except Exception:
-        pass  # Event logging is non-critical — never break the main flow
+        # Event logging is non-critical — never break the main flow
+        metrics.incr("event_persist_errors_total", len(rows))
+        logger.exception("Failed to persist %d event(s) for queue %s", len(rows), queue_id)
+
+
+def flush_pending_events():
+    """Write any buffered events now (e.g. before reading the timeline).
+
+    Waits at most EVENT_READ_FLUSH_TIMEOUT seconds for the async writer,
+    so a slow or wedged writer delays a read but never hangs it.
+    """
+    try:
+        current_app.extensions["queuewise_events"].flush(
+            timeout=current_app.config.get("EVENT_READ_FLUSH_TIMEOUT", 1.0)
+        )
+    except Exception:
+        pass
 
 
 def register_request_tracing(app: Flask):
@@ -83,3 +185,93 @@ def register_request_tracing(app: Flask):
         response.headers["X-Request-ID"] = getattr(g, "request_id", "unknown")
         response.headers["X-API-Version"] = API_VERSION
         return response
+
+
+class _RequestDbStats:
+    """Statements and DB time accumulated by one request (kept on flask.g)."""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def register_query_instrumentation(app: Flask):
+    """Count SQL statements and DB time per request; log slow statements.
+
+    Hooks before/after_cursor_execute on the app's engine.  Statements
+    run by a request add to its _RequestDbStats; those outside a
+    request (background writers, the change feed) are only checked
+    against SLOW_QUERY_MS.  Each response gets X-DB-Queries and
+    X-DB-Time-ms headers, and one JSON log record per request carries
+    the same numbers with the method, path, status and duration.  The
+    duration and DB time also go to the http_request_duration_seconds
+    and http_request_db_seconds histograms, labelled by the matched
+    route (not the raw path, so queue ids do not multiply the series).
+    """
+    with app.app_context():
+        from app.database import db
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("queuewise_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["queuewise_query_start"].pop()
+        in_request = has_request_context()
+        stats = getattr(g, "db_stats", None) if in_request else None
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+        metrics.incr("db_statements_total")
+        metrics.incr("db_statement_seconds_total", elapsed)
+        threshold = app.config.get("SLOW_QUERY_MS", 0)
+        if threshold and elapsed * 1000 >= threshold:
+            metrics.incr("db_slow_statements_total")
+            logger.warning(json.dumps({
+                "request_id": getattr(g, "request_id", None) if in_request else None,
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": statement[:1000],
+            }))
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        starts = context.connection.info.get("queuewise_query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    @app.before_request
+    def _start_request_stats():
+        g.db_stats = _RequestDbStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _add_db_headers(response):
+        stats = getattr(g, "db_stats", None)
+        if stats is None:
+            return response
+        duration = time.perf_counter() - g.request_started
+        db_ms = round(stats.seconds * 1000, 2)
+        response.headers["X-DB-Queries"] = str(stats.queries)
+        response.headers["X-DB-Time-ms"] = f"{db_ms:.2f}"
+        endpoint = flask_request.url_rule.rule if flask_request.url_rule else "<unmatched>"
+        metrics.observe("http_request_duration_seconds", duration, {
+            "method": flask_request.method,
+            "endpoint": endpoint,
+            "status": response.status_code,
+        })
+        metrics.observe("http_request_db_seconds", stats.seconds, {"endpoint": endpoint})
+        logger.info(json.dumps({
+            "request_id": getattr(g, "request_id", None),
+            "event": "request",
+            "method": flask_request.method,
+            "path": flask_request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "db_queries": stats.queries,
+            "db_time_ms": db_ms,
+        }))
+        return response
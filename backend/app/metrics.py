@@ -0,0 +1,441 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms, optionally labelled, that components
+(event writer, repository, cache, request hooks) report without any
+external metrics service.  GET /metrics renders them in the Prometheus
+text format (exposition()).
+
+    from app import metrics
+    metrics.incr("event_writer_enqueued_total")
+    metrics.incr("queue_actions_total", labels={"action": "SERVE", "result": "SUCCESS"})
+    metrics.set_gauge("event_writer_queue_depth", 12)
+    metrics.observe("http_request_duration_seconds", 0.012, {"endpoint": "/queues"})
+    metrics.snapshot()  # -> {"event_writer_enqueued_total": 1, ...}
+
+Recording is lock-light: counters and histograms go to a per-thread
+shard that only its own thread writes, so incr() and observe() take
+no lock; gauges are a single dict assignment.  Readers merge the
+shards, folding those of finished threads into one retired total.
+
+Multi-worker (gunicorn) mode: with METRICS_MULTIPROC_DIR set, every
+process mirrors its totals into its own memory-mapped file in that
+directory (metrics_<pid>.db) every METRICS_FLUSH_INTERVAL seconds, and
+a scrape in any worker adds up all the files.  Counters and
+histograms of exited workers are kept; how a gauge combines across
+processes is its multiprocess_mode (see describe()).
+"""
+
+import atexit
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+# Latency-style buckets (seconds) for histograms not described otherwise
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class _Shard:
+    """One thread's counters and histograms; written only by that thread."""
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.counters: Dict[Key, float] = {}
+        # key -> [count per bucket..., count above the last bucket, sum]
+        self.histograms: Dict[Key, List[float]] = {}
+
+
+_shards: List[_Shard] = []
+_retired = _Shard()
+_gauges: Dict[Key, Tuple[float, float]] = {}  # key -> (value, time set)
+
+# name -> {"help", "buckets", "mode"} (see describe)
+_described: Dict[str, dict] = {}
+
+
+def describe(name: str, help: str = "", buckets: Optional[Tuple[float, ...]] = None,
+             multiprocess_mode: str = "sum"):
+    """Document a metric and set its histogram buckets / gauge aggregation.
+
+    multiprocess_mode decides how a gauge combines across workers:
+    "sum" (per-process amounts, e.g. queue depth; exited workers are
+    dropped), "max" (high-water marks, lag) or "latest" (the most
+    recently set value, for gauges any worker may update).
+    """
+    _described[name] = {
+        "help": help,
+        "buckets": tuple(sorted(buckets)) if buckets else None,
+        "mode": multiprocess_mode,
+    }
+
+
+def _labels(labels: Optional[dict]) -> Labels:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _lock:
+            _shards.append(shard)
+            if len(_shards) > 64:
+                _retire_finished()
+    return shard
+
+
+def _buckets(name: str) -> Tuple[float, ...]:
+    described = _described.get(name)
+    return (described and described["buckets"]) or DEFAULT_BUCKETS
+
+
+def incr(name: str, amount: float = 1, labels: Optional[dict] = None):
+    """Add `amount` to a counter (created at zero on first use)."""
+    counters = _shard().counters
+    key = (name, _labels(labels))
+    counters[key] = counters.get(key, 0) + amount
+
+
+def observe(name: str, value: float, labels: Optional[dict] = None):
+    """Record one observation in a histogram."""
+    histograms = _shard().histograms
+    key = (name, _labels(labels))
+    buckets = _buckets(name)
+    counts = histograms.get(key)
+    if counts is None:
+        counts = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+    counts[bisect_left(buckets, value)] += 1
+    counts[-1] += value
+
+
+def set_gauge(name: str, value: float, labels: Optional[dict] = None):
+    """Set a gauge to an absolute value."""
+    _gauges[(name, _labels(labels))] = (value, time.time())
+
+
+def max_gauge(name: str, value: float, labels: Optional[dict] = None):
+    """Raise a high-water-mark gauge if `value` exceeds it."""
+    key = (name, _labels(labels))
+    with _lock:
+        if value > _gauges.get(key, (0, 0))[0]:
+            _gauges[key] = (value, time.time())
+
+
+def _retire_finished():
+    """Fold shards of finished threads into _retired (caller holds _lock)."""
+    for shard in [s for s in _shards if not s.thread.is_alive()]:
+        _shards.remove(shard)
+        _merge_into(_retired.counters, _retired.histograms, shard)
+
+
+def _merge_into(counters: Dict[Key, float], histograms: Dict[Key, List[float]], shard: _Shard):
+    for key, value in dict(shard.counters).items():
+        counters[key] = counters.get(key, 0) + value
+    for key, counts in dict(shard.histograms).items():
+        counts = list(counts)
+        total = histograms.get(key)
+        if total is None or len(total) != len(counts):
+            histograms[key] = counts
+        else:
+            histograms[key] = [a + b for a, b in zip(total, counts)]
+
+
+def _local_totals() -> Tuple[Dict[Key, float], Dict[Key, List[float]]]:
+    """This process's counters and histograms, merged over all threads."""
+    counters: Dict[Key, float] = {}
+    histograms: Dict[Key, List[float]] = {}
+    with _lock:
+        _retire_finished()
+        shards = [_retired] + list(_shards)
+    for shard in shards:
+        _merge_into(counters, histograms, shard)
+    return counters, histograms
+
+
+def get(name: str, default: float = 0, labels: Optional[dict] = None) -> float:
+    """Return the current value of a counter or gauge in this process."""
+    key = (name, _labels(labels))
+    counters, _ = _local_totals()
+    if key in counters:
+        return counters[key]
+    gauge = _gauges.get(key)
+    return gauge[0] if gauge is not None else default
+
+
+def _flat_name(key: Key) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def snapshot() -> Dict[str, float]:
+    """Return a copy of every counter and gauge value in this process."""
+    counters, _ = _local_totals()
+    values = {_flat_name(k): v for k, v in counters.items()}
+    values.update({_flat_name(k): v for k, (v, _) in dict(_gauges).items()})
+    return values
+
+
+# --- Multi-process mode ---
+
+class _MmapFile:
+    """Append-only key -> (value, stamp) records in a memory-mapped file.
+
+    Layout: an 8-byte header holding the bytes in use, then records of
+    [key length: int32][utf-8 key, padded to 8 bytes][value: double]
+    [stamp: double].  Only the owning process writes; a record's value
+    is updated in place.
+    """
+
+    _INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a+b")
+        size = max(os.fstat(self._file.fileno()).st_size, self._INITIAL_SIZE)
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = struct.unpack_from("i", self._map, 0)[0] or 8
+        self._positions = {key: pos for key, _, _, pos in _records(self._map, self._used)}
+
+    def write(self, key: str, value: float, stamp: float):
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._append(key)
+        struct.pack_into("dd", self._map, pos, value, stamp)
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode()
+        padded = 4 + len(encoded) + (-(4 + len(encoded)) % 8)
+        needed = self._used + padded + 16
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        struct.pack_into(f"i{len(encoded)}s", self._map, self._used, len(encoded), encoded)
+        pos = self._used + padded
+        struct.pack_into("dd", self._map, pos, 0.0, 0.0)
+        self._used = needed
+        struct.pack_into("i", self._map, 0, self._used)
+        self._positions[key] = pos
+        return pos
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def _records(data, used: int) -> Iterator[Tuple[str, float, float, int]]:
+    """(key, value, stamp, value offset) for each record of an _MmapFile."""
+    pos = 8
+    while pos < used:
+        length = struct.unpack_from("i", data, pos)[0]
+        key = bytes(data[pos + 4:pos + 4 + length]).decode()
+        pos += 4 + length + (-(4 + length) % 8)
+        value, stamp = struct.unpack_from("dd", data, pos)
+        yield key, value, stamp, pos
+        pos += 16
+
+
+class _Multiprocess:
+    """Mirrors this process's metrics into <directory>/metrics_<pid>.db."""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+        self._file: Optional[_MmapFile] = None
+        self._thread: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the flusher in this process (again after a fork)."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._flush_lock:
+            if self._pid != os.getpid():
+                if self._pid is not None:
+                    _forget_inherited()
+                self._pid = os.getpid()
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = _MmapFile(os.path.join(self.directory, f"metrics_{self._pid}.db"))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        """Write this process's current totals to its file."""
+        if self._file is None or self._pid != os.getpid():
+            return
+        counters, histograms = _local_totals()
+        with self._flush_lock:
+            for (name, labels), value in counters.items():
+                self._file.write(json.dumps(["counter", name, labels]), value, 0.0)
+            for (name, labels), counts in histograms.items():
+                for i, value in enumerate(counts):
+                    self._file.write(json.dumps(["histogram", name, labels, i]), value, 0.0)
+            for (name, labels), (value, stamp) in dict(_gauges).items():
+                self._file.write(json.dumps(["gauge", name, labels]), value, stamp)
+
+    def collect(self):
+        """Counters, histograms and gauges added up over every worker's file."""
+        self.flush()
+        counters: Dict[Key, float] = {}
+        histograms: Dict[Key, List[float]] = {}
+        gauges: Dict[Key, Tuple[float, float]] = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, "metrics_*.db"))):
+            pid = int(os.path.basename(path)[len("metrics_"):-len(".db")])
+            alive = _pid_alive(pid)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < 8:
+                continue
+            for raw, value, stamp, _ in _records(data, struct.unpack_from("i", data, 0)[0]):
+                kind, name, labels, *index = json.loads(raw)
+                key = (name, tuple(tuple(pair) for pair in labels))
+                if kind == "counter":
+                    counters[key] = counters.get(key, 0) + value
+                elif kind == "histogram":
+                    size = len(_buckets(name)) + 2
+                    counts = histograms.setdefault(key, [0.0] * size)
+                    if index[0] < size:
+                        counts[index[0]] += value
+                else:
+                    _combine_gauge(gauges, key, value, stamp, alive)
+        return counters, histograms, gauges
+
+
+def _combine_gauge(gauges: dict, key: Key, value: float, stamp: float, alive: bool):
+    mode = _described.get(key[0], {}).get("mode", "sum")
+    current = gauges.get(key)
+    if mode == "sum":
+        if alive:
+            gauges[key] = ((current[0] if current else 0) + value, stamp)
+    elif mode == "max":
+        if current is None or value > current[0]:
+            gauges[key] = (value, stamp)
+    elif current is None or stamp > current[1]:
+        gauges[key] = (value, stamp)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _forget_inherited():
+    """Drop values copied from the parent at fork; they live in its file."""
+    with _lock:
+        _shards.clear()
+        _retired.counters.clear()
+        _retired.histograms.clear()
+        _gauges.clear()
+    _local.shard = None
+
+
+_multiprocess: Optional[_Multiprocess] = None
+
+
+def enable_multiprocess(directory: str, interval: float = 1.0):
+    """Aggregate across worker processes through mmap'd files in `directory`."""
+    global _multiprocess
+    if _multiprocess is None or _multiprocess.directory != directory:
+        _multiprocess = _Multiprocess(directory, interval)
+    _multiprocess.ensure_running()
+
+
+def ensure_multiprocess():
+    """Per-request hook: make sure this worker's flusher runs (no-op otherwise)."""
+    if _multiprocess is not None:
+        _multiprocess.ensure_running()
+
+
+@atexit.register
+def _flush_on_exit():
+    if _multiprocess is not None:
+        _multiprocess.flush()
+
+
+# --- Exposition ---
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _sample(name: str, labels: Labels, value: float, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    rendered = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+    if value == int(value) and abs(value) < 1e15:
+        return f"{name}{rendered} {int(value)}"
+    return f"{name}{rendered} {value!r}"
+
+
+def _format_le(bound: float) -> str:
+    return str(int(bound)) + ".0" if bound == int(bound) else repr(bound)
+
+
+def exposition() -> str:
+    """Every metric in the Prometheus text format (version 0.0.4)."""
+    if _multiprocess is not None:
+        counters, histograms, gauges = _multiprocess.collect()
+    else:
+        counters, histograms = _local_totals()
+        gauges = dict(_gauges)
+
+    families: Dict[str, Tuple[str, list]] = {}
+    for (name, labels), value in counters.items():
+        families.setdefault(name, ("counter", []))[1].append(_sample(name, labels, value))
+    for (name, labels), (value, _) in gauges.items():
+        families.setdefault(name, ("gauge", []))[1].append(_sample(name, labels, value))
+    for (name, labels), counts in histograms.items():
+        buckets = _buckets(name)
+        lines = families.setdefault(name, ("histogram", []))[1]
+        cumulative = 0
+        for bound, count in zip(buckets, counts):
+            cumulative += count
+            lines.append(_sample(f"{name}_bucket", labels, cumulative, (("le", _format_le(bound)),)))
+        total = cumulative + counts[len(buckets)]
+        lines.append(_sample(f"{name}_bucket", labels, total, (("le", "+Inf"),)))
+        lines.append(_sample(f"{name}_sum", labels, counts[-1]))
+        lines.append(_sample(f"{name}_count", labels, total))
+
+    out = []
+    for name in sorted(families):
+        kind, lines = families[name]
+        help_text = _described.get(name, {}).get("help")
+        if help_text:
+            out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(sorted(lines) if kind != "histogram" else lines)
+    return "\n".join(out) + "\n"
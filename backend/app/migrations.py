@@ -0,0 +1,100 @@
+"""In-place schema upgrades for existing databases.
+
+db.create_all() only creates tables that do not exist yet — it never
+touches a table that is already there.  upgrade_schema() fills that
+gap for additive changes so existing deployments pick them up on the
+next start without deleting the database file:
+
+  - Columns declared on a model but missing from its table are added
+    (they must be nullable or carry a server_default), and any data
+    backfill registered for them in _BACKFILLS is run.
+  - Indexes declared on a model but missing from its table are created.
+    An index whose columns or uniqueness no longer match the model
+    (e.g. a column appended to a composite index under the same name)
+    is dropped and rebuilt.  A unique index that existing data violates
+    is skipped with a warning.
+
+Destructive changes (dropping or retyping columns) are out of scope;
+use Alembic or Flask-Migrate for those.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
+
+from app.database import db
+
+logger = logging.getLogger("queuewise")
+
+# (table, column) -> SQL run once, right after the column is added
+_BACKFILLS = {
+    ("queues", "next_position"): (
+        "UPDATE queues SET next_position = 1 + COALESCE("
+        "(SELECT MAX(position) FROM queue_entries"
+        " WHERE queue_entries.queue_id = queues.id), 0)"
+    ),
+    ("queues", "waiting_count"): (
+        "UPDATE queues SET waiting_count = (SELECT COUNT(*) FROM queue_entries"
+        " WHERE queue_entries.queue_id = queues.id AND status = 'WAITING')"
+    ),
+    # archived_* columns come first in the table, so they already exist
+    ("queues", "served_count"): (
+        "UPDATE queues SET served_count = archived_served_count + (SELECT COUNT(*)"
+        " FROM queue_entries WHERE queue_entries.queue_id = queues.id AND status = 'SERVED')"
+    ),
+    ("queues", "skipped_count"): (
+        "UPDATE queues SET skipped_count = archived_skipped_count + (SELECT COUNT(*)"
+        " FROM queue_entries WHERE queue_entries.queue_id = queues.id AND status = 'SKIPPED')"
+    ),
+}
+
+
+def upgrade_schema() -> List[str]:
+    """Apply additive schema changes. Returns a description of each change."""
+    applied = []
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                    applied.append(f"add column {table.name}.{column.name}")
+                    backfill = _BACKFILLS.get((table.name, column.name))
+                    if backfill:
+                        conn.execute(text(backfill))
+
+            existing_indexes = {ix["name"]: ix for ix in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                action = "create"
+                found = existing_indexes.get(index.name)
+                if found is not None:
+                    if _index_matches(index, found):
+                        continue
+                    index.drop(bind=conn)
+                    action = "rebuild"
+                try:
+                    with conn.begin_nested():
+                        index.create(bind=conn)
+                except IntegrityError:
+                    logger.warning(
+                        "Skipping unique index %s: existing rows violate it", index.name
+                    )
+                    continue
+                applied.append(f"{action} index {index.name}")
+    return applied
+
+
+def _index_matches(index, reflected: dict) -> bool:
+    """Whether a database index has the model index's columns and uniqueness."""
+    return (
+        list(reflected["column_names"]) == [c.name for c in index.columns]
+        and bool(reflected.get("unique")) == bool(index.unique)
+    )
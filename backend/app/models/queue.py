@@ -26,6 +26,50 @@ class Queue(db.Model):
     created_at = db.Column(
         db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
+    # Bumped on every join/serve/skip/pause/resume — drives ETags
+    version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Bumped by every event insert (repo.add_events) — drives the
+    # timeline's ETag, which also changes on BLOCKED attempts
+    event_version = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Per-queue position sequence — see repo.allocate_positions()
+    next_position = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )
+
+    # Entries moved to queue_entries_archive (see app/retention.py)
+    archived_served_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    archived_skipped_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # Entries per status, archived ones included — changed in the same
+    # UPDATE as version (repo.bump_version), so summaries never count
+    # rows.  `python maintenance.py counters` checks and repairs them.
+    waiting_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    served_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    skipped_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # EWMA of seconds per person at the head of the line, updated by
+    # each serve (see app/estimator.py); NULL until the first sample
+    service_time_mean = db.Column(db.Float, nullable=True)
+    service_time_var = db.Column(
+        db.Float, nullable=False, default=0.0, server_default="0"
+    )
+    service_samples = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    # When the head of the line last moved (serve or skip)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
 
     # One queue has many entries
     entries = db.relationship(
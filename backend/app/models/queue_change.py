@@ -0,0 +1,32 @@
+"""QueueChange model — shared log of committed queue mutations.
+
+One row is appended in the same transaction as every successful
+mutation.  Each process tails the log (app/change_feed.py) to drop
+cached state and wake SSE subscribers for changes made by other
+gunicorn workers.  Rows are trimmed after CHANGE_LOG_RETENTION_SECONDS.
+"""
+
+from datetime import datetime, timezone
+
+from app.database import db
+
+
+class QueueChange(db.Model):
+    __tablename__ = "queue_changes"
+    __table_args__ = (
+        # Serves trimming of old rows
+        db.Index("ix_queue_changes_changed_at", "changed_at"),
+        # Never reuse a seq after trimming, or tailers would skip rows
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = db.Column(db.Integer, primary_key=True)
+    queue_id = db.Column(db.Integer, nullable=False)
+    # Process token of the writer, so a worker can skip its own changes
+    origin = db.Column(db.String(64), nullable=True)
+    changed_at = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self):
+        return f"<QueueChange #{self.seq} q={self.queue_id}>"
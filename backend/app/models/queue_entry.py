@@ -16,6 +16,12 @@ class EntryStatus(enum.Enum):
 
 class QueueEntry(db.Model):
     __tablename__ = "queue_entries"
+    __table_args__ = (
+        # Serves get_entries, next_position and the WAITING-slice lookups
+        db.Index("ix_queue_entries_queue_status_position", "queue_id", "status", "position"),
+        # Positions are handed out once per queue; concurrent joins must never collide
+        db.Index("uq_queue_entries_queue_position", "queue_id", "position", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     queue_id = db.Column(
@@ -29,6 +35,9 @@ class QueueEntry(db.Model):
     joined_at = db.Column(
         db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
+    # Set by the claim that moves the entry out of WAITING
+    served_at = db.Column(db.DateTime, nullable=True)
+    skipped_at = db.Column(db.DateTime, nullable=True)
 
     # Belongs to a queue
     queue = db.relationship("Queue", back_populates="entries")
@@ -0,0 +1,47 @@
+"""QueueEntryArchive model — SERVED/SKIPPED entries moved out of queue_entries.
+
+Terminal entries never change again, but left in queue_entries they
+widen every index and scan the live line uses.  The archival job
+(app/retention.py) moves them here in batches, keeping their original
+id and position, and adds them to the queue's archived_* counters so
+summary counts stay whole.  Read through GET /queues/<id>/history.
+"""
+
+from datetime import datetime, timezone
+
+from app.database import db
+from app.models.queue_entry import EntryStatus
+
+
+class QueueEntryArchive(db.Model):
+    __tablename__ = "queue_entries_archive"
+    __table_args__ = (
+        # Serves the history pages (keyset on position, optional status)
+        db.Index("ix_queue_entries_archive_queue_position", "queue_id", "position"),
+        db.Index("ix_queue_entries_archive_queue_status_position", "queue_id", "status", "position"),
+        # Time-range reads of the analytics endpoint
+        db.Index("ix_queue_entries_archive_queue_joined", "queue_id", "joined_at"),
+        db.Index("ix_queue_entries_archive_queue_served", "queue_id", "served_at"),
+        db.Index("ix_queue_entries_archive_queue_skipped", "queue_id", "skipped_at"),
+    )
+
+    # The entry's id in queue_entries, kept so references stay valid
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    queue_id = db.Column(
+        db.Integer, db.ForeignKey("queues.id"), nullable=False
+    )
+    user_name = db.Column(db.String(120), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.Enum(EntryStatus), nullable=False)
+    joined_at = db.Column(db.DateTime, nullable=False)
+    served_at = db.Column(db.DateTime, nullable=True)
+    skipped_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(
+        db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self):
+        return (
+            f"<QueueEntryArchive {self.id}: {self.user_name} "
+            f"pos={self.position} status={self.status.value}>"
+        )
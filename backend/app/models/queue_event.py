@@ -2,6 +2,8 @@
 
 Stores structured events for each queue action (JOIN, SERVE, SKIP, etc.).
 Read from the /events endpoint — never modifies business logic.
+Rows older than their action's TTL are rolled up into
+QueueEventRollup and archived by app/retention.py.
 """
 
 from datetime import datetime, timezone
@@ -11,10 +13,21 @@ from app.database import db
 
 class QueueEvent(db.Model):
     __tablename__ = "queue_events"
+    __table_args__ = (
+        # Serves the timeline (filter by queue, keyset on created_at, id)
+        db.Index("ix_queue_events_queue_created", "queue_id", "created_at", "id"),
+        # Timeline filtered by ?action= / ?result=
+        db.Index("ix_queue_events_queue_action_created", "queue_id", "action", "created_at"),
+        db.Index("ix_queue_events_queue_result_created", "queue_id", "result", "created_at"),
+        # Tracing a request across queues (?request_id=)
+        db.Index("ix_queue_events_request_id", "request_id"),
+        # Retention sweep: expired rows of one action, oldest first
+        db.Index("ix_queue_events_action_created", "action", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     queue_id = db.Column(
-        db.Integer, db.ForeignKey("queues.id"), nullable=False, index=True
+        db.Integer, db.ForeignKey("queues.id"), nullable=False
     )
     action = db.Column(db.String(50), nullable=False)
     result = db.Column(db.String(50), nullable=False)
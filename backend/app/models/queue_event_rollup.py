@@ -0,0 +1,31 @@
+"""QueueEventRollup model — hourly event counts kept after raw rows expire.
+
+When the retention job (app/retention.py) deletes expired QueueEvent
+rows it adds them here first, one row per queue, hour, action and
+result, so long-range activity counts survive the raw timeline.
+"""
+
+from app.database import db
+
+
+class QueueEventRollup(db.Model):
+    __tablename__ = "queue_event_rollups"
+
+    queue_id = db.Column(db.Integer, db.ForeignKey("queues.id"), primary_key=True)
+    # Start of the UTC hour the events were created in
+    hour = db.Column(db.DateTime, primary_key=True)
+    action = db.Column(db.String(50), primary_key=True)
+    result = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<QueueEventRollup q={self.queue_id} {self.hour} {self.action} {self.result}={self.count}>"
+
+    def to_dict(self):
+        return {
+            "queue_id": self.queue_id,
+            "hour": self.hour.isoformat() if self.hour else None,
+            "action": self.action,
+            "result": self.result,
+            "count": self.count,
+        }
@@ -0,0 +1,92 @@
+"""In-process publish/subscribe for queue change notifications.
+
+log_event() announces every SUCCESS action on a queue.  Because the
+action and its event commit together (repo.unit_of_work), the
+announcement is deferred with repo.on_commit and only published once
+the transaction commits — subscribers never see state that is later
+rolled back.  A rollback discards it.
+
+Each queue has a monotonically increasing sequence number.  A
+subscriber does not get a backlog of messages: it is woken up with the
+latest sequence number and re-reads whatever it needs, so bursts of
+changes coalesce into one update.  The SSE endpoint
+(GET /queues/<id>/stream) is the main consumer.  Sequence numbers are
+per process and start at 0, so they are never sent to clients; the
+stream uses the persisted queue version as its event id.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+
+from flask import current_app
+
+from app.repositories import queue_repository as repo
+
+
+class Subscription:
+    """One listener's view of a queue: wakes up on each new sequence number."""
+
+    def __init__(self, queue_id: int, seq: int):
+        self.queue_id = queue_id
+        self.seq = seq
+        self._changed = threading.Event()
+
+    def _notify(self, seq: int):
+        self.seq = seq
+        self._changed.set()
+
+    def wait(self, timeout: float) -> Optional[int]:
+        """Block until the queue changes; return its sequence number or None on timeout."""
+        if not self._changed.wait(timeout):
+            return None
+        self._changed.clear()
+        return self.seq
+
+
+class QueueBroker:
+    """Fans out queue change notifications to every subscriber in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq: Dict[int, int] = {}
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+
+    def current(self, queue_id: int) -> int:
+        """Latest sequence number published for a queue (0 if none)."""
+        return self._seq.get(queue_id, 0)
+
+    def publish(self, queue_id: int) -> int:
+        """Announce that a queue changed. Returns its new sequence number."""
+        with self._lock:
+            seq = self._seq.get(queue_id, 0) + 1
+            self._seq[queue_id] = seq
+            subscribers = list(self._subscribers.get(queue_id, ()))
+        for sub in subscribers:
+            sub._notify(seq)
+        return seq
+
+    @contextmanager
+    def subscribe(self, queue_id: int) -> Iterator[Subscription]:
+        """Register a subscriber for the duration of the `with` block."""
+        with self._lock:
+            sub = Subscription(queue_id, self._seq.get(queue_id, 0))
+            self._subscribers.setdefault(queue_id, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(queue_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[queue_id]
+
+    def subscriber_count(self, queue_id: int) -> int:
+        return len(self._subscribers.get(queue_id, ()))
+
+
+def notify_queue_changed(queue_id: int):
+    """Publish a change for `queue_id` once the current transaction commits."""
+    broker = current_app.extensions["queuewise_broker"]
+    repo.on_commit(lambda: broker.publish(queue_id))
@@ -4,24 +4,118 @@ No business logic lives here.  Every function either reads from
 or writes to the database via SQLAlchemy.
 """
 
-from typing import List, Optional
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, or_, select, union_all, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.database import db
 from app.models.queue import Queue, QueueStatus
+from app.models.queue_change import QueueChange
 from app.models.queue_entry import EntryStatus, QueueEntry
+from app.models.queue_entry_archive import QueueEntryArchive
 from app.models.queue_event import QueueEvent
+from app.models.queue_event_rollup import QueueEventRollup
 
 
 def list_all_queues() -> List[Queue]:
-    """Return all queues ordered by creation time."""
-    return Queue.query.order_by(Queue.created_at.desc()).all()
+    """Return all queues, newest first.
+
+    One statement: entry counts are maintained on the queue row, so the
+    cost does not depend on how many entries the queues have had.
+    """
+    return Queue.query.order_by(Queue.created_at.desc(), Queue.id.desc()).all()
+
+
+# --- Unit of work ---
+
+_UOW_DEPTH = "queuewise_uow_depth"
+
+
+@contextmanager
+def unit_of_work() -> Iterator[None]:
+    """Group several repository writes into a single transaction.
+
+    Inside the block, write helpers flush instead of committing, so
+    generated IDs are still available.  The outermost block commits
+    once on success and rolls back on any exception.  Nesting is safe.
+    """
+    info = db.session.info
+    info[_UOW_DEPTH] = info.get(_UOW_DEPTH, 0) + 1
+    try:
+        yield
+        if info[_UOW_DEPTH] == 1:
+            db.session.commit()
+    except Exception:
+        if info[_UOW_DEPTH] == 1:
+            db.session.rollback()
+        raise
+    finally:
+        info[_UOW_DEPTH] -= 1
+
+
+def _commit():
+    """Commit now, or just flush if a unit of work is open."""
+    if db.session.info.get(_UOW_DEPTH, 0):
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+_ON_COMMIT = "queuewise_on_commit"
+
+
+def on_commit(callback: Callable[[], None]) -> None:
+    """Run `callback` after the current transaction commits.
+
+    Callbacks run in registration order and are discarded on rollback.
+    Outside a transaction the callback runs immediately.
+    """
+    session = db.session()
+    if session.in_transaction():
+        session.info.setdefault(_ON_COMMIT, []).append(callback)
+    else:
+        callback()
+
+
+_ON_ROLLBACK = "queuewise_on_rollback"
+
+
+def on_rollback(callback: Callable[[], None]) -> None:
+    """Run `callback` if the current transaction rolls back (on_commit's counterpart).
+
+    Callbacks are discarded on commit.  Outside a transaction nothing
+    can roll back, so the callback is dropped.
+    """
+    session = db.session()
+    if session.in_transaction():
+        session.info.setdefault(_ON_ROLLBACK, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session):
+    session.info.pop(_ON_ROLLBACK, None)
+    for callback in session.info.pop(_ON_COMMIT, ()):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_commit(session):
+    session.info.pop(_ON_COMMIT, None)
+    for callback in session.info.pop(_ON_ROLLBACK, ()):
+        callback()
 
 
 def create_queue(name: str) -> Queue:
     """Insert a new queue and return it."""
     queue = Queue(name=name)
     db.session.add(queue)
-    db.session.commit()
+    _commit()
     return queue
 
 
@@ -30,6 +124,93 @@ def get_queue(queue_id: int) -> Optional[Queue]:
     return db.session.get(Queue, queue_id)
 
 
+def get_queue_version(queue_id: int) -> Optional[int]:
+    """Return a queue's version with a single primary-key lookup."""
+    return db.session.execute(
+        select(Queue.version).where(Queue.id == queue_id)
+    ).scalar_one_or_none()
+
+
+def get_queues_fingerprint() -> Tuple[int, int, int]:
+    """Return (count, sum of versions, max id) over all queues.
+
+    Changes whenever a queue is created or any queue's version is
+    bumped, without touching queue_entries.
+    """
+    count, versions, max_id = db.session.execute(
+        select(
+            func.count(Queue.id),
+            func.coalesce(func.sum(Queue.version), 0),
+            func.coalesce(func.max(Queue.id), 0),
+        )
+    ).one()
+    return count, versions, max_id
+
+
+def bump_version(queue_id: int, waiting: int = 0, served: int = 0, skipped: int = 0,
+                 estimate: Optional[Dict[str, object]] = None) -> Optional[int]:
+    """Atomically increment a queue's version and adjust its status counters.
+
+    One UPDATE, part of the caller's transaction, so the counters move
+    together with the entries they count.  `estimate` holds further
+    column values for the same statement (the service clock and EWMA
+    built by app.estimator).  Returns the new waiting_count
+    (RETURNING), or None if the queue is gone.
+    """
+    values = {"version": Queue.version + 1, **(estimate or {})}
+    if waiting:
+        values["waiting_count"] = Queue.waiting_count + waiting
+    if served:
+        values["served_count"] = Queue.served_count + served
+    if skipped:
+        values["skipped_count"] = Queue.skipped_count + skipped
+    waiting_count = db.session.execute(
+        update(Queue)
+        .where(Queue.id == queue_id)
+        .values(**values)
+        .returning(Queue.waiting_count)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    _commit()
+    return waiting_count
+
+
+def record_change(queue_id: int, origin: Optional[str]) -> None:
+    """Append a row to the shared change log (part of the caller's transaction)."""
+    db.session.execute(insert(QueueChange).values(queue_id=queue_id, origin=origin))
+    _commit()
+
+
+def get_latest_change_seq() -> int:
+    """Return the newest change-log sequence number (0 if empty)."""
+    return db.session.execute(select(func.max(QueueChange.seq))).scalar() or 0
+
+
+def get_changes_since(seq: int, also: Iterable[int] = (),
+                      limit: int = 500) -> List[Tuple[int, int, Optional[str], datetime]]:
+    """Return (seq, queue_id, origin, changed_at) rows after `seq`, oldest first.
+
+    Rows whose seq is in `also` are returned too, even if below `seq`
+    (gaps the caller is still waiting on).
+    """
+    after = QueueChange.seq > seq
+    also = list(also)
+    rows = db.session.execute(
+        select(QueueChange.seq, QueueChange.queue_id, QueueChange.origin, QueueChange.changed_at)
+        .where(or_(after, QueueChange.seq.in_(also)) if also else after)
+        .order_by(QueueChange.seq)
+        .limit(limit)
+    ).all()
+    return [tuple(r) for r in rows]
+
+
+def trim_changes(before: datetime) -> int:
+    """Delete change-log rows older than `before`. Returns the row count."""
+    result = db.session.execute(delete(QueueChange).where(QueueChange.changed_at < before))
+    db.session.commit()
+    return result.rowcount
+
+
 def get_entries(queue_id: int) -> List[QueueEntry]:
     """Return all entries for a queue, ordered by position."""
     return (
@@ -40,15 +221,95 @@ def get_entries(queue_id: int) -> List[QueueEntry]:
     )
 
 
-def next_position(queue_id: int) -> int:
-    """Calculate the next available position number."""
-    last = (
+def get_waiting_entries(queue_id: int, limit: Optional[int] = None) -> List[QueueEntry]:
+    """Return only the WAITING entries for a queue, ordered by position.
+
+    Terminal (SERVED/SKIPPED) history is never loaded, so the cost
+    tracks the number of people waiting rather than the queue's age.
+    """
+    query = (
         QueueEntry.query
-        .filter_by(queue_id=queue_id)
-        .order_by(QueueEntry.position.desc())
-        .first()
+        .filter_by(queue_id=queue_id, status=EntryStatus.WAITING)
+        .order_by(QueueEntry.position)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_entries_page(queue_id: int, after_position: int = 0, limit: int = 100,
+                     status: Optional[EntryStatus] = None) -> List[QueueEntry]:
+    """Return up to `limit` entries with position > `after_position`, by position.
+
+    Keyset pagination: the (queue_id, position) or (queue_id, status,
+    position) index seeks straight to the page, so any page costs the
+    same however long the queue is.
+    """
+    query = QueueEntry.query.filter(
+        QueueEntry.queue_id == queue_id, QueueEntry.position > after_position
+    )
+    if status is not None:
+        query = query.filter(QueueEntry.status == status)
+    return query.order_by(QueueEntry.position).limit(limit).all()
+
+
+def count_waiting_before(queue_id: int, position: int) -> int:
+    """Count WAITING entries ahead of `position` (index range count)."""
+    return db.session.execute(
+        select(func.count()).select_from(QueueEntry).where(
+            QueueEntry.queue_id == queue_id,
+            QueueEntry.status == EntryStatus.WAITING,
+            QueueEntry.position <= position,
+        )
+    ).scalar_one()
+
+
+def find_waiting_entries(queue_id: int, user_name: str) -> List[QueueEntry]:
+    """Return WAITING entries for `user_name` in a queue (normally 0 or 1)."""
+    return (
+        QueueEntry.query
+        .filter_by(queue_id=queue_id, status=EntryStatus.WAITING, user_name=user_name)
+        .all()
     )
-    return (last.position + 1) if last else 1
+
+
+def find_waiting_names(queue_id: int, user_names: List[str]) -> set:
+    """Return which of `user_names` are already WAITING in a queue (one query)."""
+    if not user_names:
+        return set()
+    return set(db.session.execute(
+        select(QueueEntry.user_name).where(
+            QueueEntry.queue_id == queue_id,
+            QueueEntry.status == EntryStatus.WAITING,
+            QueueEntry.user_name.in_(set(user_names)),
+        )
+    ).scalars())
+
+
+def next_position(queue_id: int) -> int:
+    """Peek at the position the next join would get (no allocation)."""
+    return db.session.execute(
+        select(Queue.next_position).where(Queue.id == queue_id)
+    ).scalar_one()
+
+
+def allocate_positions(queue_id: int, count: int = 1) -> int:
+    """Atomically reserve `count` consecutive positions; return the first.
+
+    A single UPDATE ... RETURNING increments the queue's counter, so
+    concurrent joins (threads or gunicorn workers) serialize on the
+    queue row and can never receive the same position.  The increment
+    rolls back with the surrounding transaction, keeping positions
+    gap-free.
+    """
+    end = db.session.execute(
+        update(Queue)
+        .where(Queue.id == queue_id)
+        .values(next_position=Queue.next_position + count)
+        .returning(Queue.next_position)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    return end - count
 
 
 def add_entry(queue_id: int, user_name: str, position: int) -> QueueEntry:
@@ -59,27 +320,104 @@ def add_entry(queue_id: int, user_name: str, position: int) -> QueueEntry:
         position=position,
     )
     db.session.add(entry)
-    db.session.commit()
+    _commit()
     return entry
 
 
+def add_entries(queue_id: int, user_names: List[str], first_position: int) -> List[tuple]:
+    """Bulk-insert WAITING entries at consecutive positions from `first_position`.
+
+    Rows go out as multi-row INSERT ... RETURNING statements; returns
+    (id, position, joined_at) per name, in input order.  Order is
+    restored from the (unique) positions, which lets SQLAlchemy batch
+    the rows instead of inserting one at a time to keep RETURNING order.
+    """
+    rows = [
+        {"queue_id": queue_id, "user_name": name, "position": first_position + i}
+        for i, name in enumerate(user_names)
+    ]
+    created = db.session.execute(
+        insert(QueueEntry).returning(QueueEntry.id, QueueEntry.position, QueueEntry.joined_at),
+        rows,
+    ).all()
+    _commit()
+    return sorted((tuple(r) for r in created), key=lambda r: r[1])
+
+
 def get_entry(entry_id: int) -> Optional[QueueEntry]:
     """Find an entry by primary key."""
     return db.session.get(QueueEntry, entry_id)
 
 
-def mark_served(entry: QueueEntry) -> QueueEntry:
-    """Update an entry's status to SERVED."""
-    entry.status = EntryStatus.SERVED
-    db.session.commit()
-    return entry
+def release_session():
+    """End the current read transaction and forget loaded objects.
 
+    Long-lived readers (the SSE stream) call this between reads so they
+    neither hold a transaction open while idle nor see stale objects
+    from the identity map.
+    """
+    db.session.close()
 
-def mark_skipped(entry: QueueEntry) -> QueueEntry:
-    """Update an entry's status to SKIPPED."""
-    entry.status = EntryStatus.SKIPPED
-    db.session.commit()
-    return entry
+
+def refresh(obj):
+    """Reload an object's attributes from the database."""
+    db.session.refresh(obj)
+    return obj
+
+
+def _claimed_at(status: EntryStatus, at: datetime) -> dict:
+    """served_at / skipped_at value for a claim to `status`."""
+    return {"served_at" if status == EntryStatus.SERVED else "skipped_at": at}
+
+
+def claim_entry(entry: QueueEntry, status: EntryStatus, at: Optional[datetime] = None) -> bool:
+    """Atomically move a WAITING entry to `status`, stamping served_at/skipped_at.
+
+    Issues UPDATE ... WHERE id = :id AND status = 'WAITING' and checks
+    the rowcount, so when two operators race for the same entry exactly
+    one of them wins.  Returns False if the entry was no longer WAITING.
+    """
+    stamp = _claimed_at(status, at or datetime.now(timezone.utc))
+    result = db.session.execute(
+        update(QueueEntry)
+        .where(QueueEntry.id == entry.id, QueueEntry.status == EntryStatus.WAITING)
+        .values(status=status, **stamp)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    set_committed_value(entry, "status", status)
+    for column, value in stamp.items():
+        set_committed_value(entry, column, value)
+    _commit()
+    return True
+
+
+def claim_next_waiting(queue_id: int, status: EntryStatus, count: int,
+                       at: Optional[datetime] = None) -> List[tuple]:
+    """Atomically move the first `count` WAITING entries to `status`.
+
+    A single UPDATE ... WHERE id IN (first N WAITING by position) AND
+    status = 'WAITING' RETURNING, so concurrent operators never claim
+    the same entry.  Returns (id, user_name, position) for each claimed
+    entry in position order — fewer than `count` if fewer were waiting.
+    """
+    head = (
+        select(QueueEntry.id)
+        .where(QueueEntry.queue_id == queue_id, QueueEntry.status == EntryStatus.WAITING)
+        .order_by(QueueEntry.position)
+        .limit(count)
+        .scalar_subquery()
+    )
+    claimed = db.session.execute(
+        update(QueueEntry)
+        .where(QueueEntry.id.in_(head), QueueEntry.status == EntryStatus.WAITING)
+        .values(status=status, **_claimed_at(status, at or datetime.now(timezone.utc)))
+        .returning(QueueEntry.id, QueueEntry.user_name, QueueEntry.position)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _commit()
+    return sorted((tuple(r) for r in claimed), key=lambda r: r[2])
 
 
 # --- Queue state management ---
@@ -87,7 +425,7 @@ def mark_skipped(entry: QueueEntry) -> QueueEntry:
 def set_queue_status(queue: Queue, status: QueueStatus) -> Queue:
     """Update a queue's operational status (ACTIVE/PAUSED)."""
     queue.status = status
-    db.session.commit()
+    _commit()
     return queue
 
 
@@ -104,16 +442,419 @@ def add_event(queue_id: int, action: str, result: str,
         request_id=request_id,
     )
     db.session.add(event)
-    db.session.commit()
+    _commit()
     return event
 
 
-def get_events(queue_id: int, limit: int = 50) -> List[QueueEvent]:
-    """Return recent events for a queue, newest first."""
-    return (
+def _insert_events(rows: List[dict], counted: List[dict]) -> None:
+    """Insert event rows; bump event_version of each queue in `counted`."""
+    db.session.execute(insert(QueueEvent), rows)
+    for queue_id, n in Counter(row["queue_id"] for row in counted).items():
+        db.session.execute(
+            update(Queue).where(Queue.id == queue_id)
+            .values(event_version=Queue.event_version + n)
+        )
+
+
+def add_events(rows: List[dict]) -> None:
+    """Bulk-insert event rows (dicts of QueueEvent columns) in one statement."""
+    if not rows:
+        return
+    _insert_events(rows, rows)
+    _commit()
+
+
+def add_events_in_savepoint(rows: List[dict], counted: List[dict]) -> bool:
+    """add_events() inside a SAVEPOINT; False (and nothing written) if it fails.
+
+    A failed insert is rolled back to the savepoint, so the caller's
+    transaction and the rest of its unit of work stay usable.  Only
+    `counted` rows bump event_version: the others describe a change
+    whose version bump (bump_version) is in this transaction already.
+    """
+    if not rows:
+        return True
+    try:
+        with db.session.begin_nested():
+            _insert_events(rows, counted)
+    except SQLAlchemyError:
+        return False
+    _commit()
+    return True
+
+
+def get_event_versions(queue_id: int) -> Optional[Tuple[int, int]]:
+    """Return a queue's (version, event_version) with a single primary-key lookup."""
+    row = db.session.execute(
+        select(Queue.version, Queue.event_version).where(Queue.id == queue_id)
+    ).one_or_none()
+    return tuple(row) if row is not None else None
+
+
+# --- Multi-queue reads (dashboard) ---
+
+def get_queues(queue_ids: List[int]) -> List[Queue]:
+    """Return the queues with the given ids (missing ids are skipped)."""
+    return Queue.query.filter(Queue.id.in_(queue_ids)).all()
+
+
+def get_waiting_edges(queue_ids: List[int], head: int) -> Dict[int, Tuple[List[QueueEntry], Optional[QueueEntry]]]:
+    """Return {queue_id: (first `head` WAITING entries, last WAITING entry)}.
+
+    One UNION ALL statement with two index-seeking LIMIT branches per
+    queue, so the cost does not depend on how many people are waiting.
+    """
+    branches = []
+    for queue_id in queue_ids:
+        waiting = select(QueueEntry.id).where(
+            QueueEntry.queue_id == queue_id, QueueEntry.status == EntryStatus.WAITING
+        )
+        branches.append(select(waiting.order_by(QueueEntry.position).limit(head).subquery()))
+        branches.append(select(waiting.order_by(QueueEntry.position.desc()).limit(1).subquery()))
+    ids = union_all(*branches).subquery()
+    entries = (
+        QueueEntry.query
+        .filter(QueueEntry.id.in_(select(ids.c.id)))
+        .order_by(QueueEntry.queue_id, QueueEntry.position)
+        .all()
+    )
+    grouped: Dict[int, List[QueueEntry]] = {qid: [] for qid in queue_ids}
+    for entry in entries:
+        grouped[entry.queue_id].append(entry)
+    return {
+        qid: (rows[:head], rows[-1] if rows else None)
+        for qid, rows in grouped.items()
+    }
+
+
+def get_latest_events_for(queue_ids: List[int], per_queue: int) -> Dict[int, List[QueueEvent]]:
+    """Return {queue_id: newest `per_queue` events, newest first} with one query.
+
+    One UNION ALL statement with an ORDER BY ... LIMIT branch per queue,
+    each a short backwards seek on the (queue_id, created_at, id) index,
+    so the cost does not depend on how many events a queue has.
+    """
+    branches = [
+        select(
+            select(QueueEvent.id)
+            .where(QueueEvent.queue_id == queue_id)
+            .order_by(QueueEvent.created_at.desc(), QueueEvent.id.desc())
+            .limit(per_queue)
+            .subquery()
+        )
+        for queue_id in queue_ids
+    ]
+    ids = union_all(*branches).subquery()
+    events = (
         QueueEvent.query
-        .filter_by(queue_id=queue_id)
-        .order_by(QueueEvent.created_at.desc())
-        .limit(limit)
+        .filter(QueueEvent.id.in_(select(ids.c.id)))
+        .order_by(QueueEvent.queue_id, QueueEvent.created_at.desc(), QueueEvent.id.desc())
         .all()
     )
+    grouped: Dict[int, List[QueueEvent]] = {qid: [] for qid in queue_ids}
+    for event_row in events:
+        grouped[event_row.queue_id].append(event_row)
+    return grouped
+
+
+def _events_query(queue_id: int, filters: dict, after: Optional[Tuple[datetime, int]],
+                  ascending: bool, columns=None):
+    """Build the keyset timeline query shared by get_events and iter_events.
+
+    `filters` may hold action, result, request_id, since and until.
+    `after` is the (created_at, id) of the last row already returned;
+    rows strictly beyond it in the chosen direction come next.
+    """
+    query = select(*(columns or [QueueEvent])).where(QueueEvent.queue_id == queue_id)
+    for name in ("action", "result", "request_id"):
+        if filters.get(name) is not None:
+            query = query.where(getattr(QueueEvent, name) == filters[name])
+    if filters.get("since") is not None:
+        query = query.where(QueueEvent.created_at >= filters["since"])
+    if filters.get("until") is not None:
+        query = query.where(QueueEvent.created_at < filters["until"])
+    if after is not None:
+        created_at, event_id = after
+        if ascending:
+            query = query.where(or_(
+                QueueEvent.created_at > created_at,
+                and_(QueueEvent.created_at == created_at, QueueEvent.id > event_id),
+            ))
+        else:
+            query = query.where(or_(
+                QueueEvent.created_at < created_at,
+                and_(QueueEvent.created_at == created_at, QueueEvent.id < event_id),
+            ))
+    if ascending:
+        return query.order_by(QueueEvent.created_at, QueueEvent.id)
+    return query.order_by(QueueEvent.created_at.desc(), QueueEvent.id.desc())
+
+
+def get_events(queue_id: int, limit: int = 50, filters: Optional[dict] = None,
+               after: Optional[Tuple[datetime, int]] = None,
+               ascending: bool = False) -> List[QueueEvent]:
+    """Return one page of a queue's events, newest first unless `ascending`.
+
+    Ties on created_at are broken by id, so paging with `after` never
+    skips or repeats a row.
+    """
+    query = _events_query(queue_id, filters or {}, after, ascending)
+    return db.session.execute(query.limit(limit)).scalars().all()
+
+
+_EVENT_COLUMNS = ("id", "queue_id", "action", "result", "detail", "request_id", "created_at")
+
+
+def iter_events(queue_id: int, filters: Optional[dict] = None, ascending: bool = False,
+                batch_size: int = 1000) -> Iterator[dict]:
+    """Yield every matching event as a dict, reading `batch_size` rows at a time.
+
+    Plain column rows (no ORM objects) are fetched one keyset page at a
+    time and the session is released between pages, so memory stays
+    constant however many events there are.
+    """
+    columns = [QueueEvent.__table__.c[name] for name in _EVENT_COLUMNS]
+    after = None
+    while True:
+        rows = db.session.execute(
+            _events_query(queue_id, filters or {}, after, ascending, columns).limit(batch_size)
+        ).all()
+        db.session.close()
+        for row in rows:
+            yield dict(zip(_EVENT_COLUMNS, row))
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].created_at, rows[-1].id)
+
+
+
+# --- Event retention ---
+
+def get_event_actions() -> List[str]:
+    """Return every distinct event action (a skip-scan of the action index)."""
+    return db.session.execute(select(QueueEvent.action).distinct()).scalars().all()
+
+
+def count_expired_events(action: str, before: datetime) -> int:
+    """Count events of `action` created before `before`."""
+    return db.session.execute(
+        select(func.count(QueueEvent.id))
+        .where(QueueEvent.action == action, QueueEvent.created_at < before)
+    ).scalar_one()
+
+
+def delete_expired_events(action: str, before: datetime, limit: int) -> List[dict]:
+    """Delete up to `limit` of the oldest `action` events created before `before`.
+
+    Returns the deleted rows as column dicts (DELETE ... RETURNING), so
+    the caller archives exactly what this transaction removed.  Not
+    committed: the caller commits once the rows are archived.
+    """
+    columns = [QueueEvent.__table__.c[name] for name in _EVENT_COLUMNS]
+    expired = (
+        select(QueueEvent.id)
+        .where(QueueEvent.action == action, QueueEvent.created_at < before)
+        .order_by(QueueEvent.created_at)
+        .limit(limit)
+    )
+    rows = db.session.execute(
+        delete(QueueEvent).where(QueueEvent.id.in_(expired)).returning(*columns),
+        execution_options={"synchronize_session": False},
+    ).all()
+    return sorted((dict(zip(_EVENT_COLUMNS, row)) for row in rows), key=lambda r: r["id"])
+
+
+def add_event_rollups(counts: Dict[Tuple[int, datetime, str, str], int]):
+    """Add (queue_id, hour, action, result) -> count to the hourly rollups.
+
+    One multi-row upsert; existing buckets are incremented.  Not committed.
+    """
+    if not counts:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    stmt = upsert(QueueEventRollup).values([
+        {"queue_id": queue_id, "hour": hour, "action": action, "result": result, "count": count}
+        for (queue_id, hour, action, result), count in counts.items()
+    ])
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=["queue_id", "hour", "action", "result"],
+        set_={"count": QueueEventRollup.count + stmt.excluded["count"]},
+    ))
+
+
+def get_event_rollups(queue_id: int) -> List[QueueEventRollup]:
+    """Return a queue's hourly rollups, oldest hour first."""
+    return db.session.execute(
+        select(QueueEventRollup)
+        .where(QueueEventRollup.queue_id == queue_id)
+        .order_by(QueueEventRollup.hour, QueueEventRollup.action, QueueEventRollup.result)
+    ).scalars().all()
+
+
+# --- Entry archival ---
+
+_TERMINAL = (EntryStatus.SERVED, EntryStatus.SKIPPED)
+_ENTRY_COLUMNS = (
+    "id", "queue_id", "user_name", "position", "status", "joined_at", "served_at", "skipped_at",
+)
+
+
+def _archivable(before: datetime):
+    return select(QueueEntry.id).where(
+        QueueEntry.status.in_(_TERMINAL), QueueEntry.joined_at < before
+    )
+
+
+def count_archivable_entries(before: datetime) -> int:
+    """Count terminal entries that joined before `before`."""
+    return db.session.execute(
+        select(func.count()).select_from(_archivable(before).subquery())
+    ).scalar_one()
+
+
+def archive_terminal_entries(before: datetime, limit: int) -> List[dict]:
+    """Move up to `limit` terminal entries that joined before `before` to the archive.
+
+    Deletes them from queue_entries (DELETE ... RETURNING), inserts them
+    into queue_entries_archive and adds them to each queue's archived_*
+    counters.  The candidates are found by walking the primary key from
+    the oldest row, where expired entries sit, so no extra index on the
+    hot table is needed.  Not committed.  Returns the moved rows.
+    """
+    columns = [QueueEntry.__table__.c[name] for name in _ENTRY_COLUMNS]
+    rows = db.session.execute(
+        delete(QueueEntry)
+        .where(QueueEntry.id.in_(_archivable(before).order_by(QueueEntry.id).limit(limit)))
+        .returning(*columns),
+        execution_options={"synchronize_session": False},
+    ).all()
+    if not rows:
+        return []
+    moved = [dict(zip(_ENTRY_COLUMNS, row)) for row in rows]
+    db.session.execute(insert(QueueEntryArchive), moved)
+
+    counts: Dict[int, Dict[EntryStatus, int]] = {}
+    for row in moved:
+        by_status = counts.setdefault(row["queue_id"], {})
+        by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+    for queue_id, by_status in counts.items():
+        db.session.execute(
+            update(Queue).where(Queue.id == queue_id).values(
+                archived_served_count=Queue.archived_served_count + by_status.get(EntryStatus.SERVED, 0),
+                archived_skipped_count=Queue.archived_skipped_count + by_status.get(EntryStatus.SKIPPED, 0),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+    return moved
+
+
+def get_archived_entries_page(queue_id: int, after_position: int = 0, limit: int = 100,
+                              status: Optional[EntryStatus] = None) -> List[QueueEntryArchive]:
+    """Return up to `limit` archived entries with position > `after_position`, by position."""
+    query = select(QueueEntryArchive).where(
+        QueueEntryArchive.queue_id == queue_id, QueueEntryArchive.position > after_position
+    )
+    if status is not None:
+        query = query.where(QueueEntryArchive.status == status)
+    return db.session.execute(
+        query.order_by(QueueEntryArchive.position).limit(limit)
+    ).scalars().all()
+
+
+# --- Analytics ---
+
+def iter_entry_times(queue_id: int, start: datetime, end: datetime, lookback: timedelta,
+                     chunk_size: int = 10000) -> Iterator[List[tuple]]:
+    """Stream (joined_at, served_at, skipped_at) for a queue's entries in chunks.
+
+    Covers entries that joined in [start, end) or were served/skipped
+    in [start - lookback, end), live and archived.  Rows are fetched
+    `chunk_size` at a time and never become ORM objects.
+    """
+    for model in (QueueEntry, QueueEntryArchive):
+        query = (
+            select(model.joined_at, model.served_at, model.skipped_at)
+            .where(
+                model.queue_id == queue_id,
+                or_(
+                    and_(model.joined_at >= start, model.joined_at < end),
+                    and_(model.served_at >= start - lookback, model.served_at < end),
+                    and_(model.skipped_at >= start - lookback, model.skipped_at < end),
+                ),
+            )
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in db.session.execute(query).partitions():
+            yield rows
+
+
+# --- Counter consistency ---
+
+def _count_of(model, status: EntryStatus):
+    return (
+        select(func.count()).select_from(model)
+        .where(model.queue_id == Queue.id, model.status == status)
+        .scalar_subquery()
+    )
+
+
+def _expected_counters() -> Dict[str, object]:
+    """Correlated subqueries recomputing each Queue counter from the entry tables."""
+    archived_served = _count_of(QueueEntryArchive, EntryStatus.SERVED)
+    archived_skipped = _count_of(QueueEntryArchive, EntryStatus.SKIPPED)
+    live_max, archive_max = (
+        func.coalesce(
+            select(func.max(model.position)).where(model.queue_id == Queue.id).scalar_subquery(), 0
+        )
+        for model in (QueueEntry, QueueEntryArchive)
+    )
+    # The larger of the two (greatest() is not portable to SQLite)
+    highest = case((live_max >= archive_max, live_max), else_=archive_max)
+    return {
+        "waiting_count": _count_of(QueueEntry, EntryStatus.WAITING),
+        "served_count": _count_of(QueueEntry, EntryStatus.SERVED) + archived_served,
+        "skipped_count": _count_of(QueueEntry, EntryStatus.SKIPPED) + archived_skipped,
+        "archived_served_count": archived_served,
+        "archived_skipped_count": archived_skipped,
+        # Positions are never reused: only a sequence behind the data is wrong
+        "next_position": case(
+            (Queue.next_position <= highest, highest + 1), else_=Queue.next_position
+        ),
+    }
+
+
+def find_counter_drift() -> List[Tuple[int, str, int, int]]:
+    """Return (queue_id, column, stored, expected) for every counter that is off.
+
+    One statement over all queues; each counter is recounted through
+    the (queue_id, status, position) indexes.
+    """
+    expected = _expected_counters()
+    names = list(expected)
+    rows = db.session.execute(
+        select(Queue.id, *(getattr(Queue, n) for n in names), *expected.values())
+        .order_by(Queue.id)
+    ).all()
+    drift = []
+    for row in rows:
+        stored, recounted = row[1:1 + len(names)], row[1 + len(names):]
+        for name, have, want in zip(names, stored, recounted):
+            if have != want:
+                drift.append((row[0], name, have, want))
+    return drift
+
+
+def repair_counters(queue_ids: List[int]) -> None:
+    """Recompute every counter of the given queues in one UPDATE. Not committed.
+
+    The recount and the write are one statement, so a join or serve
+    committing concurrently cannot be lost between them.
+    """
+    db.session.execute(
+        update(Queue).where(Queue.id.in_(queue_ids)).values(**_expected_counters())
+        .execution_options(synchronize_session=False)
+    )
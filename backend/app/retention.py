@@ -0,0 +1,272 @@
+"""Retention: expire old events and archive terminal queue entries.
+
+EVENTS — hourly rollups, compressed archives, batched deletes.
+
+queue_events only ever grows — every blocked JOIN_ATTEMPT adds a row,
+so one misbehaving kiosk can write thousands an hour.  Each action has
+a TTL (EVENT_RETENTION_TTLS, else EVENT_RETENTION_SECONDS), and
+run_retention() sweeps each action's expired rows oldest first, in
+batches of EVENT_RETENTION_BATCH_SIZE.  Per batch, in one transaction:
+
+  1. DELETE ... RETURNING removes the batch and hands back its rows,
+  2. the rows are written to a gzip JSONL segment in EVENT_ARCHIVE_DIR
+     (temp file, fsync, rename; skipped when the setting is empty),
+  3. their counts are added to queue_event_rollups per queue, UTC hour,
+     action and result,
+  4. commit.
+
+If archiving fails the batch rolls back, so nothing is deleted without
+being archived.  If the commit fails after a segment was written, the
+rows are still in the table and a later run archives them again:
+segments are at-least-once, so deduplicate on the event id.
+
+Each batch is a short write transaction and the sweep sleeps
+EVENT_RETENTION_BATCH_PAUSE between batches, so requests waiting on
+the SQLite write lock get in between — the table is never locked for
+the whole purge.
+
+ENTRIES — run_entry_archival() moves SERVED/SKIPPED entries that
+joined more than ENTRY_ARCHIVE_AFTER_SECONDS ago from queue_entries to
+queue_entries_archive, ENTRY_ARCHIVE_BATCH_SIZE at a time (see
+queue_service.archive_entries).  Each batch also adds the entries to
+their queues' archived_* counters in the same transaction, so
+served/skipped totals stay exact while the hot table shrinks.
+
+Run them from cron with `python maintenance.py retention` and
+`python maintenance.py archive-entries`, or set
+EVENT_RETENTION_SCHEDULER to run both every EVENT_RETENTION_INTERVAL
+seconds on a background thread in each worker.  Concurrent sweeps are
+safe: each batch deletes and returns a disjoint set of rows.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from flask import Flask
+
+from app import metrics
+
+logger = logging.getLogger("queuewise")
+
+
+@dataclass
+class RetentionReport:
+    """What one run_retention() call deleted (or, with dry_run, would delete)."""
+
+    dry_run: bool = False
+    expired: Dict[str, int] = field(default_factory=dict)  # action -> rows
+    buckets: int = 0  # rollup rows inserted or incremented
+    segments: List[str] = field(default_factory=list)  # archive files written
+
+    @property
+    def total(self) -> int:
+        return sum(self.expired.values())
+
+
+def ttl_for(app: Flask, action: str) -> int:
+    """Seconds an event of `action` is kept."""
+    return app.config["EVENT_RETENTION_TTLS"].get(action, app.config["EVENT_RETENTION_SECONDS"])
+
+
+def run_retention(app: Flask, now: Optional[datetime] = None, dry_run: bool = False,
+                  max_batches: Optional[int] = None) -> RetentionReport:
+    """Roll up, archive and delete every expired event.
+
+    With dry_run nothing is written; the report counts expired rows.
+    max_batches bounds the work done by one call (None = until done).
+    """
+    from app.repositories import queue_repository as repo
+
+    now = now or datetime.now(timezone.utc)
+    batch_size = app.config.get("EVENT_RETENTION_BATCH_SIZE", 1000)
+    pause = app.config.get("EVENT_RETENTION_BATCH_PAUSE", 0.05)
+    report = RetentionReport(dry_run=dry_run)
+    batches = 0
+
+    with app.app_context():
+        for action in sorted(repo.get_event_actions()):
+            before = now - timedelta(seconds=ttl_for(app, action))
+            if dry_run:
+                count = repo.count_expired_events(action, before)
+                if count:
+                    report.expired[action] = count
+                continue
+            while max_batches is None or batches < max_batches:
+                if batches:
+                    time.sleep(pause)
+                deleted = _purge_batch(app, action, before, batch_size, report)
+                batches += 1
+                if deleted < batch_size:
+                    break
+
+    metrics.incr("event_retention_runs_total")
+    if report.total and not dry_run:
+        metrics.incr("event_retention_deleted_total", report.total)
+    return report
+
+
+@dataclass
+class EntryArchiveReport:
+    """What one run_entry_archival() call moved (or, with dry_run, would move)."""
+
+    dry_run: bool = False
+    archived: Dict[int, int] = field(default_factory=dict)  # queue_id -> entries
+    pending: int = 0  # dry_run only: entries eligible for archiving
+
+    @property
+    def total(self) -> int:
+        return self.pending if self.dry_run else sum(self.archived.values())
+
+
+def run_entry_archival(app: Flask, now: Optional[datetime] = None, dry_run: bool = False,
+                       max_batches: Optional[int] = None) -> EntryArchiveReport:
+    """Move terminal entries older than ENTRY_ARCHIVE_AFTER_SECONDS to the archive."""
+    from app.repositories import queue_repository as repo
+    from app.services import queue_service as service
+
+    now = now or datetime.now(timezone.utc)
+    before = now - timedelta(seconds=app.config.get("ENTRY_ARCHIVE_AFTER_SECONDS", 7 * 86400))
+    batch_size = app.config.get("ENTRY_ARCHIVE_BATCH_SIZE", 1000)
+    pause = app.config.get("EVENT_RETENTION_BATCH_PAUSE", 0.05)
+    report = EntryArchiveReport(dry_run=dry_run)
+    batches = 0
+
+    with app.app_context():
+        if dry_run:
+            report.pending = repo.count_archivable_entries(before)
+            return report
+        while max_batches is None or batches < max_batches:
+            if batches:
+                time.sleep(pause)
+            moved = service.archive_entries(before, batch_size)
+            batches += 1
+            for queue_id, count in moved.items():
+                report.archived[queue_id] = report.archived.get(queue_id, 0) + count
+            if sum(moved.values()) < batch_size:
+                break
+
+    if report.total:
+        metrics.incr("entry_archive_moved_total", report.total)
+    return report
+
+
+def _purge_batch(app: Flask, action: str, before: datetime, batch_size: int,
+                 report: RetentionReport) -> int:
+    """Delete, archive and roll up one batch. Returns the rows deleted."""
+    from app.repositories import queue_repository as repo
+
+    archive_dir = app.config.get("EVENT_ARCHIVE_DIR")
+    with repo.unit_of_work():
+        rows = repo.delete_expired_events(action, before, batch_size)
+        if not rows:
+            return 0
+        segment = _write_segment(archive_dir, action, rows) if archive_dir else None
+        buckets = Counter(
+            (row["queue_id"], _hour(row["created_at"]), row["action"], row["result"])
+            for row in rows
+        )
+        repo.add_event_rollups(buckets)
+
+    report.expired[action] = report.expired.get(action, 0) + len(rows)
+    report.buckets += len(buckets)
+    if segment:
+        report.segments.append(segment)
+        metrics.incr("event_retention_segments_total")
+    return len(rows)
+
+
+def _hour(created_at: datetime) -> datetime:
+    """Truncate to the start of the UTC hour (naive, like stored timestamps)."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def _write_segment(directory: str, action: str, rows: List[dict]) -> str:
+    """Write rows as gzip JSONL, durably, and return the segment path."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    name = f"events-{stamp}-{action}-{rows[0]['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+    path = os.path.join(directory, name)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as archive:
+            for row in rows:
+                line = dict(row, created_at=row["created_at"].isoformat() if row["created_at"] else None)
+                archive.write(json.dumps(line, separators=(",", ":")).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def read_segment(path: str) -> List[dict]:
+    """Load the rows of an archive segment."""
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        return [json.loads(line) for line in archive]
+
+
+class RetentionScheduler:
+    """Runs run_retention() and run_entry_archival() every EVENT_RETENTION_INTERVAL seconds."""
+
+    def __init__(self, app: Flask):
+        self._app = app
+        self.interval = app.config.get("EVENT_RETENTION_INTERVAL", 3600)
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the scheduler thread for this process if it isn't running yet."""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="queuewise-retention", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the scheduler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                report = run_retention(self._app)
+                if report.total:
+                    logger.info("Event retention removed %d rows: %s", report.total, report.expired)
+                archived = run_entry_archival(self._app)
+                if archived.total:
+                    logger.info("Archived %d terminal entries", archived.total)
+            except Exception:
+                metrics.incr("event_retention_errors_total")
+                logger.exception("Event retention run failed")
+
+
+def register_retention(app: Flask):
+    """Create the app's RetentionScheduler (if enabled) and start it on first request."""
+    if not app.config.get("EVENT_RETENTION_SCHEDULER"):
+        app.extensions["queuewise_retention"] = None
+        return
+    scheduler = RetentionScheduler(app)
+    app.extensions["queuewise_retention"] = scheduler
+
+    @app.before_request
+    def _start_retention():
+        scheduler.ensure_running()
@@ -0,0 +1,41 @@
+"""GET /metrics — Prometheus text exposition of app.metrics.
+
+Request latency and DB time histograms per route, queue actions by
+result and rule_code, waiting-line lengths, event-writer lag and the
+cache / change-feed counters, for a Prometheus scraper.
+
+With METRICS_MULTIPROC_DIR set, every worker mirrors its numbers into
+that directory and a scrape in any of them reports the sum over all
+workers (see app/metrics.py).
+"""
+
+from flask import Blueprint, Flask, Response
+
+from app import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Every metric in the Prometheus text format."""
+    return Response(metrics.exposition(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+def register_metrics(app: Flask):
+    """Register GET /metrics and, if configured, multi-process aggregation.
+
+    Workers forked by gunicorn after create_app() start their own
+    flusher on their first request.
+    """
+    app.register_blueprint(metrics_bp)
+    directory = app.config.get("METRICS_MULTIPROC_DIR")
+    if not directory:
+        return
+    metrics.enable_multiprocess(directory, app.config.get("METRICS_FLUSH_INTERVAL", 1.0))
+
+    @app.before_request
+    def _ensure_metrics_flusher():
+        metrics.ensure_multiprocess()
@@ -5,21 +5,35 @@ Routes are responsible ONLY for:
   - Extracting dry_run query param.
   - Delegating to the service layer.
   - Returning HTTP responses with rule_code when blocked.
+  - Framing Server-Sent Events for the /stream endpoint.
+  - Conditional GETs: answering If-None-Match with 304 before any
+    entries are loaded or schemas run.
 
 No business logic lives here.
 """
 
-from flask import Blueprint, jsonify, request
+import json
+from typing import Tuple
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from marshmallow import ValidationError
 
 from app.ai.explainer import explain_rule_failure
+from app.models.queue_entry import EntryStatus
 from app.rules.exceptions import RuleViolation
 from app.schemas.queue_schema import (
+    AnalyticsQuerySchema,
+    BatchJoinSchema,
     CreateQueueSchema,
+    DashboardSchema,
+    EventsQuerySchema,
+    HistoryQuerySchema,
     JoinQueueSchema,
     QueueStatusSchema,
+    StatusQuerySchema,
     QueueSummarySchema,
     PreviewSchema,
+    encode_event_cursor,
 )
 from app.services import queue_service as service
 
@@ -28,9 +42,15 @@ queue_bp = Blueprint("queues", __name__)
 # Reusable schema instances
 _create_schema = CreateQueueSchema()
 _join_schema = JoinQueueSchema()
+_batch_join_schema = BatchJoinSchema()
 _status_schema = QueueStatusSchema()
+_status_query_schema = StatusQuerySchema()
 _summary_schema = QueueSummarySchema()
 _preview_schema = PreviewSchema()
+_dashboard_schema = DashboardSchema()
+_events_query_schema = EventsQuerySchema()
+_history_query_schema = HistoryQuerySchema()
+_analytics_query_schema = AnalyticsQuerySchema()
 
 
 def _is_dry_run() -> bool:
@@ -38,6 +58,19 @@ def _is_dry_run() -> bool:
     return request.args.get("dry_run", "").lower() == "true"
 
 
+def _count_arg():
+    """Parse ?count=N for bulk serve/skip. Returns (count, error_response)."""
+    raw = request.args.get("count", "1")
+    try:
+        count = int(raw)
+    except ValueError:
+        count = 0
+    limit = current_app.config.get("BULK_ACTION_MAX", 100)
+    if not 1 <= count <= limit:
+        return None, (jsonify({"errors": {"count": [f"Must be an integer between 1 and {limit}."]}}), 400)
+    return count, None
+
+
 def _rule_error(e: RuleViolation, status_code: int = 409):
     """Build error response with rule_code for machine-readable feedback."""
     return jsonify({
@@ -46,11 +79,48 @@ def _rule_error(e: RuleViolation, status_code: int = 409):
     }), status_code
 
 
+def _not_modified(etag):
+    """Return a 304 response if the client already holds `etag`, else None."""
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+
+def _tagged(response, etag):
+    """Attach a weak ETag to a response."""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response
+
+
 @queue_bp.route("/queues", methods=["GET"])
 def list_queues():
-    """GET /queues — List all queues with entry counts."""
+    """GET /queues — List all queues with entry counts. Supports If-None-Match."""
+    etag = service.queues_etag()
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
     result = service.list_queues()
-    return jsonify(result), 200
+    return _tagged(jsonify(result), etag), 200
+
+
+@queue_bp.route("/queues/status", methods=["GET"])
+def dashboard():
+    """GET /queues/status?ids=1,2,3&events=N — Status, summary and latest events for many queues."""
+    limit = current_app.config.get("DASHBOARD_MAX_QUEUES", 50)
+    try:
+        ids = list(dict.fromkeys(int(part) for part in request.args.get("ids", "").split(",") if part.strip()))
+    except ValueError:
+        ids = None
+    if not ids or len(ids) > limit:
+        return jsonify({"errors": {"ids": [f"Give 1 to {limit} comma-separated queue ids."]}}), 400
+
+    events = max(0, min(request.args.get("events", 5, type=int), 20))
+    result = service.get_dashboard(ids, events_limit=events)
+    return jsonify(_dashboard_schema.dump(result)), 200
 
 
 @queue_bp.route("/queues", methods=["POST"])
@@ -82,12 +152,35 @@ def join_queue(queue_id: int):
     return jsonify(result), 200 if dry_run else 201
 
 
+@queue_bp.route("/queues/<int:queue_id>/join:batch", methods=["POST"])
+def join_queue_batch(queue_id: int):
+    """POST /queues/<id>/join:batch — Join many names at once. Supports ?dry_run=true.
+
+    Per-name outcomes are in the body; 201 if anyone joined, else 200.
+    """
+    try:
+        data = _batch_join_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    dry_run = _is_dry_run()
+    try:
+        result = service.join_queue_batch(queue_id, data["user_names"], dry_run=dry_run)
+    except RuleViolation as e:
+        return _rule_error(e)
+
+    return jsonify(result), 201 if result.get("joined") and not dry_run else 200
+
+
 @queue_bp.route("/queues/<int:queue_id>/serve", methods=["PATCH"])
 def serve_next(queue_id: int):
-    """PATCH /queues/<id>/serve — Supports ?dry_run=true."""
+    """PATCH /queues/<id>/serve — Supports ?dry_run=true and ?count=N."""
+    count, error = _count_arg()
+    if error:
+        return error
     dry_run = _is_dry_run()
     try:
-        result = service.serve_next(queue_id, dry_run=dry_run)
+        result = service.serve_next(queue_id, dry_run=dry_run, count=count)
     except RuleViolation as e:
         return _rule_error(e)
 
@@ -107,10 +200,13 @@ def skip_user(queue_id: int, entry_id: int):
 
 @queue_bp.route("/queues/<int:queue_id>/skip", methods=["PATCH"])
 def skip_next(queue_id: int):
-    """PATCH /queues/<id>/skip — Skip the first waiting person. Supports ?dry_run=true."""
+    """PATCH /queues/<id>/skip — Skip the first waiting person. Supports ?dry_run=true and ?count=N."""
+    count, error = _count_arg()
+    if error:
+        return error
     dry_run = _is_dry_run()
     try:
-        result = service.skip_next(queue_id, dry_run=dry_run)
+        result = service.skip_next(queue_id, dry_run=dry_run, count=count)
     except RuleViolation as e:
         return _rule_error(e)
 
@@ -119,35 +215,112 @@ def skip_next(queue_id: int):
 
 @queue_bp.route("/queues/<int:queue_id>/status", methods=["GET"])
 def get_status(queue_id: int):
-    """GET /queues/<id>/status — Full queue status with AI explanation."""
+    """GET /queues/<id>/status — Queue status with AI explanation, one page of entries.
+
+    Supports ?after_position=&limit=&status= (keyset pagination; follow
+    next_cursor) and If-None-Match.
+    """
+    try:
+        args = _status_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    etag = service.queue_etag(queue_id)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
+    try:
+        result = service.get_status(
+            queue_id,
+            after_position=args["after_position"],
+            limit=args["limit"],
+            status=EntryStatus(args["status"]) if args["status"] else None,
+        )
+    except RuleViolation as e:
+        return _rule_error(e, 404)
+
+    return _tagged(jsonify(_status_schema.dump(result)), etag), 200
+
+
+@queue_bp.route("/queues/<int:queue_id>/history", methods=["GET"])
+def get_history(queue_id: int):
+    """GET /queues/<id>/history — Archived SERVED/SKIPPED entries, one page at a time.
+
+    Supports ?after_position=&limit=&status= (follow next_cursor) and If-None-Match.
+    """
     try:
-        result = service.get_status(queue_id)
+        args = _history_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    etag = service.queue_etag(queue_id)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
+    try:
+        result = service.get_history(
+            queue_id,
+            after_position=args["after_position"],
+            limit=args["limit"],
+            status=EntryStatus(args["status"]) if args["status"] else None,
+        )
     except RuleViolation as e:
         return _rule_error(e, 404)
 
-    return jsonify(_status_schema.dump(result)), 200
+    return _tagged(jsonify(result), etag), 200
+
+
+@queue_bp.route("/queues/<int:queue_id>/analytics", methods=["GET"])
+def get_analytics(queue_id: int):
+    """GET /queues/<id>/analytics — Throughput, skip rate and wait/service percentiles.
+
+    Supports ?bucket=hour|day&from=&to= (ISO 8601; default the last 24 buckets).
+    """
+    try:
+        args = _analytics_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    try:
+        result = service.get_analytics(queue_id, args["bucket"], args["start"], args["end"])
+    except RuleViolation as e:
+        return _rule_error(e, 404 if e.rule_code == "QUEUE_NOT_FOUND" else 400)
+
+    return jsonify(result), 200
 
 
 @queue_bp.route("/queues/<int:queue_id>/summary", methods=["GET"])
 def get_summary(queue_id: int):
-    """GET /queues/<id>/summary — Derived-data summary."""
+    """GET /queues/<id>/summary — Derived-data summary. Supports If-None-Match."""
+    etag = service.queue_etag(queue_id)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
     try:
         result = service.get_summary(queue_id)
     except RuleViolation as e:
         return _rule_error(e, 404)
 
-    return jsonify(_summary_schema.dump(result)), 200
+    return _tagged(jsonify(_summary_schema.dump(result)), etag), 200
 
 
 @queue_bp.route("/queues/<int:queue_id>/preview", methods=["GET"])
 def preview(queue_id: int):
-    """GET /queues/<id>/preview — Read-only simulation of next action."""
+    """GET /queues/<id>/preview — Read-only simulation of next action. Supports If-None-Match."""
+    etag = service.queue_etag(queue_id)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
     try:
         result = service.preview_next_action(queue_id)
     except RuleViolation as e:
         return _rule_error(e, 404)
 
-    return jsonify(_preview_schema.dump(result)), 200
+    return _tagged(jsonify(_preview_schema.dump(result)), etag), 200
 
 
 @queue_bp.route("/queues/<int:queue_id>/pause", methods=["PATCH"])
@@ -174,11 +347,113 @@ def resume_queue(queue_id: int):
 
 @queue_bp.route("/queues/<int:queue_id>/events", methods=["GET"])
 def get_events(queue_id: int):
-    """GET /queues/<id>/events — Event timeline for observability."""
+    """GET /queues/<id>/events — Event timeline for observability.
+
+    Newest first (?order=asc for oldest first), filterable by ?action=,
+    ?result=, ?request_id=, ?since= and ?until= (ISO 8601).  Pages hold
+    up to ?limit= events (max EVENTS_PAGE_MAX); when more remain, the
+    X-Next-Cursor header carries the ?cursor= for the next page.
+    ?format=ndjson streams every matching event, one JSON object per
+    line.  Supports If-None-Match.
+    """
     try:
-        limit = request.args.get("limit", 50, type=int)
-        result = service.get_events(queue_id, limit=min(limit, 100))
+        args = _events_query_schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    filters = {k: args[k] for k in ("action", "result", "request_id", "since", "until")}
+    ascending = args["order"] == "asc"
+
+    if args["format"] == "ndjson":
+        try:
+            rows = service.export_events(queue_id, filters, ascending)
+        except RuleViolation as e:
+            return _rule_error(e, 404)
+        lines = (json.dumps(row) + "\n" for row in rows)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    etag = service.events_etag(queue_id)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+
+    limit = min(args["limit"], current_app.config.get("EVENTS_PAGE_MAX", 1000))
+    try:
+        result, next_after = service.get_events(
+            queue_id, limit=limit, filters=filters, after=args["cursor"], ascending=ascending,
+        )
     except RuleViolation as e:
         return _rule_error(e, 404)
 
-    return jsonify(result), 200
+    response = _tagged(jsonify(result), etag)
+    if next_after is not None:
+        response.headers["X-Next-Cursor"] = encode_event_cursor(next_after)
+    return response, 200
+
+
+def _sse(event: str, data: dict, event_id: int) -> str:
+    """Format one Server-Sent Events message."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_payload(queue_id: int) -> Tuple[dict, int]:
+    """(status + summary payload, queue version to use as the event id)."""
+    snapshot = service.stream_snapshot(queue_id)
+    return {
+        "status": _status_schema.dump(snapshot["status"]),
+        "summary": _summary_schema.dump(snapshot["summary"]),
+    }, snapshot["version"]
+
+
+def _delta(old: dict, new: dict) -> dict:
+    """Keep only the top-level fields of each section that changed."""
+    delta = {}
+    for section, fields in new.items():
+        changed = {k: v for k, v in fields.items() if old.get(section, {}).get(k) != v}
+        if changed:
+            delta[section] = changed
+    return delta
+
+
+@queue_bp.route("/queues/<int:queue_id>/stream", methods=["GET"])
+def stream(queue_id: int):
+    """GET /queues/<id>/stream — Server-Sent Events feed of status/summary.
+
+    Sends a full `snapshot` on connect, then an `update` containing only
+    the changed fields whenever an action succeeds on the queue, and a
+    comment heartbeat while idle.  Event ids are the queue's persisted
+    version, so they mean the same in every worker and after a restart:
+    a reconnecting client whose Last-Event-ID equals the current
+    version skips the snapshot; any other id gets one.
+    """
+    try:
+        service.get_summary(queue_id)
+    except RuleViolation as e:
+        return _rule_error(e, 404)
+
+    broker = current_app.extensions["queuewise_broker"]
+    heartbeat = current_app.config["SSE_HEARTBEAT_SECONDS"]
+    retry_ms = current_app.config["SSE_RETRY_MS"]
+    last_event_id = request.headers.get("Last-Event-ID")
+
+    def generate():
+        with broker.subscribe(queue_id) as subscription:
+            payload, version = _stream_payload(queue_id)
+            yield f"retry: {retry_ms}\n\n"
+            if last_event_id != str(version):
+                yield _sse("snapshot", payload, version)
+            while True:
+                if subscription.wait(heartbeat) is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                latest, version = _stream_payload(queue_id)
+                delta = _delta(payload, latest)
+                payload = latest
+                if delta:
+                    yield _sse("update", delta, version)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,10 +4,14 @@ These functions enforce fairness constraints.  They NEVER modify the
 database — they only validate and raise RuleViolation on failure.
 
 Each rule includes a rule_code for machine-readable error identification.
+
+Rules that take a list of entries accept either a queue's full history
+or just its WAITING slice (see repo.get_waiting_entries) — they only
+ever look at WAITING entries, so callers should pass the narrower list.
 """
 
 import re
-from typing import List
+from typing import List, Set
 
 from app.models.queue import Queue, QueueStatus
 from app.models.queue_entry import EntryStatus, QueueEntry
@@ -37,20 +41,29 @@ def validate_user_name(user_name: str):
 
 
 def validate_no_duplicate_waiting(queue_id: int, user_name: str, entries: List[QueueEntry]):
-    """Rule 1: A user cannot join the same queue twice while WAITING."""
-    for entry in entries:
-        if entry.user_name == user_name and entry.status == EntryStatus.WAITING:
-            raise RuleViolation(
-                f"User '{user_name}' is already waiting in this queue.",
-                rule_code="DUPLICATE_JOIN",
-            )
+    """Rule 1: A user cannot join the same queue twice while WAITING.
+
+    `entries` may be the WAITING slice only.
+    """
+    waiting_names = {e.user_name for e in entries if e.status == EntryStatus.WAITING}
+    validate_name_not_waiting(user_name, waiting_names)
+
+
+def validate_name_not_waiting(user_name: str, waiting_names: Set[str]):
+    """Rule 1 against a precomputed set of WAITING names (used by batch joins)."""
+    if user_name in waiting_names:
+        raise RuleViolation(
+            f"User '{user_name}' is already waiting in this queue.",
+            rule_code="DUPLICATE_JOIN",
+        )
 
 
 def validate_serve_order(entries: List[QueueEntry]):
     """Rule 2: Only the first WAITING person in the queue can be served.
 
     Returns the entry to be served so the caller doesn't need to
-    re-scan the list.
+    re-scan the list.  With the WAITING slice (or just its first row)
+    this is a constant-time check.
     """
     first_waiting = None
     for entry in entries:
@@ -93,7 +106,7 @@ def can_skip_entry(entries: List[QueueEntry]):
     position ordering integrity by preventing arbitrary skips.
     Skipped users cannot be served later (terminal status).
 
-    Returns the entry to be skipped.
+    Returns the entry to be skipped.  Accepts the WAITING slice.
     """
     first_waiting = None
     for entry in entries:
@@ -127,7 +140,8 @@ def validate_preview_safety(entries: List[QueueEntry]):
     """Rule 7: Preview is only meaningful if someone is waiting.
 
     This prevents generating meaningless preview data for empty queues.
-    Returns the list of waiting entries for the caller to use.
+    Returns the list of waiting entries for the caller to use.  Accepts
+    the WAITING slice, in which case it is returned unchanged in content.
     """
     waiting = [e for e in entries if e.status == EntryStatus.WAITING]
     if not waiting:
@@ -1,6 +1,38 @@
 """Marshmallow schemas for request/response validation."""
 
-from marshmallow import Schema, fields, validate
+import base64
+from datetime import datetime, timezone
+
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate, validates_schema
+
+
+def encode_event_cursor(key) -> str:
+    """Opaque cursor for an event timeline position: (created_at, id)."""
+    created_at, event_id = key
+    raw = f"{created_at.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class EventCursor(fields.Field):
+    """Decodes an encode_event_cursor() string back to (created_at, id)."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            created_at, event_id = base64.urlsafe_b64decode(padded).decode().split("|")
+            return datetime.fromisoformat(created_at), int(event_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError("Invalid cursor.")
+
+
+class UtcDateTime(fields.DateTime):
+    """ISO 8601 timestamp normalized to naive UTC (how created_at is stored)."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        parsed = super()._deserialize(value, attr, data, **kwargs)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
 
 
 class CreateQueueSchema(Schema):
@@ -19,6 +51,19 @@ class JoinQueueSchema(Schema):
     )
 
 
+class BatchJoinSchema(Schema):
+    """Validates POST /queues/<id>/join:batch input.
+
+    Only the shape is checked here; each name goes through the join
+    rules individually and gets its own result.
+    """
+    user_names = fields.List(
+        fields.String(validate=validate.Length(max=120)),
+        required=True,
+        validate=validate.Length(min=1, max=500),
+    )
+
+
 class QueueEntrySchema(Schema):
     """Serializes a single queue entry for responses."""
     id = fields.Integer(dump_only=True)
@@ -26,17 +71,82 @@ class QueueEntrySchema(Schema):
     position = fields.Integer()
     status = fields.Method("get_status")
     joined_at = fields.DateTime()
+    served_at = fields.DateTime(allow_none=True)
+    skipped_at = fields.DateTime(allow_none=True)
 
     def get_status(self, obj):
         return obj.status.value
 
 
+class StatusQuerySchema(Schema):
+    """Validates GET /queues/<id>/status query params (keyset pagination)."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    after_position = fields.Integer(load_default=0, validate=validate.Range(min=0))
+    limit = fields.Integer(load_default=None, validate=validate.Range(min=1))
+    status = fields.String(
+        load_default=None,
+        validate=validate.OneOf(["WAITING", "SERVED", "SKIPPED"]),
+    )
+
+
+class HistoryQuerySchema(Schema):
+    """Validates GET /queues/<id>/history query params (keyset pagination)."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    after_position = fields.Integer(load_default=0, validate=validate.Range(min=0))
+    limit = fields.Integer(load_default=None, validate=validate.Range(min=1))
+    status = fields.String(
+        load_default=None,
+        validate=validate.OneOf(["SERVED", "SKIPPED"]),
+    )
+
+
+class AnalyticsQuerySchema(Schema):
+    """Validates GET /queues/<id>/analytics query params."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    bucket = fields.String(load_default="hour", validate=validate.OneOf(["hour", "day"]))
+    start = UtcDateTime(load_default=None, data_key="from")
+    end = UtcDateTime(load_default=None, data_key="to")
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        if data["start"] and data["end"] and data["start"] >= data["end"]:
+            raise ValidationError("'from' must be before 'to'.", "from")
+
+
+class EventsQuerySchema(Schema):
+    """Validates GET /queues/<id>/events query params."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1))
+    cursor = EventCursor(load_default=None)
+    order = fields.String(load_default="desc", validate=validate.OneOf(["desc", "asc"]))
+    format = fields.String(load_default="json", validate=validate.OneOf(["json", "ndjson"]))
+    action = fields.String(load_default=None)
+    result = fields.String(load_default=None, validate=validate.OneOf(["SUCCESS", "BLOCKED"]))
+    request_id = fields.String(load_default=None)
+    since = UtcDateTime(load_default=None)
+    until = UtcDateTime(load_default=None)
+
+
 class QueueStatusSchema(Schema):
-    """Serializes the full queue status response."""
+    """Serializes one page of the queue status response."""
     queue_id = fields.Integer()
     queue_name = fields.String()
     queue_status = fields.String()
     entries = fields.List(fields.Nested(QueueEntrySchema))
+    # Pass as ?after_position= for the next page; null on the last page
+    next_cursor = fields.Integer(allow_none=True)
     explanation = fields.String()
     wait_explanations = fields.Dict(keys=fields.String(), values=fields.String())
 
@@ -49,6 +159,8 @@ class QueueSummarySchema(Schema):
     served_count = fields.Integer()
     skipped_count = fields.Integer()
     estimated_wait = fields.String()
+    # Measured seconds per person (the 180s default until the first serve)
+    service_time_seconds = fields.Float()
     explanation = fields.String()
 
 
@@ -59,3 +171,16 @@ class PreviewSchema(Schema):
     skip_target = fields.String()
     projected_wait_change = fields.String()
     waiting_count = fields.Integer()
+
+
+class DashboardQueueSchema(Schema):
+    """One queue on the multi-queue dashboard (status entries = WAITING only)."""
+    status = fields.Nested(QueueStatusSchema)
+    summary = fields.Nested(QueueSummarySchema)
+    events = fields.List(fields.Dict())
+
+
+class DashboardSchema(Schema):
+    """Serializes GET /queues/status — many queues in one response."""
+    queues = fields.List(fields.Nested(DashboardQueueSchema))
+    missing = fields.List(fields.Integer())
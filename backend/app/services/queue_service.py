@@ -6,33 +6,212 @@ Each method:
   3. Persists changes via the repository (unless dry_run=True).
   4. Generates AI explanations for the response.
 
+ATOMIC CLAIMS:
+  Serve/skip move an entry out of WAITING with a conditional UPDATE
+  (repo.claim_entry).  If another operator claimed the same entry
+  first, the head of the line is re-read and the claim retried up to
+  CLAIM_MAX_RETRIES times before failing with rule_code CONTENTION.
+
+VERSIONS:
+  Every successful mutation bumps queue.version in the same
+  transaction.  Read endpoints derive ETags from it (see the *_etag
+  functions) so unchanged data can be answered with 304.
+
+STATE CACHE:
+  Status, summary and preview are built from a QueueSnapshot kept in
+  app.cache.QueueStateCache (when QUEUE_CACHE_ENABLED).  Every
+  mutation invalidates its queue's snapshot after commit
+  (_record_change), so an unchanged queue is answered without SQL.
+  Other workers learn about the change through the shared
+  queue_changes log (app/change_feed.py).
+
+COUNTERS:
+  Queue.waiting_count / served_count / skipped_count are adjusted in
+  the same UPDATE that bumps the version (_record_change), so summaries
+  and the queue list read one row instead of counting entries.
+  check_counters() recomputes them from the entry tables.
+
+WAIT ESTIMATES:
+  Each serve folds the time the person took into the queue's
+  service-time EWMA (app/estimator.py), in the same UPDATE again
+  (_service_clock).  Wait messages use the rate held in the snapshot.
+
+ANALYTICS:
+  get_analytics buckets the entry timestamps with NumPy
+  (app/analytics.py); closed buckets are cached, so repeated reads
+  only recompute the current one.
+
+ARCHIVE:
+  Terminal entries older than ENTRY_ARCHIVE_AFTER_SECONDS are moved to
+  queue_entries_archive (archive_entries, driven by app/retention.py).
+  They stay in served/skipped counts; get_history pages through them.
+
+UNIT OF WORK:
+  Each successful mutation and its SUCCESS event are written inside
+  repo.unit_of_work(), so they share a single commit.
+
 DRY-RUN MODE:
   When dry_run=True, rules execute normally but repository writes
   are skipped. The response includes {"dry_run": true, "result": ...}.
 """
 
-from app.ai.explainer import explain_queue_status, explain_rule_failure, explain_wait_time
-from app.logging_utils import log_event
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from app import analytics, metrics
+from app.ai.explainer import (
+    explain_all_wait_times,
+    explain_queue_counts,
+    explain_rule_failure,
+    explain_wait_position,
+    explain_wait_time,
+)
+from app.cache import EntryView, QueueSnapshot, StatusPage
+from app.estimator import clock_update, rate_of, sample_weight, serve_update
+from app.logging_utils import flush_pending_events, log_event, log_events
 from app.models.queue import QueueStatus
 from app.models.queue_entry import EntryStatus
 from app.repositories import queue_repository as repo
 from app.rules import queue_rules as rules
 from app.rules.exceptions import RuleViolation
 
+# Any worker may update a queue's length, so the newest value wins
+metrics.describe("queue_waiting_length", "People waiting, per queue.", multiprocess_mode="latest")
+
+
+def _state_cache():
+    """The app's QueueStateCache, or None when caching is disabled."""
+    return current_app.extensions.get("queuewise_cache")
+
+
+def _record_change(queue_id: int, waiting: int = 0, served: int = 0, skipped: int = 0, **clock):
+    """Bump the queue's version, adjust its counters and drop its cached state once committed.
+
+    `clock` is the service-clock update from _service_clock, if any.
+    With the change feed enabled the change is also logged for the
+    other workers, in the same transaction.  The queue_waiting_length
+    gauge takes the new waiting count once committed.
+    """
+    waiting_count = repo.bump_version(queue_id, waiting=waiting, served=served, skipped=skipped, **clock)
+    if waiting_count is not None:
+        repo.on_commit(lambda: metrics.set_gauge(
+            "queue_waiting_length", waiting_count, {"queue_id": queue_id}))
+    feed = current_app.extensions.get("queuewise_changes")
+    if feed is not None:
+        repo.record_change(queue_id, feed.origin)
+    cache = _state_cache()
+    if cache is not None:
+        repo.on_commit(lambda: cache.invalidate(queue_id))
+
+
+# Head of the line kept in a snapshot: the preview needs the first two
+_HEAD = 2
+
+
+def _page_size(limit=None) -> int:
+    """Clamp a requested status page size to STATUS_PAGE_MAX."""
+    config = current_app.config
+    if limit is None:
+        return config.get("STATUS_PAGE_DEFAULT", 100)
+    return max(1, min(limit, config.get("STATUS_PAGE_MAX", 500)))
+
+
+def _load_state(queue_id: int) -> QueueSnapshot:
+    """Return the queue's snapshot, from the cache when possible.
+
+    A miss costs two index-backed queries (the queue row with its
+    counters, head and tail of the waiting line) regardless of queue
+    length.
+    """
+    cache = _state_cache()
+    if cache is not None:
+        snapshot = cache.get(queue_id)
+        if snapshot is not None:
+            return snapshot
+        generation = cache.generation(queue_id)
+
+    queue = repo.get_queue(queue_id)
+    if queue is None:
+        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+
+    head, last = repo.get_waiting_edges([queue_id], _HEAD)[queue_id]
+    snapshot = _build_snapshot(queue, head, last)
+    if cache is not None:
+        cache.put(snapshot, generation)
+    return snapshot
+
+
+def _counts(queue) -> dict:
+    """{EntryStatus: count} from the queue's maintained counters."""
+    return {
+        EntryStatus.WAITING: queue.waiting_count,
+        EntryStatus.SERVED: queue.served_count,
+        EntryStatus.SKIPPED: queue.skipped_count,
+    }
+
+
+def _rate(queue):
+    """The queue's ServiceRate, with the configured default before any serve."""
+    return rate_of(queue, current_app.config.get("WAIT_ESTIMATE_DEFAULT_SECONDS", 180.0))
+
+
+def _service_clock(status: EntryStatus, first_joined_at, n: int, now: datetime) -> dict:
+    """bump_version arguments for n people served or skipped from the head at `now`.
+
+    A skip only restarts the clock; a serve also adds the time per
+    person since the clock last started as one EWMA sample of weight n.
+    The sample is measured in the UPDATE, against the clock as
+    committed, not a copy of the queue row read before the claim.
+    """
+    if status != EntryStatus.SERVED:
+        return {"estimate": clock_update(now)}
+    config = current_app.config
+    weight = sample_weight(config.get("WAIT_ESTIMATE_ALPHA", 0.2), n)
+    cap = config.get("WAIT_ESTIMATE_MAX_SAMPLE_SECONDS", 3600.0)
+    return {"estimate": serve_update(now, first_joined_at, n, weight, cap)}
+
+
+def _build_snapshot(queue, head, last) -> QueueSnapshot:
+    """Render explanations for a queue's state and wrap it in a snapshot."""
+    counts = _counts(queue)
+    waiting_count = counts.get(EntryStatus.WAITING, 0)
+    rate = _rate(queue)
+    return QueueSnapshot(
+        queue_id=queue.id,
+        name=queue.name,
+        status=queue.status.value,
+        version=queue.version,
+        counts=counts,
+        head=tuple(EntryView.of(e) for e in head[:_HEAD]),
+        last_waiting=EntryView.of(last) if last is not None else None,
+        explanation=explain_queue_counts(
+            waiting_count, counts.get(EntryStatus.SERVED, 0), head[0].user_name if head else None
+        ),
+        estimated_wait=(
+            explain_wait_position(last.user_name, waiting_count - 1, rate) if last is not None else ""
+        ),
+        rate=rate,
+    )
+
+
+def _make_page(rows, limit: int, people_ahead: int, rate) -> StatusPage:
+    """Build a StatusPage from up to limit + 1 rows (the extra one proves there is more)."""
+    entries = tuple(EntryView.of(e) if not isinstance(e, EntryView) else e for e in rows[:limit])
+    next_cursor = entries[-1].position if len(rows) > limit else None
+    return StatusPage(entries, next_cursor, explain_all_wait_times(entries, people_ahead, rate))
+
 
 def list_queues() -> list:
-    """Return all queues with entry counts."""
-    queues = repo.list_all_queues()
+    """Return all queues with entry counts (one read of the queues table)."""
     result = []
-    for q in queues:
-        entries = repo.get_entries(q.id)
-        waiting = sum(1 for e in entries if e.status == EntryStatus.WAITING)
+    for q in repo.list_all_queues():
         result.append({
             "id": q.id,
             "name": q.name,
             "status": q.status.value,
-            "waiting_count": waiting,
-            "total_count": len(entries),
+            "waiting_count": q.waiting_count,
+            "total_count": q.waiting_count + q.served_count + q.skipped_count,
             "created_at": q.created_at.isoformat() if q.created_at else None,
         })
     return result
@@ -68,11 +247,11 @@ def join_queue(queue_id: int, user_name: str, dry_run: bool = False) -> dict:
             return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
         raise
 
-    entries = repo.get_entries(queue_id)
-
-    # Rule 1: No duplicate waiting entries
+    # Rule 1: No duplicate waiting entries (only same-name rows can clash)
     try:
-        rules.validate_no_duplicate_waiting(queue_id, user_name, entries)
+        rules.validate_no_duplicate_waiting(
+            queue_id, user_name, repo.find_waiting_entries(queue_id, user_name)
+        )
     except RuleViolation as e:
         log_event(queue_id, "JOIN_ATTEMPT", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
         if dry_run:
@@ -81,7 +260,7 @@ def join_queue(queue_id: int, user_name: str, dry_run: bool = False) -> dict:
 
     if dry_run:
         position = repo.next_position(queue_id)
-        explanation = explain_wait_time(entries, user_name)
+        explanation = explain_wait_time(repo.get_waiting_entries(queue_id), user_name, _rate(queue))
         return {
             "dry_run": True,
             "result": "would_succeed",
@@ -90,10 +269,11 @@ def join_queue(queue_id: int, user_name: str, dry_run: bool = False) -> dict:
             "explanation": explanation,
         }
 
-    position = repo.next_position(queue_id)
-    entry = repo.add_entry(queue_id, user_name, position)
-
-    log_event(queue_id, "JOIN", "SUCCESS", {"user_name": user_name, "position": position})
+    with repo.unit_of_work():
+        position = repo.allocate_positions(queue_id)
+        entry = repo.add_entry(queue_id, user_name, position)
+        _record_change(queue_id, waiting=1)
+        log_event(queue_id, "JOIN", "SUCCESS", {"user_name": user_name, "position": position})
 
     return {
         "entry_id": entry.id,
@@ -103,43 +283,230 @@ def join_queue(queue_id: int, user_name: str, dry_run: bool = False) -> dict:
     }
 
 
-def serve_next(queue_id: int, dry_run: bool = False) -> dict:
-    """Serve the next person in the queue."""
+def join_queue_batch(queue_id: int, user_names: list, dry_run: bool = False) -> dict:
+    """Add many users to a queue at once, reporting the outcome per name.
+
+    Applies the same rules as join_queue.  Rule 6 concerns the whole
+    queue, so a paused queue blocks the entire batch.  Rules 8 and 1 are
+    checked per name: duplicates are looked up with one query, and names
+    repeated within the batch count as duplicates too.  Accepted names
+    get a contiguous position range and are inserted, with their JOIN
+    events, in one transaction.
+    """
     queue = repo.get_queue(queue_id)
     if queue is None:
         raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
 
-    entries = repo.get_entries(queue_id)
-
+    # Rule 6: Queue must be ACTIVE for joins
     try:
-        entry = rules.validate_serve_order(entries)
+        rules.validate_queue_active_for_join(queue)
     except RuleViolation as e:
-        log_event(queue_id, "SERVE", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+        log_event(queue_id, "JOIN_ATTEMPT", "BLOCKED", {
+            "reason": e.reason, "rule_code": e.rule_code, "batch_size": len(user_names),
+        })
         if dry_run:
             return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
         raise
 
+    waiting_names = repo.find_waiting_names(queue_id, user_names)
+    results = []
+    accepted = []
+    blocked_events = []
+    for index, user_name in enumerate(user_names):
+        try:
+            # Rule 8: Validate user name is a real name
+            rules.validate_user_name(user_name)
+            # Rule 1: No duplicate waiting entries (including earlier in this batch)
+            rules.validate_name_not_waiting(user_name, waiting_names)
+        except RuleViolation as e:
+            blocked_events.append(("JOIN_ATTEMPT", "BLOCKED", {
+                "user_name": user_name, "reason": e.reason, "rule_code": e.rule_code,
+            }))
+            results.append({
+                "index": index,
+                "user_name": user_name,
+                "result": "would_fail" if dry_run else "blocked",
+                "reason": e.reason,
+                "rule_code": e.rule_code,
+            })
+            continue
+        waiting_names.add(user_name)
+        accepted.append(index)
+        results.append({"index": index, "user_name": user_name})
+
+    if dry_run:
+        if blocked_events:
+            log_events(queue_id, blocked_events)
+        first = repo.next_position(queue_id)
+        for offset, index in enumerate(accepted):
+            results[index].update(result="would_succeed", position=first + offset)
+        return {
+            "dry_run": True,
+            "result": "would_succeed" if accepted else "would_fail",
+            "joined": len(accepted),
+            "failed": len(user_names) - len(accepted),
+            "results": results,
+        }
+
+    if accepted:
+        names = [user_names[i] for i in accepted]
+        with repo.unit_of_work():
+            first = repo.allocate_positions(queue_id, len(names))
+            created = repo.add_entries(queue_id, names, first)
+            _record_change(queue_id, waiting=len(created))
+            log_events(queue_id, blocked_events + [
+                ("JOIN", "SUCCESS", {"user_name": name, "position": position})
+                for name, (_, position, _) in zip(names, created)
+            ])
+        for index, (entry_id, position, _) in zip(accepted, created):
+            results[index].update(
+                result="joined",
+                entry_id=entry_id,
+                position=position,
+                status=EntryStatus.WAITING.value,
+            )
+    elif blocked_events:
+        log_events(queue_id, blocked_events)
+
+    return {
+        "queue_id": queue_id,
+        "joined": len(accepted),
+        "failed": len(user_names) - len(accepted),
+        "results": results,
+    }
+
+
+def _claim_deltas(status: EntryStatus, n: int = 1) -> dict:
+    """Counter changes for moving n entries from WAITING to `status`."""
+    return {"waiting": -n, status.value.lower(): n}
+
+
+def _claim_attempts() -> int:
+    """Total claim attempts for serve/skip: the first try plus retries."""
+    return 1 + current_app.config.get("CLAIM_MAX_RETRIES", 3)
+
+
+def _lost_claim(action: str):
+    """Record that another request claimed the entry first (per action)."""
+    metrics.incr("claim_contention_retries_total", labels={"action": action})
+
+
+def _contention_violation(queue_id: int, action: str) -> RuleViolation:
+    """Build (and log) the error raised when every claim attempt lost."""
+    e = RuleViolation(
+        "The queue changed while this action was running. Please try again.",
+        rule_code="CONTENTION",
+    )
+    metrics.incr("claim_contention_failures_total", labels={"action": action})
+    log_event(queue_id, action, "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+    return e
+
+
+def _claim_many(queue_id: int, action: str, status: EntryStatus, count: int,
+                validate, dry_run: bool) -> dict:
+    """Serve/skip the first `count` waiting people with one UPDATE.
+
+    `validate` is the head-of-line rule (Rule 2 or Rule 5); it runs
+    against the WAITING slice, and again if the queue was drained by
+    someone else before the UPDATE ran.  Claims are taken strictly in
+    position order from the head, so first-waiting-only holds for every
+    entry, and only WAITING rows are touched (terminal statuses).
+    """
+    waiting = repo.get_waiting_entries(queue_id, limit=count)
     try:
-        rules.validate_not_already_served(entry)
+        validate(waiting)
     except RuleViolation as e:
-        log_event(queue_id, "SERVE", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+        log_event(queue_id, action, "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
         if dry_run:
             return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
         raise
 
     if dry_run:
-        return {"dry_run": True, "result": "would_succeed", "user_name": entry.user_name}
+        return {
+            "dry_run": True,
+            "result": "would_succeed",
+            "count": len(waiting),
+            "user_names": [e.user_name for e in waiting],
+        }
 
-    repo.mark_served(entry)
-    log_event(queue_id, "SERVE", "SUCCESS", {"user_name": entry.user_name})
+    with repo.unit_of_work():
+        now = datetime.now(timezone.utc)
+        claimed = repo.claim_next_waiting(queue_id, status, count, at=now)
+        if claimed:
+            first_joined_at = waiting[0].joined_at if waiting else now
+            _record_change(queue_id, **_claim_deltas(status, len(claimed)),
+                           **_service_clock(status, first_joined_at, len(claimed), now))
+            log_events(queue_id, [
+                (action, "SUCCESS", {"user_name": user_name}) for _, user_name, _ in claimed
+            ])
+
+    if not claimed:
+        try:
+            validate([])
+        except RuleViolation as e:
+            log_event(queue_id, action, "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+            raise
 
     return {
-        "entry_id": entry.id,
-        "user_name": entry.user_name,
-        "status": entry.status.value,
+        "count": len(claimed),
+        "entries": [
+            {"entry_id": entry_id, "user_name": user_name, "position": position, "status": status.value}
+            for entry_id, user_name, position in claimed
+        ],
     }
 
 
+def serve_next(queue_id: int, dry_run: bool = False, count: int = 1) -> dict:
+    """Serve the next person in the queue (or the next `count` people)."""
+    queue = repo.get_queue(queue_id)
+    if queue is None:
+        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+
+    if count > 1:
+        return _claim_many(queue_id, "SERVE", EntryStatus.SERVED, count,
+                           rules.validate_serve_order, dry_run)
+
+    for _ in range(_claim_attempts()):
+        # Only the head of the line matters for Rule 2
+        waiting = repo.get_waiting_entries(queue_id, limit=1)
+
+        try:
+            entry = rules.validate_serve_order(waiting)
+        except RuleViolation as e:
+            log_event(queue_id, "SERVE", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+            if dry_run:
+                return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
+            raise
+
+        try:
+            rules.validate_not_already_served(entry)
+        except RuleViolation as e:
+            log_event(queue_id, "SERVE", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+            if dry_run:
+                return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
+            raise
+
+        if dry_run:
+            return {"dry_run": True, "result": "would_succeed", "user_name": entry.user_name}
+
+        with repo.unit_of_work():
+            claimed = repo.claim_entry(entry, EntryStatus.SERVED)
+            if claimed:
+                _record_change(queue_id, **_claim_deltas(EntryStatus.SERVED),
+                               **_service_clock(EntryStatus.SERVED, entry.joined_at, 1, entry.served_at))
+                log_event(queue_id, "SERVE", "SUCCESS", {"user_name": entry.user_name})
+
+        if claimed:
+            return {
+                "entry_id": entry.id,
+                "user_name": entry.user_name,
+                "status": entry.status.value,
+            }
+        _lost_claim("SERVE")
+
+    raise _contention_violation(queue_id, "SERVE")
+
+
 def skip_user(queue_id: int, entry_id: int) -> dict:
     """Skip a specific user in the queue (by entry ID)."""
     queue = repo.get_queue(queue_id)
@@ -152,13 +519,20 @@ def skip_user(queue_id: int, entry_id: int) -> dict:
 
     try:
         rules.validate_can_skip(entry)
+        with repo.unit_of_work():
+            claimed = repo.claim_entry(entry, EntryStatus.SKIPPED)
+            if claimed:
+                _record_change(queue_id, **_claim_deltas(EntryStatus.SKIPPED))
+                log_event(queue_id, "SKIP", "SUCCESS", {"user_name": entry.user_name})
+        if not claimed:
+            # Someone else served/skipped this entry since we read it
+            _lost_claim("SKIP")
+            repo.refresh(entry)
+            rules.validate_can_skip(entry)
     except RuleViolation as e:
         log_event(queue_id, "SKIP", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
         raise
 
-    repo.mark_skipped(entry)
-    log_event(queue_id, "SKIP", "SUCCESS", {"user_name": entry.user_name})
-
     return {
         "entry_id": entry.id,
         "user_name": entry.user_name,
@@ -166,112 +540,343 @@ def skip_user(queue_id: int, entry_id: int) -> dict:
     }
 
 
-def skip_next(queue_id: int, dry_run: bool = False) -> dict:
-    """Skip the FIRST waiting user in the queue."""
+def skip_next(queue_id: int, dry_run: bool = False, count: int = 1) -> dict:
+    """Skip the FIRST waiting user in the queue (or the first `count`)."""
     queue = repo.get_queue(queue_id)
     if queue is None:
         raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
 
-    entries = repo.get_entries(queue_id)
+    if count > 1:
+        return _claim_many(queue_id, "SKIP", EntryStatus.SKIPPED, count,
+                           rules.can_skip_entry, dry_run)
+
+    for _ in range(_claim_attempts()):
+        # Only the head of the line matters for Rule 5
+        waiting = repo.get_waiting_entries(queue_id, limit=1)
+
+        try:
+            entry = rules.can_skip_entry(waiting)
+        except RuleViolation as e:
+            log_event(queue_id, "SKIP", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
+            if dry_run:
+                return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
+            raise
 
-    try:
-        entry = rules.can_skip_entry(entries)
-    except RuleViolation as e:
-        log_event(queue_id, "SKIP", "BLOCKED", {"reason": e.reason, "rule_code": e.rule_code})
         if dry_run:
-            return {"dry_run": True, "result": "would_fail", "reason": e.reason, "rule_code": e.rule_code}
-        raise
+            return {"dry_run": True, "result": "would_succeed", "user_name": entry.user_name}
 
-    if dry_run:
-        return {"dry_run": True, "result": "would_succeed", "user_name": entry.user_name}
+        with repo.unit_of_work():
+            claimed = repo.claim_entry(entry, EntryStatus.SKIPPED)
+            if claimed:
+                _record_change(queue_id, **_claim_deltas(EntryStatus.SKIPPED),
+                               **_service_clock(EntryStatus.SKIPPED, entry.joined_at, 1, entry.skipped_at))
+                log_event(queue_id, "SKIP", "SUCCESS", {"user_name": entry.user_name})
+
+        if claimed:
+            return {
+                "entry_id": entry.id,
+                "user_name": entry.user_name,
+                "status": entry.status.value,
+            }
+        _lost_claim("SKIP")
+
+    raise _contention_violation(queue_id, "SKIP")
+
+
+def get_status(queue_id: int, after_position: int = 0, limit=None, status=None) -> dict:
+    """Return one page of the queue's entries with AI-generated explanations.
+
+    Keyset pagination on position: pass the previous page's
+    `next_cursor` as `after_position`.  `status` filters entries to one
+    EntryStatus.  Wait explanations cover the WAITING entries of this
+    page only; their rank is offset by the WAITING entries before it.
+    """
+    state = _load_state(queue_id)
+    limit = _page_size(limit)
+    key = (after_position, limit, status)
+    page = state.pages.get(key)
+    if page is None:
+        cache = _state_cache()
+        generation = cache.generation(queue_id) if cache is not None else None
+        rows = repo.get_entries_page(queue_id, after_position, limit + 1, status)
+        people_ahead = 0
+        if after_position > 0 and status in (None, EntryStatus.WAITING) and rows:
+            people_ahead = repo.count_waiting_before(queue_id, after_position)
+        page = _make_page(rows, limit, people_ahead, state.rate)
+        if cache is not None:
+            cache.put_page(state, key, page, generation)
+    return _status_view(state, page)
 
-    repo.mark_skipped(entry)
-    log_event(queue_id, "SKIP", "SUCCESS", {"user_name": entry.user_name})
 
+def get_summary(queue_id: int) -> dict:
+    """Return a derived-data summary for a queue."""
+    return _summary_view(_load_state(queue_id))
+
+
+def _status_view(state: QueueSnapshot, page: StatusPage) -> dict:
+    """Status response (QueueStatusSchema shape) for a snapshot and page."""
     return {
-        "entry_id": entry.id,
-        "user_name": entry.user_name,
-        "status": entry.status.value,
+        "queue_id": state.queue_id,
+        "queue_name": state.name,
+        "queue_status": state.status,
+        "entries": page.entries,
+        "next_cursor": page.next_cursor,
+        "explanation": state.explanation,
+        "wait_explanations": page.wait_explanations,
     }
 
 
-def get_status(queue_id: int) -> dict:
-    """Return the current queue state with AI-generated explanations."""
-    queue = repo.get_queue(queue_id)
-    if queue is None:
-        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+def _summary_view(state: QueueSnapshot) -> dict:
+    """Summary response (QueueSummarySchema shape) for a snapshot."""
+    return {
+        "queue_id": state.queue_id,
+        "queue_name": state.name,
+        "waiting_count": state.waiting_count,
+        "served_count": state.counts.get(EntryStatus.SERVED, 0),
+        "skipped_count": state.counts.get(EntryStatus.SKIPPED, 0),
+        "estimated_wait": state.estimated_wait,
+        "service_time_seconds": round(state.rate.mean_seconds, 1),
+        "explanation": state.explanation,
+    }
+
+
+def get_dashboard(queue_ids: list, events_limit: int = 5) -> dict:
+    """Status, summary and latest events for many queues at once.
+
+    Queues found in the state cache (with their first WAITING page)
+    cost nothing.  The rest are loaded together with a constant number
+    of statements — queue rows (with their counters) by `id IN (...)`,
+    and the head and tail of every waiting line in one UNION ALL — and
+    cached.  The newest `events_limit` events of every queue come from
+    one more query.  Status `entries` is the first page of WAITING
+    entries.
+    """
+    cache = _state_cache()
+    limit = _page_size()
+    key = (0, limit, EntryStatus.WAITING)
+    states, pages, generations = {}, {}, {}
+    for queue_id in queue_ids:
+        snapshot = cache.get(queue_id) if cache is not None else None
+        if snapshot is not None:
+            states[queue_id] = snapshot
+            if key in snapshot.pages:
+                pages[queue_id] = snapshot.pages[key]
+        if cache is not None:
+            generations[queue_id] = cache.generation(queue_id)
+
+    misses = [qid for qid in queue_ids if qid not in states]
+    queues = repo.get_queues(misses) if misses else []
+    need_page = [q.id for q in queues] + [qid for qid in states if qid not in pages]
+    edges = repo.get_waiting_edges(need_page, limit + 1) if need_page else {}
+
+    for queue in queues:
+        head, last = edges[queue.id]
+        snapshot = _build_snapshot(queue, head, last)
+        if cache is not None:
+            cache.put(snapshot, generations[queue.id])
+        states[queue.id] = snapshot
+    for queue_id in need_page:
+        head, _ = edges[queue_id]
+        pages[queue_id] = _make_page(head, limit, 0, states[queue_id].rate)
+        if cache is not None:
+            cache.put_page(states[queue_id], key, pages[queue_id], generations[queue_id])
+
+    found_ids = [qid for qid in queue_ids if qid in states]
+    events = {}
+    if found_ids and events_limit > 0:
+        flush_pending_events()
+        events = repo.get_latest_events_for(found_ids, events_limit)
+
+    return {
+        "queues": [
+            {
+                "status": _status_view(states[qid], pages[qid]),
+                "summary": _summary_view(states[qid]),
+                "events": [e.to_dict() for e in events.get(qid, [])],
+            }
+            for qid in found_ids
+        ],
+        "missing": [qid for qid in queue_ids if qid not in states],
+    }
+
 
-    entries = repo.get_entries(queue_id)
-    explanation = explain_queue_status(entries)
+def archive_entries(before, limit: int) -> dict:
+    """Move up to `limit` terminal entries that joined before `before` to the archive.
 
-    wait_explanations = {}
-    for entry in entries:
-        if entry.status == EntryStatus.WAITING:
-            wait_explanations[entry.user_name] = explain_wait_time(entries, entry.user_name)
+    One transaction: the entries leave queue_entries, land in
+    queue_entries_archive and are added to their queues' archived_*
+    counters, so served/skipped totals never dip.  Returns
+    {queue_id: entries moved}.
+    """
+    with repo.unit_of_work():
+        rows = repo.archive_terminal_entries(before, limit)
+        moved = {}
+        for row in rows:
+            moved[row["queue_id"]] = moved.get(row["queue_id"], 0) + 1
+        for queue_id in sorted(moved):
+            _record_change(queue_id)
+    return moved
+
+
+def get_history(queue_id: int, after_position: int = 0, limit=None, status=None) -> dict:
+    """Return one page of a queue's archived entries, by position.
 
+    Keyset pagination like get_status: pass `next_cursor` back as
+    `after_position`.  `status` narrows to SERVED or SKIPPED.
+    """
+    queue = repo.get_queue(queue_id)
+    if queue is None:
+        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+    limit = _page_size(limit)
+    rows = repo.get_archived_entries_page(queue_id, after_position, limit + 1, status)
     return {
         "queue_id": queue.id,
         "queue_name": queue.name,
-        "queue_status": queue.status.value,
-        "entries": entries,
-        "explanation": explanation,
-        "wait_explanations": wait_explanations,
+        "archived_served_count": queue.archived_served_count,
+        "archived_skipped_count": queue.archived_skipped_count,
+        "entries": [
+            {
+                "id": e.id,
+                "user_name": e.user_name,
+                "position": e.position,
+                "status": e.status.value,
+                "joined_at": e.joined_at.isoformat() if e.joined_at else None,
+                "served_at": e.served_at.isoformat() if e.served_at else None,
+                "skipped_at": e.skipped_at.isoformat() if e.skipped_at else None,
+                "archived_at": e.archived_at.isoformat() if e.archived_at else None,
+            }
+            for e in rows[:limit]
+        ],
+        "next_cursor": rows[limit - 1].position if len(rows) > limit else None,
     }
 
 
-def get_summary(queue_id: int) -> dict:
-    """Return a derived-data summary for a queue."""
+def get_analytics(queue_id: int, bucket: str = "hour", start=None, end=None, now=None) -> dict:
+    """Per-bucket throughput, skip rate and wait/service percentiles.
+
+    `start`/`end` (naive UTC) are widened to whole buckets; by default
+    the last 24 buckets up to now.  Closed buckets come from the
+    BucketCache when present; the rest are computed in one pass over
+    the entry columns (app/analytics.py).
+    """
     queue = repo.get_queue(queue_id)
     if queue is None:
         raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
 
-    entries = repo.get_entries(queue_id)
-    waiting = [e for e in entries if e.status == EntryStatus.WAITING]
-    served = [e for e in entries if e.status == EntryStatus.SERVED]
-    skipped = [e for e in entries if e.status == EntryStatus.SKIPPED]
-
-    explanation = explain_queue_status(entries)
-    estimated_wait = ""
-    if waiting:
-        estimated_wait = explain_wait_time(entries, waiting[-1].user_name)
+    config = current_app.config
+    size = analytics.BUCKETS[bucket]
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    end = end or now
+    start = start or end - timedelta(seconds=24 * size)
+    first = int(analytics.to_seconds(start) // size) * size
+    last = -int(-analytics.to_seconds(end) // size) * size
+    n = (last - first) // size
+    if n > config.get("ANALYTICS_MAX_BUCKETS", 1000):
+        raise RuleViolation(
+            f"Range spans {n} {bucket}s; at most {config.get('ANALYTICS_MAX_BUCKETS', 1000)} allowed.",
+            rule_code="ANALYTICS_RANGE_TOO_LARGE",
+        )
+
+    cache = current_app.extensions.get("queuewise_analytics")
+    keys = [(queue_id, size, first + i * size) for i in range(n)]
+    found = cache.get_many(keys) if cache is not None else {}
+    metrics.incr("analytics_cache_hits_total", len(found))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        metrics.incr("analytics_cache_misses_total", len(missing))
+        lo, hi = missing[0][2], missing[-1][2] + size
+        cap = config.get("WAIT_ESTIMATE_MAX_SAMPLE_SECONDS", 3600.0)
+        chunks = repo.iter_entry_times(
+            queue_id, analytics.from_seconds(lo), analytics.from_seconds(hi),
+            timedelta(seconds=cap), config.get("ANALYTICS_CHUNK_SIZE", 10000),
+        )
+        columns = analytics.load_columns(chunks)
+        computed = analytics.bucket_stats(*columns, lo, size, (hi - lo) // size, cap)
+        closed_before = analytics.to_seconds(now - analytics.CLOSE_GRACE)
+        for i, result in enumerate(computed):
+            key = (queue_id, size, lo + i * size)
+            if key in found:
+                continue
+            found[key] = result
+            if cache is not None and key[2] + size <= closed_before:
+                cache.put(key, result)
 
     return {
         "queue_id": queue.id,
         "queue_name": queue.name,
-        "waiting_count": len(waiting),
-        "served_count": len(served),
-        "skipped_count": len(skipped),
-        "estimated_wait": estimated_wait,
-        "explanation": explanation,
+        "bucket": bucket,
+        "from": analytics.from_seconds(first).isoformat(),
+        "to": analytics.from_seconds(last).isoformat(),
+        "buckets": [found[key] for key in keys],
     }
 
 
+def check_counters(repair: bool = False) -> list:
+    """Compare every queue's counters with its entries; optionally repair them.
+
+    Returns one {"queue_id", "column", "stored", "expected"} per counter
+    that was off.  With repair=True the drifted queues are recomputed
+    in one UPDATE and their cached state dropped.
+    """
+    drift = [
+        {"queue_id": queue_id, "column": column, "stored": stored, "expected": expected}
+        for queue_id, column, stored, expected in repo.find_counter_drift()
+    ]
+    if repair and drift:
+        queue_ids = sorted({d["queue_id"] for d in drift})
+        with repo.unit_of_work():
+            repo.repair_counters(queue_ids)
+            for queue_id in queue_ids:
+                _record_change(queue_id)
+    return drift
+
+
+def stream_snapshot(queue_id: int) -> dict:
+    """Return fresh status + summary for one push on the SSE stream.
+
+    The status is the first page of WAITING entries: an unfiltered page
+    is ordered by position across every status, so on a busy queue it
+    would hold only people already served.
+
+    `version` is the queue's persisted version, read first: the status
+    and summary are at least that new, so it is safe as the SSE event
+    id in every worker and across restarts.
+    """
+    repo.release_session()
+    try:
+        version = _queue_version(queue_id)
+        return {
+            "version": version,
+            "status": get_status(queue_id, status=EntryStatus.WAITING),
+            "summary": get_summary(queue_id),
+        }
+    finally:
+        repo.release_session()
+
+
 def preview_next_action(queue_id: int) -> dict:
     """Preview what would happen if the next person is served or skipped.
 
     This is a read-only simulation — no database writes.
     Rules validate preview safety. AI generates projected text.
     """
-    queue = repo.get_queue(queue_id)
-    if queue is None:
-        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
-
-    entries = repo.get_entries(queue_id)
+    state = _load_state(queue_id)
 
     # Rule 7: Preview only meaningful with waiting entries
-    waiting = rules.validate_preview_safety(entries)
+    head = rules.validate_preview_safety(list(state.head))
+    waiting_count = state.waiting_count
 
     # Who gets served/skipped next
-    next_serve = waiting[0].user_name
-    next_skip_target = waiting[0].user_name
+    next_serve = head[0].user_name
+    next_skip_target = head[0].user_name
     # After skipping the first, who becomes next?
-    next_after_skip = waiting[1].user_name if len(waiting) > 1 else None
+    next_after_skip = head[1].user_name if len(head) > 1 else None
 
     # AI-generated projected wait change
-    if len(waiting) > 1:
-        current_wait = (len(waiting) - 1) * 3  # ~3 min each
-        new_wait = (len(waiting) - 2) * 3
-        projected = f"~{current_wait - new_wait} minutes faster for remaining"
+    if waiting_count > 1:
+        # Everyone behind moves up one place: one service time sooner
+        saved, _ = state.rate.wait_minutes(1)
+        projected = f"~{saved} minute{'' if saved == 1 else 's'} faster for remaining"
     else:
         projected = "Queue would be empty after this action"
 
@@ -280,7 +885,7 @@ def preview_next_action(queue_id: int) -> dict:
         "next_if_skipped": next_after_skip or "Queue would be empty",
         "skip_target": next_skip_target,
         "projected_wait_change": projected,
-        "waiting_count": len(waiting),
+        "waiting_count": waiting_count,
     }
 
 
@@ -293,8 +898,10 @@ def pause_queue(queue_id: int) -> dict:
     if queue.status == QueueStatus.PAUSED:
         raise RuleViolation("Queue is already paused.", rule_code="ALREADY_PAUSED")
 
-    repo.set_queue_status(queue, QueueStatus.PAUSED)
-    log_event(queue_id, "PAUSED", "SUCCESS", {})
+    with repo.unit_of_work():
+        repo.set_queue_status(queue, QueueStatus.PAUSED)
+        _record_change(queue_id)
+        log_event(queue_id, "PAUSED", "SUCCESS", {})
 
     return {"queue_id": queue.id, "status": queue.status.value}
 
@@ -308,17 +915,94 @@ def resume_queue(queue_id: int) -> dict:
     if queue.status == QueueStatus.ACTIVE:
         raise RuleViolation("Queue is already active.", rule_code="ALREADY_ACTIVE")
 
-    repo.set_queue_status(queue, QueueStatus.ACTIVE)
-    log_event(queue_id, "RESUMED", "SUCCESS", {})
+    with repo.unit_of_work():
+        repo.set_queue_status(queue, QueueStatus.ACTIVE)
+        _record_change(queue_id)
+        log_event(queue_id, "RESUMED", "SUCCESS", {})
 
     return {"queue_id": queue.id, "status": queue.status.value}
 
 
-def get_events(queue_id: int, limit: int = 50) -> list:
-    """Return recent events for a queue."""
+def _queue_version(queue_id: int):
+    """The queue's version, or None if it doesn't exist.
+
+    Taken from the state cache when the queue is cached (without
+    counting a cache hit or miss: the read that follows counts);
+    otherwise one primary-key lookup.
+    """
+    cache = _state_cache()
+    version = cache.version(queue_id) if cache is not None else None
+    return version if version is not None else repo.get_queue_version(queue_id)
+
+
+def queue_etag(queue_id: int):
+    """ETag for a queue's status/summary/preview, or None if it doesn't exist.
+
+    Costs at most one primary-key lookup — nothing is loaded or rendered.
+    """
+    version = _queue_version(queue_id)
+    if version is None:
+        return None
+    return f"q{queue_id}-v{version}"
+
+
+def events_etag(queue_id: int):
+    """ETag for a queue's event timeline (also changes on BLOCKED attempts).
+
+    Buffered events are written first so they count; the tag itself
+    is one primary-key lookup (version and event_version).
+    """
+    flush_pending_events()
+    versions = repo.get_event_versions(queue_id)
+    if versions is None:
+        return None
+    version, event_version = versions
+    return f"q{queue_id}-v{version}-e{event_version}"
+
+
+def queues_etag() -> str:
+    """ETag for the queue list: changes on create and on any queue's version bump.
+
+    An aggregate over the queues table, not a primary-key lookup: a
+    global version row would serialise every mutation (see TRADEOFFS.md).
+    """
+    count, versions, max_id = repo.get_queues_fingerprint()
+    return f"queues-{count}-{versions}-{max_id}"
+
+
+def get_events(queue_id: int, limit: int = 50, filters: dict = None,
+               after=None, ascending: bool = False):
+    """Return one page of a queue's events and the key to continue from.
+
+    Returns (events, next_after); next_after is the (created_at, id) of
+    the last event when the page is full, else None.
+    """
+    queue = repo.get_queue(queue_id)
+    if queue is None:
+        raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+
+    # Buffered BLOCKED attempts must show up in the timeline
+    flush_pending_events()
+    events = repo.get_events(queue_id, limit, filters, after, ascending)
+    next_after = (events[-1].created_at, events[-1].id) if len(events) == limit else None
+    return [e.to_dict() for e in events], next_after
+
+
+def export_events(queue_id: int, filters: dict = None, ascending: bool = False):
+    """Return a generator over every matching event (constant memory).
+
+    The queue is checked, and buffered events flushed, before the
+    generator is returned so errors surface before streaming starts.
+    """
     queue = repo.get_queue(queue_id)
     if queue is None:
         raise RuleViolation("Queue not found.", rule_code="QUEUE_NOT_FOUND")
+    flush_pending_events()
+
+    def _rows():
+        for row in repo.iter_events(queue_id, filters, ascending):
+            if row["created_at"] is not None:
+                row["created_at"] = row["created_at"].isoformat()
+            yield row
 
-    events = repo.get_events(queue_id, limit)
-    return [e.to_dict() for e in events]
+    return _rows()
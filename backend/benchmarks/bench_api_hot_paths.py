@@ -0,0 +1,97 @@
+"""Latency and SQL statements per request for the API hot paths.
+
+Seeds queues of each --sizes entries (20% already served) on a
+temporary file-backed SQLite database, puts --events events on the
+largest one, then drives every hot endpoint through the Flask test
+client:
+
+  join, serve, skip                       — each kept at a steady queue
+                                            length by an untimed
+                                            serve/join before it
+  status, summary, preview                — warm (state cache hit) and
+                                            cold (cache dropped first)
+  events                                  — newest page of the timeline
+  list                                    — GET /queues, once overall
+
+For each it reports p50/p95/mean latency in ms and the SQL statements
+issued per request.  Statement counts are deterministic, so they are
+the sharpest signal when comparing commits (see benchmarks/run.py).
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_api_hot_paths --sizes 10,1000,100000 --events 1000000
+"""
+
+import argparse
+import json
+
+from benchmarks.common import measure, names, seed_events, seed_queue, temp_app
+
+# Read endpoints; the first three are answered from the state cache
+READS = {
+    "status": "/queues/{qid}/status",
+    "summary": "/queues/{qid}/summary",
+    "preview": "/queues/{qid}/preview",
+    "events": "/queues/{qid}/events?limit=50",
+}
+CACHED = ("status", "summary", "preview")
+
+
+def _bench_queue(app, client, qid: int, repeat: int) -> dict:
+    joiners = iter(names(3 * repeat, prefix="Bench"))
+
+    def join_one():
+        client.post(f"/queues/{qid}/join", json={"user_name": next(joiners)})
+
+    def serve_one():
+        client.patch(f"/queues/{qid}/serve")
+
+    results = {
+        "join": measure(app, lambda i: client.post(
+            f"/queues/{qid}/join", json={"user_name": next(joiners)}), repeat, before=serve_one),
+        "serve": measure(app, lambda i: client.patch(f"/queues/{qid}/serve"), repeat, before=join_one),
+        "skip": measure(app, lambda i: client.patch(f"/queues/{qid}/skip"), repeat, before=join_one),
+    }
+
+    cache = app.extensions["queuewise_cache"]
+    for name, path in READS.items():
+        url = path.format(qid=qid)
+        client.get(url)  # warm the cache
+        results[name] = measure(app, lambda i: client.get(url), repeat)
+        if cache is not None and name in CACHED:
+            results[f"{name}_cold"] = measure(app, lambda i: client.get(url), repeat, before=cache.clear)
+    return results
+
+
+def run(sizes=(10, 1000, 100000), events: int = 1000000, repeat: int = 50) -> dict:
+    with temp_app() as app:
+        client = app.test_client()
+        qids = {size: seed_queue(app, f"Bench {size}", size) for size in sizes}
+        seed_events(app, qids[max(sizes)], events)
+
+        results = {str(size): _bench_queue(app, client, qid, repeat) for size, qid in qids.items()}
+        results["list"] = measure(app, lambda i: client.get("/queues"), repeat)
+
+    return {
+        "benchmark": "api_hot_paths",
+        "sizes": list(sizes),
+        "events": events,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="Comma-separated queue sizes (entries per queue)")
+    parser.add_argument("--events", type=int, default=1000000,
+                        help="Events seeded on the largest queue")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests per measurement")
+    args = parser.parse_args()
+    sizes = tuple(int(s) for s in args.sizes.split(","))
+    print(json.dumps(run(sizes, args.events, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Join throughput on file-backed SQLite.
+
+Each join is a full HTTP round trip through the Flask test client
+against a temporary on-disk database, so commit/fsync cost is included.
+Joins are spread over queues of --per-queue people so the number
+reflects per-request write cost rather than queue length.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_join_throughput --joins 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app import create_app
+from app.config import Config
+
+
+def run(joins: int, per_queue: int = 50) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+        app = create_app(BenchConfig)
+        client = app.test_client()
+        qids = [
+            client.post("/queues", json={"name": f"Bench {n}"}).get_json()["id"]
+            for n in range(-(-joins // per_queue))
+        ]
+
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        names = [
+            f"User {letters[i // 676 % 26]}{letters[i // 26 % 26]}{letters[i % 26]}"
+            for i in range(joins)
+        ]
+
+        started = time.perf_counter()
+        for i, name in enumerate(names):
+            qid = qids[i // per_queue]
+            resp = client.post(f"/queues/{qid}/join", json={"user_name": name})
+            assert resp.status_code == 201, resp.get_json()
+        elapsed = time.perf_counter() - started
+    finally:
+        os.remove(path)
+
+    return {
+        "benchmark": "join_throughput",
+        "joins": joins,
+        "per_queue": per_queue,
+        "seconds": round(elapsed, 3),
+        "joins_per_second": round(joins / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=2000)
+    parser.add_argument("--per-queue", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.joins, args.per_queue)))
+
+
+if __name__ == "__main__":
+    main()
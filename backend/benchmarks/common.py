@@ -0,0 +1,172 @@
+"""Shared helpers for the benchmark scripts.
+
+  temp_app()       — an app on a throwaway file-backed SQLite database
+  seed_queue()     — bulk-insert a queue of N entries (counters set)
+  seed_events()    — bulk-insert N events for a queue
+  measure()        — latency percentiles and SQL statements per request
+  names()          — distinct names that pass Rule 8
+
+Seeding goes around the service layer with executemany INSERTs so a
+100k-entry queue or a million events take seconds, not hours.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List
+
+from flask import Flask
+from sqlalchemy import event, insert, update
+
+from app import create_app
+from app.config import Config
+from app.database import db
+from app.models.queue import Queue
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.models.queue_event import QueueEvent
+
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Rows per executemany INSERT while seeding
+_SEED_BATCH = 10000
+
+
+def names(count: int, prefix: str = "User") -> List[str]:
+    """`count` distinct names like "User aaab" (letters only, for Rule 8)."""
+    return [
+        f"{prefix} {''.join(_LETTERS[i // 26 ** k % 26] for k in (3, 2, 1, 0))}"
+        for i in range(count)
+    ]
+
+
+@contextmanager
+def temp_app(**overrides) -> Iterator[Flask]:
+    """Yield an app on a fresh on-disk SQLite file, removed afterwards.
+
+    The change-feed poller is off unless overridden: its background
+    statements would show up in the per-request counts.
+    """
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        settings = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "CHANGE_FEED_ENABLED": False,
+            **overrides,
+        }
+        BenchConfig = type("BenchConfig", (Config,), settings)
+        app = create_app(BenchConfig)
+        yield app
+        feed = app.extensions.get("queuewise_changes")
+        if feed is not None:
+            feed.stop()
+        app.extensions["queuewise_events"].flush()
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+def seed_queue(app: Flask, name: str, entries: int, served_ratio: float = 0.2) -> int:
+    """Create a queue of `entries` people, the first `served_ratio` of them SERVED.
+
+    Returns the queue id.  The queue's counters and next_position are
+    set to match, as the service layer would have left them.
+    """
+    served = int(entries * served_ratio)
+    start = datetime.now(timezone.utc) - timedelta(seconds=entries)
+    with app.app_context():
+        queue = Queue(name=name)
+        db.session.add(queue)
+        db.session.flush()
+        rows = [
+            {
+                "queue_id": queue.id,
+                "user_name": user_name,
+                "position": i + 1,
+                "status": EntryStatus.SERVED if i < served else EntryStatus.WAITING,
+                "joined_at": start + timedelta(seconds=i),
+                "served_at": start + timedelta(seconds=i + 60) if i < served else None,
+            }
+            for i, user_name in enumerate(names(entries, prefix="Seed"))
+        ]
+        for i in range(0, len(rows), _SEED_BATCH):
+            db.session.execute(insert(QueueEntry), rows[i:i + _SEED_BATCH])
+        db.session.execute(
+            update(Queue).where(Queue.id == queue.id).values(
+                next_position=entries + 1, waiting_count=entries - served, served_count=served,
+            )
+        )
+        db.session.commit()
+        return queue.id
+
+
+def seed_events(app: Flask, queue_id: int, count: int):
+    """Insert `count` JOIN/SERVE/SKIP events for a queue, spread over the last day."""
+    actions = ("JOIN", "SERVE", "SKIP", "JOIN_ATTEMPT")
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        for offset in range(0, count, _SEED_BATCH):
+            db.session.execute(insert(QueueEvent), [
+                {
+                    "queue_id": queue_id,
+                    "action": actions[i % 4],
+                    "result": "BLOCKED" if i % 4 == 3 else "SUCCESS",
+                    "detail": '{"user_name": "Seed"}',
+                    "request_id": f"bench-{i}",
+                    "created_at": now - timedelta(seconds=(count - i) * 86400 / count),
+                }
+                for i in range(offset, min(offset + _SEED_BATCH, count))
+            ])
+        db.session.commit()
+
+
+@contextmanager
+def count_statements(app: Flask) -> Iterator[list]:
+    """Collect every SQL statement executed on the app's engine."""
+    statements: list = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def measure(app: Flask, request: Callable[[int], object], repeat: int,
+            before: Callable[[], None] = None) -> dict:
+    """Time `request(i)` for i in range(repeat).
+
+    `request` issues one HTTP call through the test client and returns
+    its response; `before` runs untimed ahead of each call (e.g. to
+    drop the state cache).  Reports latency in milliseconds and the
+    SQL statements issued per request.
+    """
+    timings, counts = [], []
+    for i in range(repeat):
+        if before is not None:
+            before()
+        with count_statements(app) as statements:
+            started = time.perf_counter()
+            response = request(i)
+            elapsed = time.perf_counter() - started
+        assert response.status_code < 400, (response.status_code, response.get_json())
+        timings.append(elapsed * 1000)
+        counts.append(len(statements))
+    timings.sort()
+    return {
+        "repeat": repeat,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "statements": round(statistics.fmean(counts), 2),
+        "max_statements": max(counts),
+    }
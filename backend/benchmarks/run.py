@@ -0,0 +1,123 @@
+"""Run the benchmark suite and write one JSON report; optionally compare two.
+
+    cd backend
+    python -m benchmarks.run --out bench.json                  # full suite
+    python -m benchmarks.run --quick --out bench.json          # small sizes, for CI
+    python -m benchmarks.run --out new.json --compare old.json # run, then diff
+    python -m benchmarks.run --compare old.json new.json       # diff two reports
+
+The report records the git commit and Python/SQLite versions next to
+each benchmark's results.  --compare flags any request whose SQL
+statement count went up (exact), and any whose p50 latency grew by
+more than --tolerance (default 25%); it exits 1 if anything regressed.
+"""
+
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import bench_api_hot_paths, bench_join_throughput
+
+FULL = {"sizes": (10, 1000, 100000), "events": 1000000, "repeat": 50, "joins": 2000}
+QUICK = {"sizes": (10, 1000), "events": 10000, "repeat": 10, "joins": 200}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(params: dict) -> dict:
+    return {
+        "commit": _commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "benchmarks": {
+            "api_hot_paths": bench_api_hot_paths.run(params["sizes"], params["events"], params["repeat"]),
+            "join_throughput": bench_join_throughput.run(params["joins"]),
+        },
+    }
+
+
+def _measurements(report: dict) -> dict:
+    """{"<size>/<endpoint>": measurement} from a report's api_hot_paths results."""
+    results = report["benchmarks"]["api_hot_paths"]["results"]
+    flat = {}
+    for key, value in results.items():
+        if "p50_ms" in value:
+            flat[key] = value
+        else:
+            flat.update({f"{key}/{endpoint}": m for endpoint, m in value.items()})
+    return flat
+
+
+def compare(old: dict, new: dict, tolerance: float) -> list:
+    """Return a line per regression of `new` against `old` (printing every row)."""
+    regressions = []
+    before, after = _measurements(old), _measurements(new)
+    print(f"{'request':<24} {'p50 ms':>18} {'statements':>14}   ({old['commit']} -> {new['commit']})")
+    for key in sorted(after.keys() & before.keys()):
+        b, a = before[key], after[key]
+        flags = []
+        if a["statements"] > b["statements"]:
+            flags.append("more SQL")
+        if b["p50_ms"] and a["p50_ms"] > b["p50_ms"] * (1 + tolerance):
+            flags.append("slower")
+        print(f"{key:<24} {b['p50_ms']:>8.2f} -> {a['p50_ms']:<8.2f}"
+              f"{b['statements']:>6} -> {a['statements']:<6} {', '.join(flags)}")
+        if flags:
+            regressions.append(f"{key}: {', '.join(flags)}")
+    old_jps = old["benchmarks"]["join_throughput"]["joins_per_second"]
+    new_jps = new["benchmarks"]["join_throughput"]["joins_per_second"]
+    print(f"{'join_throughput':<24} {old_jps:>8.1f} -> {new_jps:<8.1f} joins/s")
+    if new_jps < old_jps / (1 + tolerance):
+        regressions.append("join_throughput: slower")
+    return regressions
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Small sizes (10/1k entries, 10k events)")
+    parser.add_argument("--out", help="Write the report here (default: stdout)")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT",
+                        help="Baseline report, or baseline and candidate to diff without running")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative p50 slowdown before flagging (default 0.25)")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        new = _load(args.compare[1])
+    else:
+        new = run_suite(QUICK if args.quick else FULL)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(new, f, indent=2)
+        elif not args.compare:
+            print(json.dumps(new, indent=2))
+
+    if not args.compare:
+        return 0
+    regressions = compare(_load(args.compare[0]), new, args.tolerance)
+    for line in regressions:
+        print(f"✗ {line}")
+    if not regressions:
+        print("✓ No regressions.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
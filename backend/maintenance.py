@@ -0,0 +1,89 @@
+"""Maintenance commands for a QueueWise database.
+
+    python maintenance.py retention [--dry-run] [--max-batches N]
+    python maintenance.py archive-entries [--dry-run] [--max-batches N]
+    python maintenance.py counters [--repair]
+
+retention       — roll up, archive and delete events older than their
+                  TTL (see app/retention.py).
+archive-entries — move SERVED/SKIPPED entries older than
+                  ENTRY_ARCHIVE_AFTER_SECONDS to queue_entries_archive.
+counters        — recount each queue's waiting/served/skipped counters
+                  and next_position from its entries; --repair fixes
+                  any that drifted. Exits 1 if drift remains.
+
+All are safe to run from cron while the app is serving.
+"""
+
+import argparse
+import sys
+
+from app import create_app
+from app.retention import run_entry_archival, run_retention
+
+
+def _retention(app, args) -> int:
+    report = run_retention(app, dry_run=args.dry_run, max_batches=args.max_batches)
+    verb = "Would delete" if report.dry_run else "Deleted"
+    for action, count in sorted(report.expired.items()):
+        print(f"  {action:<16} {count}")
+    print(f"✓ {verb} {report.total} expired events.")
+    if not report.dry_run:
+        print(f"✓ Updated {report.buckets} hourly rollups; wrote {len(report.segments)} archive segments.")
+    return 0
+
+
+def _archive_entries(app, args) -> int:
+    report = run_entry_archival(app, dry_run=args.dry_run, max_batches=args.max_batches)
+    if report.dry_run:
+        print(f"✓ Would archive {report.total} terminal entries.")
+        return 0
+    for queue_id, count in sorted(report.archived.items()):
+        print(f"  queue {queue_id:<8} {count}")
+    print(f"✓ Archived {report.total} terminal entries.")
+    return 0
+
+
+def _counters(app, args) -> int:
+    from app.services import queue_service as service
+
+    with app.app_context():
+        drift = service.check_counters(repair=args.repair)
+    for d in drift:
+        print(f"  queue {d['queue_id']:<8} {d['column']:<24} stored {d['stored']}, expected {d['expected']}")
+    if not drift:
+        print("✓ All queue counters match their entries.")
+        return 0
+    if args.repair:
+        print(f"✓ Repaired {len(drift)} counters.")
+        return 0
+    print(f"✗ {len(drift)} counters drifted. Run with --repair to fix them.")
+    return 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    retention = commands.add_parser("retention", help="Purge expired events")
+    retention.add_argument("--dry-run", action="store_true", help="Only count expired events")
+    retention.add_argument("--max-batches", type=int, default=None,
+                           help="Stop after this many delete batches")
+    retention.set_defaults(handler=_retention)
+
+    archive = commands.add_parser("archive-entries", help="Archive old SERVED/SKIPPED entries")
+    archive.add_argument("--dry-run", action="store_true", help="Only count archivable entries")
+    archive.add_argument("--max-batches", type=int, default=None,
+                         help="Stop after this many batches")
+    archive.set_defaults(handler=_archive_entries)
+
+    counters = commands.add_parser("counters", help="Check (and repair) per-queue counters")
+    counters.add_argument("--repair", action="store_true", help="Recompute drifted counters")
+    counters.set_defaults(handler=_counters)
+
+    args = parser.parse_args(argv)
+    return args.handler(create_app(), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -121,6 +121,12 @@ with app.app_context():
             )
             db.session.add(entry)
             total_entries += 1
+        # Keep the per-queue position sequence and counters in step with the seeded rows
+        queues[q_idx].next_position = len(entries) + 1
+        statuses = [status for _, status, _ in entries]
+        queues[q_idx].waiting_count = statuses.count(EntryStatus.WAITING)
+        queues[q_idx].served_count = statuses.count(EntryStatus.SERVED)
+        queues[q_idx].skipped_count = statuses.count(EntryStatus.SKIPPED)
     db.session.flush()
     print(f"✓ Created {total_entries} queue entries.")
 
@@ -30,5 +30,44 @@ def db(app):
     with app.app_context():
         _db.create_all()
         yield _db
+        app.extensions["queuewise_events"].flush()
         _db.session.rollback()
         _db.drop_all()
+
+
+@pytest.fixture()
+def query_counter(db):
+    """Count SQL statements issued against the test engine.
+
+    Usage:
+        with query_counter() as counted:
+            client.get("/queues")
+        assert counted.count == 1
+    """
+    from contextlib import contextmanager
+
+    from sqlalchemy import event
+
+    class _Counted:
+        count = 0
+        statements: list
+        parameters: list
+
+    @contextmanager
+    def _count():
+        counted = _Counted()
+        counted.statements = []
+        counted.parameters = []
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            counted.count += 1
+            counted.statements.append(statement)
+            counted.parameters.append(parameters)
+
+        event.listen(db.engine, "before_cursor_execute", _before)
+        try:
+            yield counted
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before)
+
+    return _count
@@ -0,0 +1,99 @@
+"""Tests for active-window loading — actions ignore terminal history.
+
+Covers:
+  1. Serve/skip/join/preview/summary load no SERVED or SKIPPED rows.
+  2. Rules accept the WAITING slice directly.
+  3. Summary counts still include terminal entries via aggregates.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.rules import queue_rules as rules
+from app.rules.exceptions import RuleViolation
+
+
+@contextmanager
+def _loaded_entries():
+    """Collect the status of every QueueEntry row loaded from the database."""
+    loaded = []
+
+    def _on_load(target, context):
+        loaded.append(target.status)
+
+    event.listen(QueueEntry, "load", _on_load)
+    try:
+        yield loaded
+    finally:
+        event.remove(QueueEntry, "load", _on_load)
+
+
+def _queue_with_history(client, served=20, waiting=2):
+    qid = client.post("/queues", json={"name": "History Q"}).get_json()["id"]
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    for i in range(served):
+        client.post(f"/queues/{qid}/join", json={"user_name": f"Served {letters[i]}"})
+        client.patch(f"/queues/{qid}/serve")
+    for i in range(waiting):
+        client.post(f"/queues/{qid}/join", json={"user_name": f"Waiting {letters[i]}"})
+    return qid
+
+
+@pytest.mark.parametrize("method,path", [
+    ("patch", "/queues/{qid}/serve"),
+    ("patch", "/queues/{qid}/skip"),
+    ("get", "/queues/{qid}/preview"),
+    ("get", "/queues/{qid}/summary"),
+])
+def test_actions_skip_terminal_history(client, db, method, path):
+    """History rows are never materialized for these endpoints."""
+    qid = _queue_with_history(client)
+    db.session.expunge_all()
+
+    with _loaded_entries() as loaded:
+        resp = getattr(client, method)(path.format(qid=qid))
+
+    assert resp.status_code == 200
+    assert loaded
+    assert all(status == EntryStatus.WAITING for status in loaded)
+
+
+def test_join_loads_only_waiting(client, db):
+    """The duplicate-join check runs against the WAITING slice."""
+    qid = _queue_with_history(client)
+    db.session.expunge_all()
+
+    with _loaded_entries() as loaded:
+        resp = client.post(f"/queues/{qid}/join", json={"user_name": "Newcomer"})
+
+    assert resp.status_code == 201
+    assert all(status == EntryStatus.WAITING for status in loaded)
+
+
+def test_summary_counts_terminal_entries(client, db):
+    """Served counts come from an aggregate, not the loaded slice."""
+    qid = _queue_with_history(client, served=3, waiting=1)
+    client.patch(f"/queues/{qid}/skip")
+
+    data = client.get(f"/queues/{qid}/summary").get_json()
+    assert data["served_count"] == 3
+    assert data["skipped_count"] == 1
+    assert data["waiting_count"] == 0
+    assert "3 people have been served" in data["explanation"]
+
+
+def test_rules_accept_waiting_slice():
+    """Rules work on a list that only contains WAITING entries."""
+    first = QueueEntry(user_name="Alice", position=4, status=EntryStatus.WAITING)
+    second = QueueEntry(user_name="Bob", position=7, status=EntryStatus.WAITING)
+
+    assert rules.validate_serve_order([first, second]) is first
+    assert rules.can_skip_entry([first]) is first
+    assert rules.validate_preview_safety([first, second]) == [first, second]
+    with pytest.raises(RuleViolation):
+        rules.validate_no_duplicate_waiting(1, "Bob", [first, second])
+    with pytest.raises(RuleViolation):
+        rules.validate_serve_order([])
@@ -0,0 +1,144 @@
+"""Tests for GET /queues/<id>/analytics — vectorized per-bucket statistics.
+
+Covers:
+  1. grouped_percentiles matches np.percentile group by group.
+  2. Hourly joined/served/skipped counts, skip rate and wait/service
+     percentiles, including bulk serves and archived entries.
+  3. A bucket's numbers do not depend on the range or chunk size used.
+  4. Closed buckets are cached; only the open one is recomputed.
+  5. Validation: bucket, from/to order, range size, missing queue.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import update
+
+from app.analytics import grouped_percentiles
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.retention import run_entry_archival
+from app.services import queue_service as service
+
+NOW = datetime(2025, 6, 1, 12, 30)
+
+
+def _at(hour, minute):
+    return datetime(2025, 6, 1, hour, minute)
+
+
+# (name, joined, served, skipped)
+HISTORY = [
+    ("Alice", _at(10, 0), _at(10, 10), None),
+    ("Bob", _at(10, 0), _at(10, 30), None),
+    ("Carol", _at(10, 5), None, _at(10, 40)),
+    ("Dave", _at(10, 50), _at(11, 0), None),
+    ("Erin", _at(11, 0), _at(11, 20), None),  # Erin and Frank served together
+    ("Frank", _at(11, 0), _at(11, 20), None),
+    ("Grace", _at(12, 0), None, None),
+]
+
+
+@pytest.fixture()
+def qid(client, db):
+    queue_id = client.post("/queues", json={"name": "Analytics"}).get_json()["id"]
+    for position, (name, joined, served, skipped) in enumerate(HISTORY, start=1):
+        status = EntryStatus.SERVED if served else EntryStatus.SKIPPED if skipped else EntryStatus.WAITING
+        db.session.add(QueueEntry(queue_id=queue_id, user_name=name, position=position, status=status,
+                                  joined_at=joined, served_at=served, skipped_at=skipped))
+    db.session.commit()
+    return queue_id
+
+
+def _hours(qid, start=_at(10, 0), end=NOW):
+    return service.get_analytics(qid, "hour", start, end, now=NOW)["buckets"]
+
+
+def test_grouped_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    groups = rng.integers(0, 5, 200)
+    groups[groups == 3] = 4  # one empty group
+    values = rng.exponential(300, 200)
+
+    p50, p90 = grouped_percentiles(groups, values, 5, (0.5, 0.9))
+
+    for g in range(5):
+        if g == 3:
+            assert np.isnan(p50[g]) and np.isnan(p90[g])
+        else:
+            assert p50[g] == pytest.approx(np.percentile(values[groups == g], 50))
+            assert p90[g] == pytest.approx(np.percentile(values[groups == g], 90))
+
+
+def test_hourly_statistics(qid):
+    ten, eleven, noon = _hours(qid)
+
+    assert ten["start"] == "2025-06-01T10:00:00" and noon["end"] == "2025-06-01T13:00:00"
+    assert (ten["joined"], ten["served"], ten["skipped"]) == (4, 2, 1)
+    assert ten["skip_rate"] == pytest.approx(0.333)
+    assert (ten["wait_p50_seconds"], ten["wait_p90_seconds"]) == (1200, 1680)
+    # Alice from her join, Bob from Alice's serve
+    assert (ten["service_p50_seconds"], ten["service_p90_seconds"]) == (900, 1140)
+
+    assert (eleven["joined"], eleven["served"], eleven["skipped"], eleven["skip_rate"]) == (2, 3, 0, 0)
+    assert eleven["wait_p50_seconds"] == 1200
+    # Dave from his join (after Carol's skip); Erin and Frank share 20 minutes
+    assert eleven["service_p50_seconds"] == eleven["service_p90_seconds"] == 600
+
+    assert (noon["joined"], noon["served"], noon["skip_rate"], noon["wait_p50_seconds"]) == (1, 0, None, None)
+
+
+def test_day_buckets_and_endpoint(client, qid):
+    resp = client.get(f"/queues/{qid}/analytics?bucket=day&from=2025-06-01T00:00:00&to=2025-06-02T00:00:00")
+
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body["bucket"] == "day" and len(body["buckets"]) == 1
+    assert (body["buckets"][0]["served"], body["buckets"][0]["joined"]) == (5, 7)
+
+
+def test_archived_entries_are_included(app, qid, db):
+    before = _hours(qid)
+    app.extensions["queuewise_analytics"].clear()
+
+    run_entry_archival(app, now=NOW + timedelta(days=30))
+
+    assert db.session.query(QueueEntry).count() == 1
+    assert _hours(qid) == before
+
+
+def test_bucket_does_not_depend_on_range_or_chunks(app, qid):
+    full = _hours(qid)
+    app.extensions["queuewise_analytics"].clear()
+    app.config["ANALYTICS_CHUNK_SIZE"] = 2
+
+    alone = _hours(qid, start=_at(11, 0), end=_at(12, 0))
+
+    assert alone == [full[1]]
+
+
+def test_closed_buckets_are_cached(app, qid, db):
+    first = _hours(qid)
+    assert len(app.extensions["queuewise_analytics"]) == 2  # 10:00 and 11:00; noon is open
+
+    # Moving Dave's serve into the open hour only shows up there
+    db.session.execute(update(QueueEntry).where(QueueEntry.user_name == "Dave").values(served_at=_at(12, 10)))
+    db.session.commit()
+    second = _hours(qid)
+
+    assert second[:2] == first[:2]
+    assert (first[2]["served"], second[2]["served"]) == (0, 1)
+
+
+def test_validation(app, client, qid):
+    assert client.get(f"/queues/{qid}/analytics?bucket=week").status_code == 400
+    resp = client.get(f"/queues/{qid}/analytics?from=2025-06-02T00:00:00&to=2025-06-01T00:00:00")
+    assert resp.status_code == 400
+
+    app.config["ANALYTICS_MAX_BUCKETS"] = 48
+    resp = client.get(f"/queues/{qid}/analytics?from=2025-01-01T00:00:00&to=2025-06-01T00:00:00")
+    assert resp.status_code == 400
+    assert resp.get_json()["rule_code"] == "ANALYTICS_RANGE_TOO_LARGE"
+
+    assert client.get("/queues/999/analytics").status_code == 404
+    assert len(client.get(f"/queues/{qid}/analytics").get_json()["buckets"]) in (24, 25)
@@ -0,0 +1,130 @@
+"""Tests for atomic serve/skip claims under concurrency.
+
+Covers:
+  1. claim_entry only succeeds for WAITING entries.
+  2. A lost claim is retried against the new head of the line.
+  3. Exhausted retries fail with rule_code CONTENTION.
+  4. Many threads serving/skipping one queue never double-claim anyone.
+"""
+
+import itertools
+import string
+import threading
+from collections import Counter
+
+import pytest
+
+from app import create_app, metrics
+from app.config import TestConfig
+from app.database import db as _db
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.models.queue_event import QueueEvent
+from app.repositories import queue_repository as repo
+
+
+def _names(n):
+    combos = itertools.product(string.ascii_lowercase, repeat=3)
+    return ["User " + "".join(c) for c in itertools.islice(combos, n)]
+
+
+def _queue_with(client, names):
+    qid = client.post("/queues", json={"name": "Claim Q"}).get_json()["id"]
+    for name in names:
+        client.post(f"/queues/{qid}/join", json={"user_name": name})
+    return qid
+
+
+def test_claim_entry_requires_waiting(client, db):
+    qid = _queue_with(client, ["Alice"])
+    entry = repo.get_waiting_entries(qid)[0]
+
+    assert repo.claim_entry(entry, EntryStatus.SERVED) is True
+    assert entry.status == EntryStatus.SERVED
+    assert repo.claim_entry(entry, EntryStatus.SKIPPED) is False
+
+
+def test_lost_claim_retries_next_in_line(client, db, monkeypatch):
+    """If the head is claimed elsewhere, serve moves on to the next person."""
+    qid = _queue_with(client, ["Alice", "Bob"])
+    real_claim = repo.claim_entry
+    calls = []
+
+    def racing_claim(entry, status):
+        if not calls:
+            # Another operator serves Alice between our read and our UPDATE
+            calls.append(entry.user_name)
+            real_claim(entry, EntryStatus.SERVED)
+            _db.session.commit()
+            return False
+        return real_claim(entry, status)
+
+    monkeypatch.setattr(repo, "claim_entry", racing_claim)
+    before = metrics.get("claim_contention_retries_total", labels={"action": "SERVE"})
+
+    resp = client.patch(f"/queues/{qid}/serve")
+
+    assert resp.status_code == 200
+    assert resp.get_json()["user_name"] == "Bob"
+    assert metrics.get("claim_contention_retries_total", labels={"action": "SERVE"}) - before == 1
+
+
+def test_exhausted_retries_report_contention(app, client, db, monkeypatch):
+    qid = _queue_with(client, ["Alice"])
+    monkeypatch.setattr(repo, "claim_entry", lambda entry, status: False)
+    before = metrics.get("claim_contention_failures_total", labels={"action": "SKIP"})
+
+    resp = client.patch(f"/queues/{qid}/skip")
+
+    assert resp.status_code == 409
+    assert resp.get_json()["rule_code"] == "CONTENTION"
+    assert metrics.get("claim_contention_failures_total", labels={"action": "SKIP"}) - before == 1
+    assert QueueEntry.query.filter_by(queue_id=qid).one().status == EntryStatus.WAITING
+
+
+def test_concurrent_serves_claim_each_entry_once(tmp_path):
+    """16 threads hammering serve/skip on one queue: everyone handled once."""
+
+    class StressConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'claims.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 60}}
+        CLAIM_MAX_RETRIES = 10
+
+    app = create_app(StressConfig)
+    names = _names(300)
+    qid = _queue_with(app.test_client(), names)
+    results = []
+    lock = threading.Lock()
+
+    def worker(n):
+        client = app.test_client()
+        path = f"/queues/{qid}/serve" if n % 2 else f"/queues/{qid}/skip"
+        while True:
+            resp = client.patch(path)
+            data = resp.get_json()
+            if resp.status_code == 200:
+                with lock:
+                    results.append(data["entry_id"])
+            elif data["rule_code"] == "EMPTY_QUEUE":
+                return
+            else:
+                assert data["rule_code"] == "CONTENTION"
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == len(names)
+    assert len(set(results)) == len(names)
+    with app.app_context():
+        statuses = Counter(e.status for e in QueueEntry.query.filter_by(queue_id=qid))
+        assert statuses[EntryStatus.WAITING] == 0
+        assert statuses[EntryStatus.SERVED] + statuses[EntryStatus.SKIPPED] == len(names)
+        successes = QueueEvent.query.filter(
+            QueueEvent.queue_id == qid,
+            QueueEvent.action.in_(["SERVE", "SKIP"]),
+            QueueEvent.result == "SUCCESS",
+        ).count()
+        assert successes == len(names)
+        _db.engine.dispose()
@@ -0,0 +1,144 @@
+"""Tests for POST /queues/<id>/join:batch — bulk ticket intake.
+
+Covers:
+  1. Valid names join with contiguous positions after existing entries.
+  2. Invalid and duplicate names (existing or repeated in the batch) get
+     their own rule_code while the rest still join.
+  3. A paused queue blocks the whole batch; unknown queues return 409.
+  4. dry_run reports outcomes and positions without writing anything.
+  5. Entries and events are written with a constant number of statements.
+  6. Malformed payloads are rejected with 400.
+"""
+
+from app.models.queue_entry import QueueEntry
+from app.models.queue_event import QueueEvent
+
+
+def _create(client, name="Batch Q"):
+    return client.post("/queues", json={"name": name}).get_json()["id"]
+
+
+def _batch(client, qid, names, dry_run=False):
+    path = f"/queues/{qid}/join:batch" + ("?dry_run=true" if dry_run else "")
+    return client.post(path, json={"user_names": names})
+
+
+def test_batch_join_assigns_contiguous_positions(client, db):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    resp = _batch(client, qid, ["Bob", "Carol", "Dave"])
+
+    assert resp.status_code == 201
+    body = resp.get_json()
+    assert body["joined"] == 3 and body["failed"] == 0
+    assert [r["position"] for r in body["results"]] == [2, 3, 4]
+    assert all(r["result"] == "joined" and r["status"] == "WAITING" for r in body["results"])
+    status = client.get(f"/queues/{qid}/status").get_json()
+    assert [e["user_name"] for e in status["entries"]] == ["Alice", "Bob", "Carol", "Dave"]
+
+
+def test_batch_join_reports_each_failure(client, db):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    body = _batch(client, qid, ["Bob", "Alice", "X", "R2D2", "Bob", "Carol"]).get_json()
+
+    outcomes = [(r["user_name"], r["result"], r.get("rule_code")) for r in body["results"]]
+    assert outcomes == [
+        ("Bob", "joined", None),
+        ("Alice", "blocked", "DUPLICATE_JOIN"),
+        ("X", "blocked", "INVALID_NAME"),
+        ("R2D2", "blocked", "INVALID_NAME"),
+        ("Bob", "blocked", "DUPLICATE_JOIN"),
+        ("Carol", "joined", None),
+    ]
+    assert [r["position"] for r in body["results"] if r["result"] == "joined"] == [2, 3]
+    assert body["joined"] == 2 and body["failed"] == 4
+
+
+def test_batch_where_nobody_joins_returns_200(client, db):
+    qid = _create(client)
+
+    resp = _batch(client, qid, ["1", "2"])
+
+    assert resp.status_code == 200
+    assert resp.get_json()["joined"] == 0
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 0
+
+
+def test_paused_queue_blocks_whole_batch(client, db):
+    qid = _create(client)
+    client.patch(f"/queues/{qid}/pause")
+
+    resp = _batch(client, qid, ["Alice", "Bob"])
+
+    assert resp.status_code == 409
+    assert resp.get_json()["rule_code"] == "QUEUE_PAUSED"
+
+
+def test_unknown_queue(client, db):
+    resp = _batch(client, 999, ["Alice"])
+    assert resp.status_code == 409
+    assert resp.get_json()["rule_code"] == "QUEUE_NOT_FOUND"
+
+
+def test_dry_run_writes_nothing(client, db):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    resp = _batch(client, qid, ["Bob", "Alice", "Carol"], dry_run=True)
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["dry_run"] is True
+    assert [(r["result"], r.get("position")) for r in body["results"]] == [
+        ("would_succeed", 2), ("would_fail", None), ("would_succeed", 3),
+    ]
+    assert db.session.query(QueueEntry).count() == 1
+    # The counter was only peeked at: a real join still gets position 2
+    assert _batch(client, qid, ["Bob"]).get_json()["results"][0]["position"] == 2
+
+
+def test_dry_run_on_paused_queue(client, db):
+    qid = _create(client)
+    client.patch(f"/queues/{qid}/pause")
+
+    body = _batch(client, qid, ["Alice"], dry_run=True).get_json()
+
+    assert body["result"] == "would_fail"
+    assert body["rule_code"] == "QUEUE_PAUSED"
+
+
+def test_events_recorded_per_name(client, db):
+    qid = _create(client)
+
+    _batch(client, qid, ["Alice", "Bob", "7"])
+
+    client.get(f"/queues/{qid}/events")  # flushes buffered BLOCKED events
+    events = db.session.query(QueueEvent).filter_by(queue_id=qid).all()
+    assert sorted((e.action, e.result) for e in events) == [
+        ("JOIN", "SUCCESS"), ("JOIN", "SUCCESS"), ("JOIN_ATTEMPT", "BLOCKED"),
+    ]
+
+
+def test_statement_count_does_not_grow_with_batch_size(client, db, query_counter):
+    qid = _create(client)
+    names = [f"User {chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(200)]
+
+    with query_counter() as small:
+        _batch(client, qid, names[:5])
+    with query_counter() as large:
+        _batch(client, qid, names[5:])
+
+    assert large.count == small.count
+    assert db.session.query(QueueEntry).count() == 200
+
+
+def test_rejects_malformed_payload(client, db):
+    qid = _create(client)
+
+    assert client.post(f"/queues/{qid}/join:batch", json={}).status_code == 400
+    assert _batch(client, qid, []).status_code == 400
+    assert _batch(client, qid, ["A" * 121]).status_code == 400
+    assert _batch(client, qid, ["Alice"] * 501).status_code == 400
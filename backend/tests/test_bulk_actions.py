@@ -0,0 +1,148 @@
+"""Tests for bulk serve/skip — PATCH /serve?count=N and /skip?count=N.
+
+Covers:
+  1. The first N WAITING entries are claimed in position order.
+  2. Fewer waiting than N claims whoever is waiting; none waiting → EMPTY_QUEUE.
+  3. Terminal entries are never touched; one SUCCESS event per entry.
+  4. dry_run reports who would be affected without writing.
+  5. The claim is a single UPDATE regardless of N.
+  6. Invalid counts are rejected; count=1 keeps the single-entry response.
+"""
+
+import threading
+
+from app import create_app
+from app.config import TestConfig
+from app.database import db as _db
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.models.queue_event import QueueEvent
+
+NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin"]
+
+
+def _queue_with(client, names=NAMES):
+    qid = client.post("/queues", json={"name": "Bulk Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join:batch", json={"user_names": names})
+    return qid
+
+
+def test_serve_count_claims_head_in_order(client, db):
+    qid = _queue_with(client)
+
+    resp = client.patch(f"/queues/{qid}/serve?count=3")
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["count"] == 3
+    assert [(e["user_name"], e["position"], e["status"]) for e in body["entries"]] == [
+        ("Alice", 1, "SERVED"), ("Bob", 2, "SERVED"), ("Carol", 3, "SERVED"),
+    ]
+    summary = client.get(f"/queues/{qid}/summary").get_json()
+    assert summary["waiting_count"] == 2 and summary["served_count"] == 3
+
+
+def test_skip_count_after_serve_leaves_served_untouched(client, db):
+    qid = _queue_with(client)
+    client.patch(f"/queues/{qid}/serve")
+
+    body = client.patch(f"/queues/{qid}/skip?count=2").get_json()
+
+    assert [e["user_name"] for e in body["entries"]] == ["Bob", "Carol"]
+    statuses = {e.user_name: e.status for e in db.session.query(QueueEntry)}
+    assert statuses["Alice"] == EntryStatus.SERVED
+    assert statuses["Bob"] == statuses["Carol"] == EntryStatus.SKIPPED
+    assert statuses["Dave"] == EntryStatus.WAITING
+
+
+def test_count_larger_than_queue_claims_everyone(client, db):
+    qid = _queue_with(client, ["Alice", "Bob"])
+
+    body = client.patch(f"/queues/{qid}/serve?count=10").get_json()
+
+    assert body["count"] == 2
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 0
+
+
+def test_empty_queue_is_blocked(client, db):
+    qid = _queue_with(client, [])
+
+    for action in ("serve", "skip"):
+        resp = client.patch(f"/queues/{qid}/{action}?count=5")
+        assert resp.status_code == 409
+        assert resp.get_json()["rule_code"] == "EMPTY_QUEUE"
+
+
+def test_one_event_per_entry(client, db):
+    qid = _queue_with(client)
+
+    client.patch(f"/queues/{qid}/serve?count=3")
+
+    events = db.session.query(QueueEvent).filter_by(queue_id=qid, action="SERVE").all()
+    assert len(events) == 3
+    assert all(e.result == "SUCCESS" for e in events)
+
+
+def test_dry_run_reports_targets_without_writing(client, db):
+    qid = _queue_with(client)
+
+    body = client.patch(f"/queues/{qid}/skip?count=2&dry_run=true").get_json()
+
+    assert body == {"dry_run": True, "result": "would_succeed", "count": 2, "user_names": ["Alice", "Bob"]}
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 5
+
+
+def test_claim_is_one_update(client, db, query_counter):
+    qid = _queue_with(client)
+
+    with query_counter() as counted:
+        client.patch(f"/queues/{qid}/serve?count=4")
+
+    updates = [s for s in counted.statements if s.startswith("UPDATE queue_entries")]
+    assert len(updates) == 1
+
+
+def test_invalid_count_rejected(client, db):
+    qid = _queue_with(client)
+
+    for value in ("0", "-1", "abc", "101"):
+        assert client.patch(f"/queues/{qid}/serve?count={value}").status_code == 400
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 5
+
+
+def test_count_one_keeps_single_response(client, db):
+    qid = _queue_with(client)
+
+    body = client.patch(f"/queues/{qid}/serve?count=1").get_json()
+
+    assert body["user_name"] == "Alice"
+    assert body["status"] == "SERVED"
+
+
+def test_concurrent_bulk_serves_never_double_claim(tmp_path):
+    class StressConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'bulk.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 60}}
+
+    app = create_app(StressConfig)
+    names = [f"User {chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(200)]
+    qid = _queue_with(app.test_client(), names[:100])
+    app.test_client().post(f"/queues/{qid}/join:batch", json={"user_names": names[100:]})
+    claimed = []
+
+    def worker():
+        client = app.test_client()
+        while True:
+            resp = client.patch(f"/queues/{qid}/serve?count=7")
+            if resp.status_code != 200:
+                return
+            claimed.extend(e["entry_id"] for e in resp.get_json()["entries"])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(claimed) == len(set(claimed)) == 200
+    with app.app_context():
+        _db.engine.dispose()
@@ -0,0 +1,223 @@
+"""Tests for cross-worker change notifications (app/change_feed.py).
+
+Two app instances sharing one database file stand in for two gunicorn
+workers.
+
+Covers:
+  1. Every mutation appends a change-log row tagged with the writer's origin.
+  2. Polling invalidates the other worker's cache and wakes its subscribers.
+  3. A worker skips its own changes.
+  4. Another worker's cached summary reflects the write after a poll.
+  5. The live tailer thread delivers a change within a fraction of a second.
+  6. Old rows are trimmed without reusing sequence numbers; failed polls clear the cache.
+  7. A seq that commits after a higher one was read is still applied;
+     gaps that never fill are dropped after CHANGE_GAP_TIMEOUT_SECONDS.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.config import TestConfig
+from app.database import db as _db
+from app.models.queue_change import QueueChange
+
+
+def _workers(tmp_path, poll_interval):
+    class WorkerConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'shared.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
+        CHANGE_FEED_ENABLED = True
+        CHANGE_POLL_INTERVAL = poll_interval
+
+    return create_app(WorkerConfig), create_app(WorkerConfig)
+
+
+@pytest.fixture()
+def workers(tmp_path):
+    """Two workers whose tailer threads never poll on their own."""
+    apps = _workers(tmp_path, poll_interval=3600)
+    yield apps
+    for app in apps:
+        app.extensions["queuewise_changes"].stop()
+        with app.app_context():
+            _db.engine.dispose()
+
+
+def _feed(app):
+    return app.extensions["queuewise_changes"]
+
+
+def _setup_queue(a, b):
+    """Create a queue with one waiting user and warm worker B's cache."""
+    qid = a.test_client().post("/queues", json={"name": "Shared"}).get_json()["id"]
+    a.test_client().post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    summary = b.test_client().get(f"/queues/{qid}/summary").get_json()
+    assert summary["waiting_count"] == 1
+    _feed(b).poll()  # catch up on the setup writes
+    return qid
+
+
+def test_mutation_appends_change_row(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+
+    a.test_client().patch(f"/queues/{qid}/serve")
+
+    with a.app_context():
+        last = _db.session.query(QueueChange).order_by(QueueChange.seq.desc()).first()
+        assert last.queue_id == qid
+        assert last.origin == _feed(a).origin
+
+
+def test_blocked_and_dry_run_actions_log_nothing(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    with a.app_context():
+        before = _db.session.query(QueueChange).count()
+
+    a.test_client().post(f"/queues/{qid}/join", json={"user_name": "Alice"})  # duplicate
+    a.test_client().patch(f"/queues/{qid}/serve?dry_run=true")
+
+    with a.app_context():
+        assert _db.session.query(QueueChange).count() == before
+
+
+def test_poll_invalidates_other_worker(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    broker = b.extensions["queuewise_broker"]
+
+    with broker.subscribe(qid) as sub:
+        a.test_client().patch(f"/queues/{qid}/serve")
+        assert b.extensions["queuewise_cache"].get(qid) is not None
+
+        assert _feed(b).poll() == 1
+
+        assert b.extensions["queuewise_cache"].get(qid) is None
+        assert sub.wait(timeout=0) is not None
+
+
+def test_worker_skips_its_own_changes(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    _feed(a).poll()
+    a.test_client().get(f"/queues/{qid}/summary")
+
+    a.test_client().patch(f"/queues/{qid}/pause")
+    a.test_client().get(f"/queues/{qid}/summary")  # re-cached after local invalidation
+
+    assert _feed(a).poll() == 0
+    assert a.extensions["queuewise_cache"].get(qid) is not None
+
+
+def test_other_worker_serves_fresh_summary(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+
+    a.test_client().patch(f"/queues/{qid}/serve")
+    _feed(b).poll()
+
+    summary = b.test_client().get(f"/queues/{qid}/summary").get_json()
+    assert summary["waiting_count"] == 0
+    assert summary["served_count"] == 1
+
+
+def test_live_feed_delivers_change_quickly(tmp_path):
+    a, b = _workers(tmp_path, poll_interval=0.01)
+    try:
+        qid = a.test_client().post("/queues", json={"name": "Live"}).get_json()["id"]
+        b.test_client().get(f"/queues/{qid}/summary")  # starts B's tailer
+        broker = b.extensions["queuewise_broker"]
+
+        with broker.subscribe(qid) as sub:
+            started = time.monotonic()
+            a.test_client().post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+            assert sub.wait(timeout=2.0) is not None
+            assert time.monotonic() - started < 1.0
+
+        assert b.test_client().get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 1
+    finally:
+        for app in (a, b):
+            _feed(app).stop()
+            with app.app_context():
+                _db.engine.dispose()
+
+
+def test_trim_removes_old_rows_without_reusing_seq(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    with a.app_context():
+        last_seq = _db.session.query(_db.func.max(QueueChange.seq)).scalar()
+        old = datetime.now(timezone.utc) - timedelta(days=1)
+        _db.session.query(QueueChange).update({"changed_at": old})
+        _db.session.commit()
+
+    assert _feed(a).trim() >= 1
+
+    a.test_client().patch(f"/queues/{qid}/serve")
+    with a.app_context():
+        assert _db.session.query(QueueChange.seq).scalar() > last_seq
+
+
+def test_failed_poll_clears_cache(workers, monkeypatch):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    feed = _feed(b)
+    calls = []
+
+    def broken_poll():
+        calls.append(1)
+        feed._stop.set()
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(feed, "poll", broken_poll)
+    feed.poll_interval = 0
+    feed._stop.clear()
+    feed._run()
+
+    assert calls
+    assert b.extensions["queuewise_cache"].get(qid) is None
+
+
+def _log_change(app, seq, queue_id):
+    """Commit a change row with an explicit seq, as a late writer would."""
+    with app.app_context():
+        _db.session.add(QueueChange(seq=seq, queue_id=queue_id, origin="other-worker"))
+        _db.session.commit()
+
+
+def test_late_commit_of_lower_seq_is_applied(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    feed = _feed(b)
+    cache = b.extensions["queuewise_cache"]
+    seq = feed._last_seq
+
+    _log_change(a, seq + 2, qid)  # seq + 1 is still in flight
+    assert feed.poll() == 1
+    b.test_client().get(f"/queues/{qid}/summary")
+
+    _log_change(a, seq + 1, qid)
+    assert cache.get(qid) is not None
+    assert feed.poll() == 1
+    assert cache.get(qid) is None
+    assert feed._gaps == {}
+    assert feed.poll() == 0
+
+
+def test_unfilled_gap_expires(workers):
+    a, b = workers
+    qid = _setup_queue(a, b)
+    feed = _feed(b)
+    seq = feed._last_seq
+
+    _log_change(a, seq + 3, qid)
+    feed.poll()
+    assert set(feed._gaps) == {seq + 1, seq + 2}
+
+    feed.gap_timeout = -1
+    feed.poll()
+    assert feed._gaps == {}
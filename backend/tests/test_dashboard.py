@@ -0,0 +1,141 @@
+"""Tests for GET /queues/status?ids=... — the multi-queue dashboard.
+
+Covers:
+  1. Each queue gets status + summary in the single-queue shapes, plus its latest events.
+  2. Status entries are the WAITING slice; counts include terminal entries.
+  3. Unknown ids are reported as missing; bad ids are rejected with 400.
+  4. The statement count does not grow with the number of queues.
+  5. Cached queues cost no SQL; mutations are reflected.
+  6. Latest events are an index seek per queue, newest (then highest
+     id) first, whatever the queue's event count.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.queue_event import QueueEvent
+from app.repositories import queue_repository as repo
+
+
+def _queue(client, name, users=(), serve=0):
+    qid = client.post("/queues", json={"name": name}).get_json()["id"]
+    if users:
+        client.post(f"/queues/{qid}/join:batch", json={"user_names": list(users)})
+    for _ in range(serve):
+        client.patch(f"/queues/{qid}/serve")
+    return qid
+
+
+def _dashboard(client, ids, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    return client.get(f"/queues/status?ids={','.join(map(str, ids))}&{query}")
+
+
+def test_returns_status_summary_and_events_per_queue(client, db):
+    a = _queue(client, "Front Desk", ["Alice", "Bob", "Carol"], serve=1)
+    b = _queue(client, "Lab")
+
+    resp = _dashboard(client, [a, b])
+
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["missing"] == []
+    first, second = body["queues"]
+    assert first["status"]["queue_name"] == "Front Desk"
+    assert [e["user_name"] for e in first["status"]["entries"]] == ["Bob", "Carol"]
+    assert set(first["status"]["wait_explanations"]) == {"Bob", "Carol"}
+    assert first["summary"]["served_count"] == 1
+    assert first["summary"]["waiting_count"] == 2
+    assert first["events"][0]["action"] == "SERVE"
+    assert second["status"]["entries"] == []
+    assert second["events"] == []
+
+
+def test_matches_single_queue_summary(client, db):
+    qid = _queue(client, "Front Desk", ["Alice", "Bob"], serve=1)
+
+    item = _dashboard(client, [qid]).get_json()["queues"][0]
+
+    assert item["summary"] == client.get(f"/queues/{qid}/summary").get_json()
+
+
+def test_events_limit(client, db):
+    qid = _queue(client, "Busy", ["Alice", "Bob", "Carol", "Dave"], serve=3)
+
+    item = _dashboard(client, [qid], events=2).get_json()["queues"][0]
+
+    assert [e["action"] for e in item["events"]] == ["SERVE", "SERVE"]
+    assert _dashboard(client, [qid], events=0).get_json()["queues"][0]["events"] == []
+
+
+def test_latest_events_seek_each_queue(db, query_counter):
+    at = datetime(2025, 6, 1, 12, 0)
+    db.session.execute(insert(QueueEvent), [
+        {"queue_id": qid, "action": "JOIN", "result": "SUCCESS", "detail": str(n),
+         "request_id": "r", "created_at": at}
+        for qid, count in ((1, 50), (2, 3)) for n in range(count)
+    ])
+    db.session.commit()
+
+    with query_counter() as counted:
+        latest = repo.get_latest_events_for([1, 2, 3], 4)
+
+    assert [e.detail for e in latest[1]] == ["49", "48", "47", "46"]
+    assert [e.detail for e in latest[2]] == ["2", "1", "0"]
+    assert latest[3] == []
+    assert counted.count == 1
+    plan = [row[-1] for row in db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + counted.statements[0], counted.parameters[0]).fetchall()]
+    seeks = [line for line in plan if "ix_queue_events_queue_created (queue_id=?)" in line]
+    assert len(seeks) == 3 and "ROW_NUMBER" not in counted.statements[0].upper()
+
+
+def test_preserves_order_and_reports_missing(client, db):
+    a = _queue(client, "A")
+    b = _queue(client, "B")
+
+    body = _dashboard(client, [b, 999, a, b]).get_json()
+
+    assert [q["status"]["queue_id"] for q in body["queues"]] == [b, a]
+    assert body["missing"] == [999]
+
+
+@pytest.mark.parametrize("ids", ["", "1,x", ",".join(str(i) for i in range(1, 52))])
+def test_rejects_bad_ids(client, db, ids):
+    assert client.get(f"/queues/status?ids={ids}").status_code == 400
+
+
+def test_constant_statement_count(app, client, db, query_counter):
+    small = [_queue(client, f"Q{i}", ["Alice", "Bob"]) for i in range(2)]
+    large = [_queue(client, f"R{i}", ["Alice", "Bob"]) for i in range(10)]
+    app.extensions["queuewise_cache"].clear()
+
+    with query_counter() as few:
+        _dashboard(client, small)
+    with query_counter() as many:
+        _dashboard(client, large)
+
+    assert many.count == few.count <= 4
+
+
+def test_cached_queues_only_query_events(client, db, query_counter):
+    ids = [_queue(client, f"Q{i}", ["Alice"]) for i in range(3)]
+    _dashboard(client, ids)
+
+    with query_counter() as counted:
+        _dashboard(client, ids)
+
+    assert counted.count == 1
+    assert "queue_events" in counted.statements[0]
+
+
+def test_reflects_mutations(client, db):
+    qid = _queue(client, "Q", ["Alice", "Bob"])
+    _dashboard(client, [qid])
+
+    client.patch(f"/queues/{qid}/serve")
+
+    summary = _dashboard(client, [qid]).get_json()["queues"][0]["summary"]
+    assert summary["waiting_count"] == 1 and summary["served_count"] == 1
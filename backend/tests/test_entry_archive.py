@@ -0,0 +1,165 @@
+"""Tests for archiving terminal entries — queue_entries_archive + GET /history.
+
+Covers:
+  1. Old SERVED/SKIPPED entries move to the archive in bounded batches;
+     WAITING and recent entries stay.
+  2. Summary, dashboard and list counts are unchanged by archiving.
+  3. GET /queues/<id>/history pages archived entries by position.
+  4. Archiving changes the queue version, so cached status is refreshed.
+  5. dry_run only counts.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.models.queue_entry_archive import QueueEntryArchive
+from app.retention import run_entry_archival
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def _queue(client, names, serve=0, skip=0):
+    qid = client.post("/queues", json={"name": "Archive Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join:batch", json={"user_names": names})
+    if serve:
+        client.patch(f"/queues/{qid}/serve?count={serve}")
+    if skip:
+        client.patch(f"/queues/{qid}/skip?count={skip}")
+    return qid
+
+
+def _age(db, qid, days):
+    db.session.execute(
+        update(QueueEntry).where(QueueEntry.queue_id == qid)
+        .values(joined_at=NOW - timedelta(days=days))
+    )
+    db.session.commit()
+
+
+@pytest.fixture()
+def archive_app(app):
+    app.config.update(ENTRY_ARCHIVE_AFTER_SECONDS=7 * 86400, EVENT_RETENTION_BATCH_PAUSE=0)
+    return app
+
+
+def test_moves_only_old_terminal_entries(archive_app, client, db):
+    old = _queue(client, ["Alice", "Bob", "Carol", "Dave"], serve=2, skip=1)
+    recent = _queue(client, ["Erin", "Frank"], serve=1)
+    _age(db, old, 30)
+    _age(db, recent, 1)
+
+    report = run_entry_archival(archive_app, now=NOW)
+
+    assert report.archived == {old: 3}
+    live = {(e.queue_id, e.user_name) for e in db.session.query(QueueEntry)}
+    assert live == {(old, "Dave"), (recent, "Erin"), (recent, "Frank")}
+    archived = db.session.query(QueueEntryArchive).order_by(QueueEntryArchive.position).all()
+    assert [(a.user_name, a.status) for a in archived] == [
+        ("Alice", EntryStatus.SERVED), ("Bob", EntryStatus.SERVED), ("Carol", EntryStatus.SKIPPED),
+    ]
+
+
+def test_counts_survive_archiving(archive_app, client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave"], serve=2, skip=1)
+    _age(db, qid, 30)
+    before = client.get(f"/queues/{qid}/summary").get_json()
+
+    run_entry_archival(archive_app, now=NOW)
+
+    after = client.get(f"/queues/{qid}/summary").get_json()
+    assert after == before
+    assert (after["served_count"], after["skipped_count"], after["waiting_count"]) == (2, 1, 1)
+    dashboard = client.get(f"/queues/status?ids={qid}").get_json()["queues"][0]["summary"]
+    assert dashboard == after
+    listed = client.get("/queues").get_json()[0]
+    assert listed["total_count"] == 4 and listed["waiting_count"] == 1
+
+
+def test_counts_keep_adding_after_archiving(archive_app, client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol"], serve=1)
+    _age(db, qid, 30)
+    run_entry_archival(archive_app, now=NOW)
+
+    client.patch(f"/queues/{qid}/serve")
+
+    summary = client.get(f"/queues/{qid}/summary").get_json()
+    assert summary["served_count"] == 2 and summary["waiting_count"] == 1
+
+
+def test_batches_are_bounded(archive_app, client, db, query_counter):
+    archive_app.config["ENTRY_ARCHIVE_BATCH_SIZE"] = 4
+    names = [f"User {chr(97 + i)}" for i in range(10)]
+    qid = _queue(client, names, serve=10)
+    _age(db, qid, 30)
+
+    with query_counter() as counted:
+        report = run_entry_archival(archive_app, now=NOW)
+
+    deletes = [s for s in counted.statements if s.startswith("DELETE FROM queue_entries")]
+    assert len(deletes) == 3
+    assert report.total == 10
+    assert client.get(f"/queues/{qid}/summary").get_json()["served_count"] == 10
+
+
+def test_max_batches_and_dry_run(archive_app, client, db):
+    archive_app.config["ENTRY_ARCHIVE_BATCH_SIZE"] = 2
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave", "Erin"], serve=5)
+    _age(db, qid, 30)
+
+    assert run_entry_archival(archive_app, now=NOW, dry_run=True).total == 5
+    assert db.session.query(QueueEntryArchive).count() == 0
+
+    assert run_entry_archival(archive_app, now=NOW, max_batches=1).total == 2
+    assert db.session.query(QueueEntry).count() == 3
+
+
+def test_history_pages_by_position(archive_app, client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave", "Erin"], serve=3, skip=1)
+    _age(db, qid, 30)
+    run_entry_archival(archive_app, now=NOW)
+
+    first = client.get(f"/queues/{qid}/history?limit=3").get_json()
+    second = client.get(f"/queues/{qid}/history?limit=3&after_position={first['next_cursor']}").get_json()
+    skipped = client.get(f"/queues/{qid}/history?status=SKIPPED").get_json()
+
+    assert [e["user_name"] for e in first["entries"]] == ["Alice", "Bob", "Carol"]
+    assert first["next_cursor"] == 3
+    assert [e["user_name"] for e in second["entries"]] == ["Dave"]
+    assert second["next_cursor"] is None
+    assert [e["status"] for e in skipped["entries"]] == ["SKIPPED"]
+    assert first["archived_served_count"] == 3 and first["archived_skipped_count"] == 1
+
+
+def test_history_validation_and_missing_queue(client, db):
+    qid = _queue(client, ["Alice"])
+
+    assert client.get(f"/queues/{qid}/history").get_json()["entries"] == []
+    assert client.get(f"/queues/{qid}/history?status=WAITING").status_code == 400
+    assert client.get(f"/queues/{qid}/history?limit=0").status_code == 400
+    assert client.get("/queues/999/history").status_code == 404
+
+
+def test_archiving_refreshes_cached_status(archive_app, client, db):
+    qid = _queue(client, ["Alice", "Bob"], serve=1)
+    _age(db, qid, 30)
+    first = client.get(f"/queues/{qid}/status")
+    assert [e["user_name"] for e in first.get_json()["entries"]] == ["Alice", "Bob"]
+
+    run_entry_archival(archive_app, now=NOW)
+
+    resp = client.get(f"/queues/{qid}/status", headers={"If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 200
+    assert [e["user_name"] for e in resp.get_json()["entries"]] == ["Bob"]
+
+
+def test_archive_keeps_entry_ids(archive_app, client, db):
+    qid = _queue(client, ["Alice", "Bob"], serve=1)
+    entry_id = db.session.query(QueueEntry).filter_by(user_name="Alice").one().id
+    _age(db, qid, 30)
+
+    run_entry_archival(archive_app, now=NOW)
+
+    assert db.session.get(QueueEntryArchive, entry_id).user_name == "Alice"
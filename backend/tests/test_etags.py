@@ -0,0 +1,103 @@
+"""Tests for ETag / conditional GET support on read endpoints.
+
+Covers:
+  1. Read endpoints return an ETag and answer If-None-Match with 304.
+  2. A 304 costs a single primary-key lookup — no entries, no schemas.
+  3. Every mutating action changes the ETag; dry runs do not.
+  4. BLOCKED attempts change the events ETag but not the status ETag.
+  5. The queue list ETag changes on create and on queue actions.
+"""
+
+import pytest
+
+
+def _create(client, name="ETag Q"):
+    return client.post("/queues", json={"name": name}).get_json()["id"]
+
+
+def _etag(client, path):
+    resp = client.get(path)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"]
+    return resp.headers["ETag"]
+
+
+@pytest.mark.parametrize("suffix", ["status", "summary", "preview", "events"])
+def test_if_none_match_returns_304(client, db, suffix):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    path = f"/queues/{qid}/{suffix}"
+    etag = _etag(client, path)
+
+    resp = client.get(path, headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert resp.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("suffix", ["status", "summary", "preview", "events"])
+def test_304_costs_at_most_one_primary_key_lookup(client, db, query_counter, suffix):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    path = f"/queues/{qid}/{suffix}"
+    etag = _etag(client, path)
+
+    with query_counter() as counted:
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    # Zero when the queue's state is cached, one version lookup otherwise
+    assert counted.count <= 1
+    assert not any("queue_entries" in sql or "queue_events" in sql for sql in counted.statements)
+
+
+def test_mutations_change_etag(client, db):
+    qid = _create(client)
+    path = f"/queues/{qid}/status"
+    seen = {_etag(client, path)}
+
+    for method, action, body in [
+        ("post", "join", {"user_name": "Alice"}),
+        ("post", "join", {"user_name": "Bob"}),
+        ("patch", "serve", None),
+        ("patch", "skip", None),
+        ("patch", "pause", None),
+        ("patch", "resume", None),
+    ]:
+        resp = getattr(client, method)(f"/queues/{qid}/{action}", json=body)
+        assert resp.status_code in (200, 201)
+        etag = _etag(client, path)
+        assert etag not in seen
+        seen.add(etag)
+
+    client.patch(f"/queues/{qid}/serve?dry_run=true")
+    assert _etag(client, path) in seen
+
+
+def test_blocked_attempt_changes_only_events_etag(client, db):
+    qid = _create(client)
+    status_etag = _etag(client, f"/queues/{qid}/status")
+    events_etag = _etag(client, f"/queues/{qid}/events")
+
+    client.patch(f"/queues/{qid}/serve")  # EMPTY_QUEUE -> BLOCKED event
+
+    assert _etag(client, f"/queues/{qid}/status") == status_etag
+    assert _etag(client, f"/queues/{qid}/events") != events_etag
+
+
+def test_list_etag_tracks_creates_and_actions(client, db):
+    qid = _create(client)
+    first = _etag(client, "/queues")
+    assert client.get("/queues", headers={"If-None-Match": first}).status_code == 304
+
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    second = _etag(client, "/queues")
+    _create(client, "Another")
+    third = _etag(client, "/queues")
+
+    assert len({first, second, third}) == 3
+
+
+def test_missing_queue_has_no_etag(client, db):
+    resp = client.get("/queues/999/status", headers={"If-None-Match": "*"})
+    assert resp.status_code == 404
@@ -0,0 +1,175 @@
+"""Tests for the paginated, filterable event timeline and NDJSON export.
+
+Covers:
+  1. X-Next-Cursor pages through every event exactly once, including
+     events that share a created_at timestamp.
+  2. ?order=asc, ?action=, ?result=, ?request_id=, ?since= / ?until= filter the timeline.
+  3. Limits above 100 are honoured up to EVENTS_PAGE_MAX; bad params return 400.
+  4. ?format=ndjson streams every matching event, one JSON object per line.
+  5. The timeline query uses the composite indexes.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.queue_event import QueueEvent
+
+
+def _queue(client):
+    return client.post("/queues", json={"name": "Events Q"}).get_json()["id"]
+
+
+def _seed(db, qid, n, same_time=False, start=datetime(2025, 1, 1)):
+    """Insert n events directly; with same_time every row shares one timestamp."""
+    db.session.execute(insert(QueueEvent), [
+        {
+            "queue_id": qid,
+            "action": "JOIN" if i % 2 == 0 else "SERVE",
+            "result": "SUCCESS" if i % 3 else "BLOCKED",
+            "detail": "",
+            "request_id": f"req-{i}",
+            "created_at": start if same_time else start + timedelta(seconds=i),
+        }
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+def _walk(client, qid, **params):
+    """Follow X-Next-Cursor until the last page; return all event ids."""
+    ids, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        resp = client.get(f"/queues/{qid}/events", query_string=query)
+        assert resp.status_code == 200
+        ids += [e["id"] for e in resp.get_json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("same_time", [False, True])
+def test_cursor_visits_every_event_once(client, db, same_time):
+    qid = _queue(client)
+    _seed(db, qid, 23, same_time=same_time)
+
+    ids = _walk(client, qid, limit=5)
+
+    assert len(ids) == len(set(ids)) == 23
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_ascending_order(client, db):
+    qid = _queue(client)
+    _seed(db, qid, 12)
+
+    ids = _walk(client, qid, limit=5, order="asc")
+
+    assert ids == sorted(ids) and len(ids) == 12
+
+
+def test_filters(client, db):
+    qid = _queue(client)
+    _seed(db, qid, 30)
+
+    serves = client.get(f"/queues/{qid}/events?action=SERVE&limit=100").get_json()
+    blocked = client.get(f"/queues/{qid}/events?result=BLOCKED&limit=100").get_json()
+    traced = client.get(f"/queues/{qid}/events?request_id=req-7").get_json()
+    window = client.get(
+        f"/queues/{qid}/events?since=2025-01-01T00:00:10&until=2025-01-01T00:00:20&limit=100"
+    ).get_json()
+
+    assert len(serves) == 15 and {e["action"] for e in serves} == {"SERVE"}
+    assert len(blocked) == 10 and {e["result"] for e in blocked} == {"BLOCKED"}
+    assert [e["request_id"] for e in traced] == ["req-7"]
+    assert sorted(e["request_id"] for e in window) == sorted(f"req-{i}" for i in range(10, 20))
+
+
+def test_timezone_aware_bounds_are_normalized(client, db):
+    qid = _queue(client)
+    _seed(db, qid, 10)
+
+    # 01:00:05+01:00 is 00:00:05 UTC
+    events = client.get(
+        f"/queues/{qid}/events", query_string={"since": "2025-01-01T01:00:05+01:00", "limit": 100}
+    ).get_json()
+
+    assert len(events) == 5
+
+
+def test_limit_above_100(client, db):
+    qid = _queue(client)
+    _seed(db, qid, 300)
+
+    assert len(client.get(f"/queues/{qid}/events?limit=250").get_json()) == 250
+
+
+def test_limit_capped_at_page_max(app, client, db):
+    app.config["EVENTS_PAGE_MAX"] = 20
+    qid = _queue(client)
+    _seed(db, qid, 30)
+
+    resp = client.get(f"/queues/{qid}/events?limit=500")
+
+    assert len(resp.get_json()) == 20
+    assert resp.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize("query", [
+    "limit=0", "cursor=not-a-cursor", "result=MAYBE", "since=yesterday", "format=xml", "order=up",
+])
+def test_invalid_params(client, db, query):
+    qid = _queue(client)
+    assert client.get(f"/queues/{qid}/events?{query}").status_code == 400
+
+
+def test_ndjson_export_streams_everything(client, db):
+    qid = _queue(client)
+    _seed(db, qid, 2500)
+
+    resp = client.get(f"/queues/{qid}/events?format=ndjson&order=asc")
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(rows) == 2500
+    assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+    assert rows[0]["created_at"] == "2025-01-01T00:00:00"
+
+
+def test_ndjson_export_is_filtered_and_paged_internally(client, db, query_counter):
+    qid = _queue(client)
+    _seed(db, qid, 2500)
+
+    with query_counter() as counted:
+        resp = client.get(f"/queues/{qid}/events?format=ndjson&action=JOIN")
+        lines = resp.get_data(as_text=True).splitlines()
+
+    assert len(lines) == 1250
+    timeline = [s for s in counted.statements if "FROM queue_events" in s]
+    assert len(timeline) == 2  # two keyset batches of up to 1000 rows
+
+
+def test_ndjson_unknown_queue(client, db):
+    assert client.get("/queues/999/events?format=ndjson").status_code == 404
+
+
+@pytest.mark.parametrize("params, index", [
+    ("", "ix_queue_events_queue_created"),
+    ("action=JOIN", "ix_queue_events_queue_action_created"),
+    ("result=BLOCKED", "ix_queue_events_queue_result_created"),
+])
+def test_timeline_queries_use_indexes(client, db, query_counter, params, index):
+    qid = _queue(client)
+    _seed(db, qid, 50)
+
+    with query_counter() as counted:
+        client.get(f"/queues/{qid}/events?{params}")
+
+    sql = next(s for s in counted.statements if "queue_events.detail" in s)
+    parameters = counted.parameters[counted.statements.index(sql)]
+    plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    assert any(index in row[-1] for row in plan), plan
@@ -0,0 +1,185 @@
+"""Tests for event retention — rollups, archive segments and batched deletes.
+
+Covers:
+  1. Events past their action's TTL are deleted; younger ones are kept.
+  2. Deleted rows are counted into per-queue, per-hour rollups, which
+     accumulate across runs.
+  3. Deleted rows are archived to gzip JSONL segments, exactly once each.
+  4. Deletes run in bounded batches; max_batches stops early.
+  5. dry_run counts without writing; a failed archive deletes nothing.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app import create_app
+from app.config import TestConfig
+from app.models.queue_event import QueueEvent
+from app.models.queue_event_rollup import QueueEventRollup
+from app.retention import read_segment, run_retention
+
+NOW = datetime(2025, 6, 1, 12, 0)
+DAY = 86400
+
+
+def _queue(client, name="Retention Q"):
+    return client.post("/queues", json={"name": name}).get_json()["id"]
+
+
+def _seed(db, qid, action, n, age, result="SUCCESS"):
+    """Insert n events of `action`, `age` old, one second apart."""
+    db.session.execute(insert(QueueEvent), [
+        {
+            "queue_id": qid, "action": action, "result": result, "detail": "",
+            "request_id": f"{action}-{i}", "created_at": NOW - age - timedelta(seconds=i),
+        }
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+def _remaining(db, action=None):
+    query = select(func.count(QueueEvent.id))
+    if action:
+        query = query.where(QueueEvent.action == action)
+    return db.session.execute(query).scalar_one()
+
+
+def _configure(app, tmp_path, **overrides):
+    app.config.update({
+        "EVENT_RETENTION_SECONDS": 30 * DAY,
+        "EVENT_RETENTION_TTLS": {"JOIN_ATTEMPT": DAY},
+        "EVENT_RETENTION_BATCH_PAUSE": 0,
+        "EVENT_ARCHIVE_DIR": str(tmp_path / "archive"),
+        **overrides,
+    })
+
+
+def test_per_action_ttls(app, client, db, tmp_path):
+    _configure(app, tmp_path)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 5, timedelta(days=2), result="BLOCKED")
+    _seed(db, qid, "SERVE", 4, timedelta(days=2))
+    _seed(db, qid, "SERVE", 3, timedelta(days=40))
+
+    report = run_retention(app, now=NOW)
+
+    assert report.expired == {"JOIN_ATTEMPT": 5, "SERVE": 3}
+    assert _remaining(db, "JOIN_ATTEMPT") == 0
+    assert _remaining(db, "SERVE") == 4
+
+
+def test_rollups_count_per_hour_and_accumulate(app, client, db, tmp_path):
+    _configure(app, tmp_path)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 3, timedelta(days=2, minutes=-30), result="BLOCKED")
+
+    run_retention(app, now=NOW)
+    _seed(db, qid, "JOIN_ATTEMPT", 2, timedelta(days=2, minutes=-40), result="BLOCKED")
+    run_retention(app, now=NOW)
+
+    rollups = db.session.execute(select(QueueEventRollup)).scalars().all()
+    assert [(r.queue_id, r.hour, r.action, r.result, r.count) for r in rollups] == [
+        (qid, datetime(2025, 5, 30, 12, 0), "JOIN_ATTEMPT", "BLOCKED", 5),
+    ]
+
+
+def test_archive_holds_every_deleted_row_once(app, client, db, tmp_path):
+    _configure(app, tmp_path, EVENT_RETENTION_BATCH_SIZE=4)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 10, timedelta(days=3), result="BLOCKED")
+    expected = {e.request_id for e in db.session.query(QueueEvent)}
+
+    report = run_retention(app, now=NOW)
+
+    assert len(report.segments) == 3
+    archived = [row for path in report.segments for row in read_segment(path)]
+    assert sorted(r["request_id"] for r in archived) == sorted(expected)
+    assert len({r["id"] for r in archived}) == 10
+    assert archived[0]["created_at"].startswith("2025-05-29")
+    assert not list((tmp_path / "archive").glob("*.tmp"))
+
+
+def test_deletes_run_in_bounded_batches(app, client, db, tmp_path, query_counter):
+    _configure(app, tmp_path, EVENT_RETENTION_BATCH_SIZE=10)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 35, timedelta(days=3), result="BLOCKED")
+
+    with query_counter() as counted:
+        run_retention(app, now=NOW)
+
+    deletes = [s for s in counted.statements if s.startswith("DELETE FROM queue_events")]
+    assert len(deletes) == 4
+    assert all("LIMIT" in s for s in deletes)
+    assert _remaining(db) == 0
+
+
+def test_max_batches_stops_early(app, client, db, tmp_path):
+    _configure(app, tmp_path, EVENT_RETENTION_BATCH_SIZE=10)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 35, timedelta(days=3), result="BLOCKED")
+
+    report = run_retention(app, now=NOW, max_batches=2)
+
+    assert report.total == 20
+    assert _remaining(db) == 15
+
+
+def test_dry_run_writes_nothing(app, client, db, tmp_path):
+    _configure(app, tmp_path)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 6, timedelta(days=2), result="BLOCKED")
+
+    report = run_retention(app, now=NOW, dry_run=True)
+
+    assert report.expired == {"JOIN_ATTEMPT": 6}
+    assert _remaining(db) == 6
+    assert db.session.query(QueueEventRollup).count() == 0
+    assert not (tmp_path / "archive").exists()
+
+
+def test_failed_archive_deletes_nothing(app, client, db, tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    _configure(app, tmp_path, EVENT_ARCHIVE_DIR=str(blocker))
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 3, timedelta(days=2), result="BLOCKED")
+
+    with pytest.raises(OSError):
+        run_retention(app, now=NOW)
+
+    assert _remaining(db) == 3
+    assert db.session.query(QueueEventRollup).count() == 0
+
+
+def test_archiving_can_be_disabled(app, client, db, tmp_path):
+    _configure(app, tmp_path, EVENT_ARCHIVE_DIR="")
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 3, timedelta(days=2), result="BLOCKED")
+
+    report = run_retention(app, now=NOW)
+
+    assert report.total == 3 and report.segments == []
+    assert db.session.query(func.sum(QueueEventRollup.count)).scalar() == 3
+
+
+def test_timeline_skips_purged_rows(app, client, db, tmp_path):
+    _configure(app, tmp_path)
+    qid = _queue(client)
+    _seed(db, qid, "JOIN_ATTEMPT", 3, timedelta(days=2), result="BLOCKED")
+    _seed(db, qid, "SERVE", 2, timedelta(hours=1))
+
+    run_retention(app, now=NOW)
+
+    events = client.get(f"/queues/{qid}/events").get_json()
+    assert [e["action"] for e in events] == ["SERVE", "SERVE"]
+
+
+def test_scheduler_is_opt_in():
+    class SchedulerConfig(TestConfig):
+        EVENT_RETENTION_SCHEDULER = True
+
+    assert create_app(TestConfig).extensions["queuewise_retention"] is None
+    assert create_app(SchedulerConfig).extensions["queuewise_retention"] is not None
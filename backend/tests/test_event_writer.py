@@ -0,0 +1,142 @@
+"""Tests for the asynchronous buffered event writer.
+
+Covers:
+  1. Events are written by the background thread in batches.
+  2. The request thread never inserts event rows itself.
+  3. A full queue applies backpressure instead of dropping events.
+  4. shutdown() writes everything still queued.
+  5. A timeline read flushes the partial batch at once instead of
+     waiting out EVENT_FLUSH_INTERVAL.
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, metrics
+from app.config import TestConfig
+from app.database import db as _db
+from app.event_writer import AsyncEventWriter
+from app.models.queue_event import QueueEvent
+
+
+@pytest.fixture()
+def async_app(tmp_path):
+    """App with a file-backed database and the async writer enabled."""
+
+    class AsyncConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'events.db'}"
+        EVENT_WRITER_ASYNC = True
+        EVENT_BATCH_SIZE = 10
+        EVENT_FLUSH_INTERVAL = 0.05
+
+    application = create_app(AsyncConfig)
+    yield application
+    application.extensions["queuewise_events"].shutdown()
+    with application.app_context():
+        _db.engine.dispose()
+
+
+def _event_count(app):
+    with app.app_context():
+        return QueueEvent.query.count()
+
+
+def _row(qid, n):
+    return {"queue_id": qid, "action": "JOIN", "result": "SUCCESS", "detail": str(n)}
+
+
+def test_events_written_in_batches(async_app):
+    """Many events are persisted by far fewer bulk inserts."""
+    client = async_app.test_client()
+    qid = client.post("/queues", json={"name": "Async Q"}).get_json()["id"]
+    before = metrics.get("event_writer_batches_total")
+
+    for i in range(25):
+        client.post(f"/queues/{qid}/join", json={"user_name": f"User {'abcdefghijklmnopqrstuvwxyz'[i]}"})
+
+    writer = async_app.extensions["queuewise_events"]
+    writer.flush(timeout=5)
+    assert _event_count(async_app) == 25
+    assert metrics.get("event_writer_batches_total") - before < 25
+
+
+def test_request_thread_does_not_insert_events(async_app):
+    """Serve/skip requests only enqueue; the insert runs on the writer thread."""
+    client = async_app.test_client()
+    qid = client.post("/queues", json={"name": "Async Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+
+    inserting_threads = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO queue_events"):
+            inserting_threads.append(threading.get_ident())
+
+    with async_app.app_context():
+        engine = _db.engine
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        assert client.patch(f"/queues/{qid}/serve").status_code == 200
+        assert client.patch(f"/queues/{qid}/skip").status_code == 200
+        async_app.extensions["queuewise_events"].flush(timeout=5)
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+    assert inserting_threads
+    assert threading.get_ident() not in inserting_threads
+    events = client.get(f"/queues/{qid}/events").get_json()
+    assert {"SERVE", "SKIP"} <= {e["action"] for e in events}
+
+
+def test_full_queue_applies_backpressure(async_app):
+    """With the queue full, rows are written inline rather than dropped."""
+    async_app.config["EVENT_QUEUE_MAXSIZE"] = 2
+    async_app.config["EVENT_ENQUEUE_TIMEOUT"] = 0.01
+    writer = AsyncEventWriter(async_app, start=False)
+    qid = async_app.test_client().post("/queues", json={"name": "BP"}).get_json()["id"]
+    before = metrics.get("event_writer_backpressure_total")
+
+    for n in range(5):
+        writer.add(_row(qid, n))
+
+    assert metrics.get("event_writer_backpressure_total") - before == 3
+    assert _event_count(async_app) == 3
+
+    writer.shutdown()
+    assert _event_count(async_app) == 5
+
+
+def test_shutdown_flushes_queue(async_app):
+    """Rows still queued at shutdown are written before the thread stops."""
+    async_app.config["EVENT_FLUSH_INTERVAL"] = 60
+    async_app.config["EVENT_BATCH_SIZE"] = 1000
+    writer = AsyncEventWriter(async_app)
+    qid = async_app.test_client().post("/queues", json={"name": "Stop"}).get_json()["id"]
+
+    for n in range(7):
+        writer.add(_row(qid, n))
+    writer.shutdown()
+
+    assert _event_count(async_app) == 7
+    assert writer.stats()["event_writer_queue_depth"] == 0
+
+
+def test_read_does_not_wait_for_flush_interval(async_app):
+    """flush() makes the writer write its partial batch right away."""
+    async_app.config["EVENT_FLUSH_INTERVAL"] = 30
+    async_app.config["EVENT_BATCH_SIZE"] = 1000
+    async_app.extensions["queuewise_events"].shutdown()
+    async_app.extensions["queuewise_events"] = AsyncEventWriter(async_app)
+    client = async_app.test_client()
+    qid = client.post("/queues", json={"name": "Prompt"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    started = time.monotonic()
+    events = client.get(f"/queues/{qid}/events").get_json()
+
+    assert time.monotonic() - started < 1.0
+    assert [e["action"] for e in events] == ["JOIN"]
@@ -0,0 +1,83 @@
+"""Tests for composite indexes on the hot queue_entries/queue_events queries.
+
+Covers:
+  1. Entry and event hot-path queries use an index, not a table scan.
+  2. upgrade_schema() adds missing indexes to pre-existing tables and
+     rebuilds ones whose columns changed under the same name.
+"""
+
+from sqlalchemy import inspect, text
+
+from app.migrations import upgrade_schema
+from app.repositories import queue_repository as repo
+
+
+def _plan(db, statement, parameters):
+    """Return the EXPLAIN QUERY PLAN detail lines for a captured statement."""
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _assert_no_scan(db, counted, table):
+    plans = [
+        _plan(db, stmt, params)
+        for stmt, params in zip(counted.statements, counted.parameters)
+        if table in stmt
+    ]
+    assert plans, f"no statements touched {table}"
+    for plan in plans:
+        assert not any(line.startswith(f"SCAN {table}") for line in plan), plan
+
+
+def test_entry_queries_use_index(client, db, query_counter):
+    """get_entries and next_position search the composite index."""
+    qid = client.post("/queues", json={"name": "Idx Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    with query_counter() as counted:
+        repo.get_entries(qid)
+        repo.next_position(qid)
+
+    _assert_no_scan(db, counted, "queue_entries")
+
+
+def test_event_queries_use_index(client, db, query_counter):
+    """get_events searches by queue and reads created_at in index order."""
+    qid = client.post("/queues", json={"name": "Idx Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    with query_counter() as counted:
+        repo.get_events(qid)
+
+    _assert_no_scan(db, counted, "queue_events")
+
+
+def test_upgrade_schema_creates_missing_indexes(app, db):
+    """Tables created before the indexes existed are upgraded in place."""
+    db.session.execute(text("DROP INDEX ix_queue_entries_queue_status_position"))
+    db.session.execute(text("DROP INDEX ix_queue_events_queue_created"))
+    db.session.commit()
+
+    applied = upgrade_schema()
+
+    assert "create index ix_queue_entries_queue_status_position" in applied
+    assert "create index ix_queue_events_queue_created" in applied
+    names = {ix["name"] for ix in inspect(db.engine).get_indexes("queue_entries")}
+    assert "ix_queue_entries_queue_status_position" in names
+    assert upgrade_schema() == []
+
+
+def test_upgrade_schema_rebuilds_changed_index(app, db):
+    """The two-column timeline index of older databases gains `id`."""
+    db.session.execute(text("DROP INDEX ix_queue_events_queue_created"))
+    db.session.execute(text("CREATE INDEX ix_queue_events_queue_created ON queue_events (queue_id, created_at)"))
+    db.session.commit()
+
+    applied = upgrade_schema()
+
+    assert applied == ["rebuild index ix_queue_events_queue_created"]
+    columns = {ix["name"]: ix["column_names"] for ix in inspect(db.engine).get_indexes("queue_events")}
+    assert columns["ix_queue_events_queue_created"] == ["queue_id", "created_at", "id"]
+    assert upgrade_schema() == []
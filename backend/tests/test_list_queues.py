@@ -0,0 +1,61 @@
+"""Tests for GET /queues — aggregate counts without per-queue queries.
+
+Covers:
+  1. waiting_count / total_count reflect mixed entry statuses.
+  2. Queues with no entries report zero counts.
+  3. The number of SQL statements stays constant as queues grow.
+"""
+
+
+def _create_queue(client, name="Test Queue"):
+    resp = client.post("/queues", json={"name": name})
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def _join(client, qid, name):
+    return client.post(f"/queues/{qid}/join", json={"user_name": name})
+
+
+def test_list_counts_mixed_statuses(client, db):
+    """Served and skipped entries count toward total but not waiting."""
+    q = _create_queue(client)
+    for name in ("Alice", "Bob", "Charlie", "Dana"):
+        _join(client, q["id"], name)
+    client.patch(f"/queues/{q['id']}/serve")
+    client.patch(f"/queues/{q['id']}/skip")
+
+    data = client.get("/queues").get_json()
+    assert data[0]["waiting_count"] == 2
+    assert data[0]["total_count"] == 4
+
+
+def test_list_empty_queue_counts(client, db):
+    """A queue without entries reports zero counts."""
+    _create_queue(client, "Empty")
+
+    data = client.get("/queues").get_json()
+    assert data[0]["waiting_count"] == 0
+    assert data[0]["total_count"] == 0
+
+
+def test_list_query_count_is_constant(client, db, query_counter):
+    """Listing 2 queues or 20 queues issues the same number of statements."""
+    for i in range(2):
+        q = _create_queue(client, f"Queue {i}")
+        _join(client, q["id"], "Alice")
+
+    with query_counter() as small:
+        assert len(client.get("/queues").get_json()) == 2
+
+    for i in range(18):
+        q = _create_queue(client, f"More {i}")
+        _join(client, q["id"], "Alice")
+        _join(client, q["id"], "Bob")
+        client.patch(f"/queues/{q['id']}/serve")
+
+    with query_counter() as large:
+        assert len(client.get("/queues").get_json()) == 20
+
+    assert large.count == small.count
+    assert large.count <= 2
@@ -0,0 +1,137 @@
+"""Tests for app.metrics and GET /metrics.
+
+Covers:
+  1. Histogram buckets are cumulative with inclusive upper bounds, and
+     the text exposition has _bucket/_sum/_count, HELP/TYPE and
+     escaped label values.
+  2. Labelled counters and gauges through get() and snapshot().
+  3. Counts from many threads (including finished ones) all add up.
+  4. GET /metrics after real requests: latency per route template,
+     actions by result and rule_code, waiting-line length.
+  5. Multi-process mode: a forked worker's counters and histograms are
+     added to this process's; gauges follow their multiprocess_mode.
+"""
+
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from app import metrics
+
+
+def _lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+@pytest.fixture()
+def multiproc_dir(tmp_path):
+    """Enable multi-process mode on a fresh directory; switch it off afterwards."""
+    metrics.enable_multiprocess(str(tmp_path), interval=60)
+    yield tmp_path
+    metrics._multiprocess = None
+
+
+def test_histogram_exposition():
+    metrics.describe("test_latency_seconds", "Test latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        metrics.observe("test_latency_seconds", value, {"path": 'a"b\\c'})
+
+    text = metrics.exposition()
+
+    assert "# HELP test_latency_seconds Test latency." in text
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert _lines(text, "test_latency_seconds") == [
+        'test_latency_seconds_bucket{path="a\\"b\\\\c",le="0.1"} 2',
+        'test_latency_seconds_bucket{path="a\\"b\\\\c",le="1.0"} 3',
+        'test_latency_seconds_bucket{path="a\\"b\\\\c",le="+Inf"} 4',
+        'test_latency_seconds_sum{path="a\\"b\\\\c"} 3.65',
+        'test_latency_seconds_count{path="a\\"b\\\\c"} 4',
+    ]
+
+
+def test_labelled_counters_and_gauges():
+    before = metrics.get("test_labelled_total", labels={"kind": "a"})
+    metrics.incr("test_labelled_total", labels={"kind": "a"})
+    metrics.incr("test_labelled_total", 2, labels={"kind": "b"})
+    metrics.set_gauge("test_level", 7, {"queue_id": 3})
+
+    assert metrics.get("test_labelled_total", labels={"kind": "a"}) == before + 1
+    assert metrics.get("test_level", labels={"queue_id": "3"}) == 7
+    snapshot = metrics.snapshot()
+    assert snapshot['test_labelled_total{kind="b"}'] >= 2
+    assert snapshot['test_level{queue_id="3"}'] == 7
+    assert "# TYPE test_level gauge" in metrics.exposition()
+
+
+def test_threads_add_up():
+    before = metrics.get("test_threaded_total")
+
+    def work():
+        for _ in range(1000):
+            metrics.incr("test_threaded_total")
+            metrics.observe("test_threaded_seconds", 0.002)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert metrics.get("test_threaded_total") == before + 8000
+    assert "test_threaded_seconds_count 8000" in metrics.exposition()
+
+
+def test_metrics_endpoint(client, db):
+    qid = client.post("/queues", json={"name": "Scraped"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})  # DUPLICATE_JOIN
+    client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    client.patch(f"/queues/{qid}/serve")
+
+    resp = client.get("/metrics")
+    text = resp.get_data(as_text=True)
+
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    join = 'endpoint="/queues/<int:queue_id>/join",method="POST"'
+    assert any(line.startswith(f'http_request_duration_seconds_count{{{join},status="409"}}')
+               for line in text.splitlines())
+    assert f'http_request_db_seconds_count{{endpoint="/queues/<int:queue_id>/serve"}}' in text
+    assert 'queue_actions_total{action="JOIN_ATTEMPT",result="BLOCKED",rule_code="DUPLICATE_JOIN"}' in text
+    assert f'queue_waiting_length{{queue_id="{qid}"}} 1' in text
+    assert "# TYPE db_statements_total counter" in text
+
+
+def _worker():
+    metrics.ensure_multiprocess()
+    metrics.incr("test_mp_total", 5)
+    metrics.observe("test_mp_seconds", 0.002)
+    metrics.set_gauge("test_mp_depth", 10)
+    metrics.set_gauge("test_mp_latest", 2)
+    metrics._multiprocess.flush()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_multiprocess_aggregation(multiproc_dir):
+    metrics.describe("test_mp_latest", multiprocess_mode="latest")
+    metrics.set_gauge("test_mp_latest", 1)
+    metrics.incr("test_mp_total", 1)
+    metrics.observe("test_mp_seconds", 0.002)
+    metrics.set_gauge("test_mp_depth", 1)
+    local = metrics.get("test_mp_total")
+
+    child = multiprocessing.get_context("fork").Process(target=_worker)
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    text = metrics.exposition()
+
+    assert len(list(multiproc_dir.glob("metrics_*.db"))) == 2
+    # The child dropped what it inherited, so nothing is counted twice
+    assert f"test_mp_total {local + 5}" in text.splitlines()
+    assert "test_mp_seconds_count 2" in text
+    # The child has exited: its "sum" gauge no longer counts
+    assert "test_mp_depth 1" in text.splitlines()
+    assert "test_mp_latest 2" in text.splitlines()
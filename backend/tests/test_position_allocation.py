@@ -0,0 +1,127 @@
+"""Tests for race-free position allocation.
+
+Covers:
+  1. Positions come from the per-queue counter and are gap-free.
+  2. A failed join does not consume a position.
+  3. (queue_id, position) is unique at the database level.
+  4. Thousands of concurrent joins get unique, gap-free positions.
+  5. upgrade_schema() adds and backfills the counter on old databases.
+"""
+
+import itertools
+import string
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app import create_app
+from app.config import TestConfig
+from app.database import db as _db
+from app.migrations import upgrade_schema
+from app.models.queue_entry import QueueEntry
+from app.repositories import queue_repository as repo
+
+
+def _names(n):
+    """n distinct letters-only names that pass Rule 8."""
+    combos = itertools.product(string.ascii_lowercase, repeat=3)
+    return ["User " + "".join(c) for c in itertools.islice(combos, n)]
+
+
+def test_positions_are_sequential(client, db):
+    qid = client.post("/queues", json={"name": "Seq"}).get_json()["id"]
+    positions = [
+        client.post(f"/queues/{qid}/join", json={"user_name": name}).get_json()["position"]
+        for name in _names(5)
+    ]
+    assert positions == [1, 2, 3, 4, 5]
+
+
+def test_blocked_join_does_not_consume_position(client, db):
+    qid = client.post("/queues", json={"name": "Seq"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})  # duplicate
+    resp = client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    assert resp.get_json()["position"] == 2
+
+
+def test_duplicate_position_rejected_by_database(client, db):
+    qid = client.post("/queues", json={"name": "Seq"}).get_json()["id"]
+    repo.add_entry(qid, "Alice", 1)
+    with pytest.raises(IntegrityError):
+        repo.add_entry(qid, "Bob", 1)
+    db.session.rollback()
+
+
+def test_concurrent_joins_get_unique_positions(tmp_path):
+    """2,000 joins from 16 threads at one queue: unique and gap-free."""
+
+    class StressConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'stress.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {"connect_args": {"timeout": 60}}
+
+    app = create_app(StressConfig)
+    qid = app.test_client().post("/queues", json={"name": "Stress"}).get_json()["id"]
+    names = _names(2000)
+    threads_n = 16
+    failures = []
+
+    def worker(chunk):
+        client = app.test_client()
+        for name in chunk:
+            resp = client.post(f"/queues/{qid}/join", json={"user_name": name})
+            if resp.status_code != 201:
+                failures.append(resp.get_json())
+
+    threads = [
+        threading.Thread(target=worker, args=(names[i::threads_n],))
+        for i in range(threads_n)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert failures == []
+    with app.app_context():
+        positions = sorted(
+            p for (p,) in _db.session.query(QueueEntry.position).filter_by(queue_id=qid)
+        )
+        assert positions == list(range(1, len(names) + 1))
+        assert repo.next_position(qid) == len(names) + 1
+        _db.engine.dispose()
+
+
+def test_upgrade_adds_and_backfills_counter(app, db):
+    """Old databases get next_position = MAX(position) + 1 per queue."""
+    db.session.execute(text("DROP TABLE queue_events"))
+    db.session.execute(text("DROP TABLE queue_entries"))
+    db.session.execute(text("DROP TABLE queues"))
+    db.session.execute(text(
+        "CREATE TABLE queues (id INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, "
+        "status VARCHAR(6) NOT NULL, created_at DATETIME NOT NULL)"
+    ))
+    db.session.execute(text(
+        "CREATE TABLE queue_entries (id INTEGER PRIMARY KEY, queue_id INTEGER NOT NULL, "
+        "user_name VARCHAR(120) NOT NULL, position INTEGER NOT NULL, "
+        "status VARCHAR(7) NOT NULL, joined_at DATETIME NOT NULL)"
+    ))
+    db.session.execute(text(
+        "INSERT INTO queues VALUES (1, 'Old', 'ACTIVE', '2024-01-01'), "
+        "(2, 'Empty', 'ACTIVE', '2024-01-01')"
+    ))
+    db.session.execute(text(
+        "INSERT INTO queue_entries VALUES (1, 1, 'Alice', 1, 'SERVED', '2024-01-01'), "
+        "(2, 1, 'Bob', 7, 'WAITING', '2024-01-01')"
+    ))
+    db.session.commit()
+    db.create_all()
+
+    applied = upgrade_schema()
+
+    assert "add column queues.next_position" in applied
+    assert "create index uq_queue_entries_queue_position" in applied
+    assert repo.next_position(1) == 8
+    assert repo.next_position(2) == 1
@@ -0,0 +1,81 @@
+"""Tests for per-request SQL instrumentation.
+
+Covers:
+  1. X-DB-Queries matches the statements the request actually ran;
+     X-DB-Time-ms is present.
+  2. A cached read reports zero statements.
+  3. The request's JSON log record carries the same numbers.
+  4. Statements over SLOW_QUERY_MS are logged with the request_id;
+     SLOW_QUERY_MS = 0 turns that off.
+"""
+
+import json
+
+
+def _records(caplog, event):
+    found = []
+    for record in caplog.records:
+        try:
+            data = json.loads(record.getMessage())
+        except ValueError:
+            continue
+        if data.get("event") == event:
+            found.append(data)
+    return found
+
+
+def test_headers_match_statement_count(app, client, db, query_counter):
+    qid = client.post("/queues", json={"name": "Counted"}).get_json()["id"]
+    app.extensions["queuewise_cache"].clear()
+
+    with query_counter() as counted:
+        resp = client.get(f"/queues/{qid}/summary")
+
+    assert int(resp.headers["X-DB-Queries"]) == counted.count > 0
+    assert float(resp.headers["X-DB-Time-ms"]) >= 0
+
+
+def test_cached_read_reports_no_queries(client, db):
+    qid = client.post("/queues", json={"name": "Cached"}).get_json()["id"]
+    client.get(f"/queues/{qid}/summary")
+
+    resp = client.get(f"/queues/{qid}/summary")
+
+    assert resp.headers["X-DB-Queries"] == "0"
+    assert resp.headers["X-DB-Time-ms"] == "0.00"
+
+
+def test_request_log_record(client, db, caplog):
+    qid = client.post("/queues", json={"name": "Logged"}).get_json()["id"]
+    caplog.clear()
+
+    resp = client.post(f"/queues/{qid}/join", json={"user_name": "Alice"}, headers={"X-Request-ID": "req-42"})
+
+    (record,) = [r for r in _records(caplog, "request") if r["request_id"] == "req-42"]
+    assert record["method"] == "POST" and record["path"] == f"/queues/{qid}/join"
+    assert record["status"] == 201
+    assert record["db_queries"] == int(resp.headers["X-DB-Queries"]) > 0
+    assert record["db_time_ms"] == float(resp.headers["X-DB-Time-ms"])
+    assert record["duration_ms"] >= record["db_time_ms"]
+
+
+def test_slow_queries_are_logged_with_request_id(app, client, db, caplog):
+    qid = client.post("/queues", json={"name": "Slow"}).get_json()["id"]
+    app.config["SLOW_QUERY_MS"] = 1e-9
+    caplog.clear()
+
+    client.get(f"/queues/{qid}/events", headers={"X-Request-ID": "slow-1"})
+
+    slow = _records(caplog, "slow_query")
+    assert slow and all(r["request_id"] == "slow-1" for r in slow)
+    assert any("queue_events" in r["statement"] for r in slow)
+
+
+def test_slow_query_log_can_be_disabled(app, client, db, caplog):
+    qid = client.post("/queues", json={"name": "Quiet"}).get_json()["id"]
+    app.config["SLOW_QUERY_MS"] = 0
+    caplog.clear()
+
+    client.get(f"/queues/{qid}/events")
+
+    assert _records(caplog, "slow_query") == []
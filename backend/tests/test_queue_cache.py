@@ -0,0 +1,172 @@
+"""Tests for the per-queue read-through state cache (app/cache.py).
+
+Covers:
+  1. Repeated status/summary/preview reads of an unchanged queue run no SQL.
+  2. Every mutation invalidates the snapshot; dry runs and BLOCKED attempts do not.
+  3. Cached responses match freshly built ones.
+  4. LRU eviction by queue count and by estimated size; stale puts are rejected.
+  5. QUEUE_CACHE_ENABLED=False turns the cache off.
+"""
+
+import pytest
+
+from app import create_app, metrics
+from app.cache import QueueSnapshot, QueueStateCache
+from app.config import TestConfig
+
+
+def _create(client, name="Cache Q"):
+    return client.post("/queues", json={"name": name}).get_json()["id"]
+
+
+def _cache(app):
+    return app.extensions["queuewise_cache"]
+
+
+def _snapshot(queue_id):
+    return QueueSnapshot(
+        queue_id=queue_id, name=f"Q{queue_id}", status="ACTIVE", version=0,
+        counts={}, head=(), last_waiting=None, explanation="", estimated_wait="",
+    )
+
+
+@pytest.mark.parametrize("suffix", ["status", "summary", "preview"])
+def test_repeated_read_runs_no_sql(client, db, query_counter, suffix):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    first = client.get(f"/queues/{qid}/{suffix}")
+
+    with query_counter() as counted:
+        second = client.get(f"/queues/{qid}/{suffix}")
+
+    assert counted.count == 0
+    assert second.get_json() == first.get_json()
+
+
+def test_summary_after_status_is_served_from_the_same_snapshot(client, db, query_counter):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.get(f"/queues/{qid}/status")
+
+    with query_counter() as counted:
+        client.get(f"/queues/{qid}/summary")
+        client.get(f"/queues/{qid}/preview")
+
+    assert counted.count == 0
+
+
+@pytest.mark.parametrize("action", ["join", "serve", "skip", "skip_user", "pause"])
+def test_mutations_invalidate(client, db, action):
+    qid = _create(client)
+    alice = client.post(f"/queues/{qid}/join", json={"user_name": "Alice"}).get_json()
+    client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    before = client.get(f"/queues/{qid}/status").get_json()
+
+    if action == "join":
+        client.post(f"/queues/{qid}/join", json={"user_name": "Carol"})
+    elif action == "serve":
+        client.patch(f"/queues/{qid}/serve")
+    elif action == "skip":
+        client.patch(f"/queues/{qid}/skip")
+    elif action == "skip_user":
+        client.patch(f"/queues/{qid}/skip/{alice['entry_id']}")
+    else:
+        client.patch(f"/queues/{qid}/pause")
+
+    after = client.get(f"/queues/{qid}/status").get_json()
+    assert after != before
+
+
+def test_resume_invalidates(client, db):
+    qid = _create(client)
+    client.patch(f"/queues/{qid}/pause")
+    assert client.get(f"/queues/{qid}/status").get_json()["queue_status"] == "PAUSED"
+
+    client.patch(f"/queues/{qid}/resume")
+
+    assert client.get(f"/queues/{qid}/status").get_json()["queue_status"] == "ACTIVE"
+
+
+def test_dry_runs_and_blocked_attempts_keep_the_snapshot(app, client, db):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.get(f"/queues/{qid}/summary")
+
+    client.post(f"/queues/{qid}/join?dry_run=true", json={"user_name": "Bob"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})  # duplicate → BLOCKED
+
+    assert _cache(app).get(qid) is not None
+
+
+def test_cached_summary_reflects_serve(client, db):
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 2
+
+    client.patch(f"/queues/{qid}/serve")
+
+    summary = client.get(f"/queues/{qid}/summary").get_json()
+    assert summary["waiting_count"] == 1
+    assert summary["served_count"] == 1
+
+
+def test_hit_and_miss_counters(client, db):
+    qid = _create(client)
+    hits, misses = metrics.get("queue_cache_hits_total"), metrics.get("queue_cache_misses_total")
+
+    client.get(f"/queues/{qid}/summary")
+    client.get(f"/queues/{qid}/summary")
+
+    # One miss then one hit: the ETag check peeks without counting
+    assert metrics.get("queue_cache_misses_total") - misses == 1
+    assert metrics.get("queue_cache_hits_total") - hits == 1
+
+
+def test_lru_evicts_by_queue_count():
+    cache = QueueStateCache(max_queues=2)
+    for qid in (1, 2):
+        cache.put(_snapshot(qid), cache.generation(qid))
+    cache.get(1)  # 2 is now least recently used
+
+    cache.put(_snapshot(3), cache.generation(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_lru_evicts_by_size():
+    size = _snapshot(1).estimate_size()
+    cache = QueueStateCache(max_queues=100, max_bytes=size * 2)
+    for qid in (1, 2, 3):
+        cache.put(_snapshot(qid), cache.generation(qid))
+
+    assert cache.get(1) is None
+    assert cache.stats()["bytes"] <= size * 2
+
+
+def test_put_after_invalidation_is_rejected():
+    cache = QueueStateCache()
+    generation = cache.generation(1)
+    cache.invalidate(1)  # a write committed while the snapshot was being built
+
+    assert cache.put(_snapshot(1), generation) is False
+    assert cache.get(1) is None
+
+
+class NoCacheConfig(TestConfig):
+    QUEUE_CACHE_ENABLED = False
+
+
+def test_cache_can_be_disabled():
+    application = create_app(NoCacheConfig)
+    assert application.extensions["queuewise_cache"] is None
+
+    client = application.test_client()
+    qid = _create(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    client.get(f"/queues/{qid}/summary")
+    client.patch(f"/queues/{qid}/serve")
+
+    assert client.get(f"/queues/{qid}/summary").get_json()["served_count"] == 1
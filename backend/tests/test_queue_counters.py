@@ -0,0 +1,150 @@
+"""Tests for the maintained per-queue counters (waiting/served/skipped).
+
+Covers:
+  1. Join, batch join, serve, skip (single, bulk, by id) keep the
+     counters equal to a recount of the entries.
+  2. Blocked and dry-run actions leave them untouched.
+  3. /summary and /queues read the queue row only — no entry scans.
+  4. check_counters finds drift and repair fixes it in place; next_position
+     is checked against the higher of the live and archived positions.
+  5. upgrade_schema backfills the counters on old databases.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text, update
+
+from app.migrations import upgrade_schema
+from app.models.queue import Queue
+from app.services import queue_service as service
+
+
+def _queue(client, names=()):
+    qid = client.post("/queues", json={"name": "Counted"}).get_json()["id"]
+    if names:
+        client.post(f"/queues/{qid}/join:batch", json={"user_names": list(names)})
+    return qid
+
+
+def _counters(db, qid):
+    db.session.expire_all()
+    q = db.session.get(Queue, qid)
+    return q.waiting_count, q.served_count, q.skipped_count
+
+
+def test_every_action_keeps_counters_exact(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"])
+    client.post(f"/queues/{qid}/join", json={"user_name": "Grace"})
+    client.patch(f"/queues/{qid}/serve")
+    client.patch(f"/queues/{qid}/serve?count=2")
+    client.patch(f"/queues/{qid}/skip")
+    entry_id = client.get(f"/queues/{qid}/status?status=WAITING").get_json()["entries"][-1]["id"]
+    client.patch(f"/queues/{qid}/skip/{entry_id}")
+
+    assert _counters(db, qid) == (2, 3, 2)
+    assert service.check_counters() == []
+
+
+def test_blocked_and_dry_run_actions_do_not_count(client, db):
+    qid = _queue(client, ["Alice"])
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})  # duplicate
+    client.post(f"/queues/{qid}/join", json={"user_name": "X"})  # invalid name
+    client.patch(f"/queues/{qid}/serve?dry_run=true")
+    client.post(f"/queues/{qid}/join:batch?dry_run=true", json={"user_names": ["Bob"]})
+    client.patch(f"/queues/{qid}/serve")
+    client.patch(f"/queues/{qid}/serve")  # empty queue
+
+    assert _counters(db, qid) == (0, 1, 0)
+
+
+def test_summary_and_list_do_not_read_entries(app, client, db, query_counter):
+    qid = _queue(client, ["Alice", "Bob", "Carol"])
+    client.patch(f"/queues/{qid}/serve")
+    app.extensions["queuewise_cache"].clear()
+
+    with query_counter() as counted:
+        summary = client.get(f"/queues/{qid}/summary").get_json()
+        listed = client.get("/queues").get_json()
+
+    assert (summary["waiting_count"], summary["served_count"]) == (2, 1)
+    assert listed[0]["total_count"] == 3
+    entry_scans = [s for s in counted.statements if "queue_entries" in s and "count(" in s.lower()]
+    assert entry_scans == []
+    assert not any("GROUP BY" in s for s in counted.statements)
+
+
+def test_check_finds_and_repairs_drift(client, db):
+    qid = _queue(client, ["Alice", "Bob"])
+    client.patch(f"/queues/{qid}/serve")
+    db.session.execute(
+        update(Queue).where(Queue.id == qid).values(waiting_count=7, skipped_count=3, next_position=1)
+    )
+    db.session.commit()
+
+    drift = service.check_counters()
+
+    assert {(d["column"], d["stored"], d["expected"]) for d in drift} == {
+        ("waiting_count", 7, 1), ("skipped_count", 3, 0), ("next_position", 1, 3),
+    }
+    assert _counters(db, qid) == (7, 1, 3)  # checking alone changes nothing
+
+    service.check_counters(repair=True)
+
+    assert service.check_counters() == []
+    assert client.get(f"/queues/{qid}/summary").get_json()["waiting_count"] == 1
+    assert client.post(f"/queues/{qid}/join", json={"user_name": "Carol"}).get_json()["position"] == 3
+
+
+def test_next_position_ahead_of_data_is_not_drift(client, db):
+    qid = _queue(client, ["Alice"])
+    db.session.execute(update(Queue).where(Queue.id == qid).values(next_position=50))
+    db.session.commit()
+
+    assert service.check_counters() == []
+
+
+def test_next_position_counts_archive_above_live_entries(app, client, db):
+    """An archived position above every live one still sets the floor."""
+    from app.models.queue_entry import QueueEntry
+    from app.retention import run_entry_archival
+
+    qid = _queue(client, ["Alice", "Bob"])
+    bob = db.session.query(QueueEntry).filter_by(queue_id=qid, user_name="Bob").one()
+    assert client.patch(f"/queues/{qid}/skip/{bob.id}").status_code == 200
+    app.config.update(EVENT_RETENTION_BATCH_PAUSE=0)
+    run_entry_archival(app, now=datetime.now(timezone.utc) + timedelta(days=30))
+    db.session.execute(update(Queue).where(Queue.id == qid).values(next_position=2))
+    db.session.commit()
+
+    drift = service.check_counters()
+
+    assert [(d["column"], d["stored"], d["expected"]) for d in drift] == [("next_position", 2, 3)]
+
+
+def test_upgrade_backfills_counters(app, db):
+    """Old databases get counters recounted from their entries."""
+    for table in ("queue_events", "queue_entries_archive", "queue_event_rollups", "queue_entries", "queues"):
+        db.session.execute(text(f"DROP TABLE {table}"))
+    db.session.execute(text(
+        "CREATE TABLE queues (id INTEGER PRIMARY KEY, name VARCHAR(120) NOT NULL, "
+        "status VARCHAR(6) NOT NULL, created_at DATETIME NOT NULL)"
+    ))
+    db.session.execute(text(
+        "CREATE TABLE queue_entries (id INTEGER PRIMARY KEY, queue_id INTEGER NOT NULL, "
+        "user_name VARCHAR(120) NOT NULL, position INTEGER NOT NULL, "
+        "status VARCHAR(7) NOT NULL, joined_at DATETIME NOT NULL)"
+    ))
+    db.session.execute(text("INSERT INTO queues VALUES (1, 'Old', 'ACTIVE', '2024-01-01')"))
+    db.session.execute(text(
+        "INSERT INTO queue_entries VALUES (1, 1, 'Alice', 1, 'SERVED', '2024-01-01'), "
+        "(2, 1, 'Bob', 2, 'SKIPPED', '2024-01-01'), (3, 1, 'Carol', 3, 'WAITING', '2024-01-01'), "
+        "(4, 1, 'Dave', 4, 'WAITING', '2024-01-01')"
+    ))
+    db.session.commit()
+    db.create_all()
+
+    applied = upgrade_schema()
+
+    assert "add column queues.waiting_count" in applied
+    assert _counters(db, 1) == (2, 1, 1)
+    assert service.check_counters() == []
@@ -0,0 +1,166 @@
+"""Tests for keyset pagination on GET /queues/<id>/status.
+
+Covers:
+  1. Pages are capped by ?limit= and STATUS_PAGE_DEFAULT; next_cursor walks every entry once.
+  2. ?status= filters entries; invalid params return 400.
+  3. Wait explanations cover the page only, ranked across the whole line.
+  4. The first page of a long queue costs the same statements as an empty one.
+  5. Repeated pages come from the state cache; writes invalidate them.
+  6. With more served entries than one page, ?status=WAITING and the
+     SSE snapshot still list everyone waiting.
+"""
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.services import queue_service
+
+
+def _names(n):
+    return [f"User {chr(97 + i // 26 // 26 % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i % 26)}" for i in range(n)]
+
+
+def _queue_with(client, n):
+    qid = client.post("/queues", json={"name": "Paged"}).get_json()["id"]
+    names = _names(n)
+    for i in range(0, n, 500):
+        client.post(f"/queues/{qid}/join:batch", json={"user_names": names[i:i + 500]})
+    return qid
+
+
+def _page(client, qid, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    resp = client.get(f"/queues/{qid}/status?{query}")
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def test_limit_and_cursor_walk_every_entry(client, db):
+    qid = _queue_with(client, 7)
+
+    seen, cursor = [], 0
+    while cursor is not None:
+        body = _page(client, qid, limit=3, after_position=cursor)
+        assert len(body["entries"]) <= 3
+        seen += [e["position"] for e in body["entries"]]
+        cursor = body["next_cursor"]
+
+    assert seen == list(range(1, 8))
+
+
+def test_default_page_size(app, client, db):
+    app.config["STATUS_PAGE_DEFAULT"] = 5
+    qid = _queue_with(client, 6)
+
+    body = _page(client, qid)
+
+    assert len(body["entries"]) == 5
+    assert body["next_cursor"] == 5
+
+
+def test_last_page_has_no_cursor(client, db):
+    qid = _queue_with(client, 3)
+    assert _page(client, qid, limit=3)["next_cursor"] is None
+
+
+def test_status_filter(client, db):
+    qid = _queue_with(client, 5)
+    client.patch(f"/queues/{qid}/serve?count=2")
+
+    served = _page(client, qid, status="SERVED")
+    waiting = _page(client, qid, status="WAITING", limit=2)
+
+    assert [e["position"] for e in served["entries"]] == [1, 2]
+    assert [e["position"] for e in waiting["entries"]] == [3, 4]
+    assert waiting["next_cursor"] == 4
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=x", "after_position=-1", "status=GONE"])
+def test_invalid_params(client, db, query):
+    qid = _queue_with(client, 1)
+    assert client.get(f"/queues/{qid}/status?{query}").status_code == 400
+
+
+def test_wait_explanations_cover_page_with_global_rank(client, db):
+    qid = _queue_with(client, 6)
+    client.patch(f"/queues/{qid}/serve")  # position 1 served; 5 waiting
+
+    first = _page(client, qid, limit=3)
+    second = _page(client, qid, limit=3, after_position=first["next_cursor"])
+
+    names = _names(6)
+    assert set(first["wait_explanations"]) == {names[1], names[2]}
+    assert set(second["wait_explanations"]) == {names[3], names[4], names[5]}
+    assert "2 people ahead" in second["wait_explanations"][names[3]]
+    assert "4 people ahead" in second["wait_explanations"][names[5]]
+
+
+def test_oversized_limit_is_capped(app, client, db):
+    app.config["STATUS_PAGE_MAX"] = 4
+    qid = _queue_with(client, 6)
+
+    assert len(_page(client, qid, limit=1000)["entries"]) == 4
+
+
+def test_first_page_of_long_queue_costs_like_empty_queue(app, client, db, query_counter):
+    empty = client.post("/queues", json={"name": "Empty"}).get_json()["id"]
+    big = client.post("/queues", json={"name": "Big"}).get_json()["id"]
+    db.session.execute(insert(QueueEntry), [
+        {"queue_id": big, "user_name": f"User {i}", "position": i + 1}
+        for i in range(20000)
+    ])
+    db.session.commit()
+    queue_service.check_counters(repair=True)  # rows were inserted behind the counters
+    app.extensions["queuewise_cache"].clear()
+
+    with query_counter() as for_empty:
+        _page(client, empty)
+    with query_counter() as for_big:
+        body = _page(client, big)
+
+    assert for_big.count == for_empty.count
+    assert len(body["entries"]) == app.config["STATUS_PAGE_DEFAULT"]
+    assert len(body["wait_explanations"]) == app.config["STATUS_PAGE_DEFAULT"]
+    assert body["explanation"].startswith("20000 people waiting")
+
+
+def test_repeated_page_is_cached_and_invalidated(client, db, query_counter):
+    qid = _queue_with(client, 5)
+    _page(client, qid, limit=2, after_position=2)
+
+    with query_counter() as counted:
+        cached = _page(client, qid, limit=2, after_position=2)
+    assert counted.count == 0
+
+    client.patch(f"/queues/{qid}/skip")
+    fresh = _page(client, qid, limit=2, after_position=2)
+    assert fresh != cached
+    assert "1 person ahead" in fresh["wait_explanations"][_names(5)[2]]
+
+
+def test_served_entries_keep_status(client, db):
+    qid = _queue_with(client, 2)
+    client.patch(f"/queues/{qid}/serve")
+
+    entries = _page(client, qid)["entries"]
+
+    assert [e["status"] for e in entries] == [EntryStatus.SERVED.value, EntryStatus.WAITING.value]
+
+
+def test_waiting_pages_after_more_serves_than_a_page(app, client, db):
+    app.config["STATUS_PAGE_DEFAULT"] = 10
+    qid = _queue_with(client, 13)
+    client.patch(f"/queues/{qid}/serve?count=10")
+
+    unfiltered = _page(client, qid)
+    assert [e["status"] for e in unfiltered["entries"]] == ["SERVED"] * 10
+
+    waiting = _page(client, qid, status="WAITING")
+    assert [e["position"] for e in waiting["entries"]] == [11, 12, 13]
+    assert waiting["next_cursor"] is None and len(waiting["wait_explanations"]) == 3
+
+    with app.test_request_context():
+        snapshot = queue_service.stream_snapshot(qid)
+    assert [e.position for e in snapshot["status"]["entries"]] == [11, 12, 13]
+    assert len(snapshot["status"]["wait_explanations"]) == 3
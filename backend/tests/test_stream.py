@@ -0,0 +1,159 @@
+"""Tests for GET /queues/<id>/stream — Server-Sent Events.
+
+Covers:
+  1. Connecting yields a retry hint and a full snapshot.
+  2. A successful action pushes an update with only the changed fields.
+  3. Blocked actions and dry runs push nothing (heartbeat instead).
+  4. Reconnecting with a current Last-Event-ID skips the snapshot.
+  5. Event ids are the persisted queue version: a client reconnecting to
+     another worker after that worker changed the queue gets a snapshot.
+  6. Unknown queues return 404; subscribers are released on close.
+"""
+
+import json
+
+import pytest
+
+from app import create_app
+from app.config import TestConfig
+from app.database import db as _db
+
+
+class StreamConfig(TestConfig):
+    SSE_HEARTBEAT_SECONDS = 0.05
+
+
+@pytest.fixture()
+def app():
+    """Override the shared app fixture with a short heartbeat."""
+    yield create_app(StreamConfig)
+
+
+def _parse(chunk):
+    """Parse one SSE message into a dict of its fields."""
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = {}
+    for line in text.strip().splitlines():
+        key, _, value = line.partition(": ")
+        fields[key] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def _open(client, qid, headers=None):
+    resp = client.get(f"/queues/{qid}/stream", headers=headers or {}, buffered=False)
+    return resp, iter(resp.response)
+
+
+def test_stream_starts_with_snapshot(client, db):
+    qid = client.post("/queues", json={"name": "Stream Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    resp, chunks = _open(client, qid)
+    assert resp.mimetype == "text/event-stream"
+    assert next(chunks).startswith(b"retry:")
+    snapshot = _parse(next(chunks))
+    resp.close()
+
+    assert snapshot["event"] == "snapshot"
+    assert snapshot["data"]["summary"]["waiting_count"] == 1
+    assert snapshot["data"]["status"]["entries"][0]["user_name"] == "Alice"
+
+
+def test_successful_action_pushes_delta(client, db):
+    qid = client.post("/queues", json={"name": "Stream Q"}).get_json()["id"]
+    resp, chunks = _open(client, qid)
+    next(chunks), next(chunks)
+
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+    update = _parse(next(chunks))
+    resp.close()
+
+    assert update["event"] == "update"
+    assert update["id"] == "1"
+    assert update["data"]["summary"]["waiting_count"] == 1
+    assert "queue_name" not in update["data"]["summary"]
+
+
+def test_blocked_and_dry_run_push_nothing(client, db):
+    qid = client.post("/queues", json={"name": "Stream Q"}).get_json()["id"]
+    resp, chunks = _open(client, qid)
+    next(chunks), next(chunks)
+
+    client.patch(f"/queues/{qid}/serve")  # EMPTY_QUEUE
+    client.post(f"/queues/{qid}/join?dry_run=true", json={"user_name": "Alice"})
+    heartbeat = next(chunks)
+    resp.close()
+
+    assert heartbeat == b": heartbeat\n\n"
+
+
+def test_reconnect_with_current_id_skips_snapshot(client, db):
+    qid = client.post("/queues", json={"name": "Stream Q"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    resp, chunks = _open(client, qid)
+    next(chunks)
+    event_id = _parse(next(chunks))["id"]
+    resp.close()
+
+    resp, chunks = _open(client, qid, headers={"Last-Event-ID": event_id})
+    next(chunks)
+    assert next(chunks) == b": heartbeat\n\n"
+    resp.close()
+
+    resp, chunks = _open(client, qid, headers={"Last-Event-ID": str(int(event_id) - 1)})
+    next(chunks)
+    assert _parse(next(chunks))["event"] == "snapshot"
+    resp.close()
+
+
+def test_event_ids_agree_across_workers(tmp_path):
+    """Two app instances on one database stand in for two workers."""
+
+    class SharedConfig(StreamConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'shared.db'}"
+
+    first, second = create_app(SharedConfig), create_app(SharedConfig)
+    a, b = first.test_client(), second.test_client()
+    qid = a.post("/queues", json={"name": "Shared"}).get_json()["id"]
+    a.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    resp, chunks = _open(a, qid)
+    next(chunks)
+    event_id = _parse(next(chunks))["id"]
+    resp.close()
+
+    # Up to date: the other worker agrees and skips the snapshot
+    resp, chunks = _open(b, qid, headers={"Last-Event-ID": event_id})
+    next(chunks)
+    assert next(chunks) == b": heartbeat\n\n"
+    resp.close()
+
+    # The other worker changes the queue; reconnecting there must resend
+    b.post(f"/queues/{qid}/join", json={"user_name": "Bob"})
+    resp, chunks = _open(b, qid, headers={"Last-Event-ID": event_id})
+    next(chunks)
+    snapshot = _parse(next(chunks))
+    resp.close()
+
+    assert snapshot["event"] == "snapshot"
+    assert int(snapshot["id"]) > int(event_id)
+    assert snapshot["data"]["summary"]["waiting_count"] == 2
+    for instance in (first, second):
+        instance.extensions["queuewise_events"].flush()
+        with instance.app_context():
+            _db.engine.dispose()
+
+
+def test_stream_unknown_queue_and_cleanup(app, client, db):
+    assert client.get("/queues/999/stream").status_code == 404
+
+    qid = client.post("/queues", json={"name": "Stream Q"}).get_json()["id"]
+    broker = app.extensions["queuewise_broker"]
+    resp, chunks = _open(client, qid)
+    next(chunks)
+    assert broker.subscriber_count(qid) == 1
+    resp.close()
+    assert broker.subscriber_count(qid) == 0
@@ -0,0 +1,136 @@
+"""Tests for single-transaction actions and batched BLOCKED events.
+
+Covers:
+  1. A join, serve or skip commits exactly once (state + event together).
+  2. BLOCKED attempts are buffered instead of committed one by one.
+  3. Buffered events appear in the timeline and ride along with the next commit.
+  4. unit_of_work() rolls back every write on error.
+  5. Buffered rows that rode along are put back if that transaction
+     rolls back, and a failing event insert does not fail the action.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import logging_utils, metrics
+from app.logging_utils import log_event
+from app.models.queue_entry import QueueEntry
+from app.repositories import queue_repository as repo
+
+
+@contextmanager
+def _count_commits(db):
+    counted = {"n": 0}
+
+    def _on_commit(conn):
+        counted["n"] += 1
+
+    event.listen(db.engine, "commit", _on_commit)
+    try:
+        yield counted
+    finally:
+        event.remove(db.engine, "commit", _on_commit)
+
+
+def _create_queue(client):
+    return client.post("/queues", json={"name": "UoW Q"}).get_json()["id"]
+
+
+@pytest.mark.parametrize("method,path,body", [
+    ("post", "/queues/{qid}/join", {"user_name": "Bob"}),
+    ("patch", "/queues/{qid}/serve", None),
+    ("patch", "/queues/{qid}/skip", None),
+    ("patch", "/queues/{qid}/pause", None),
+])
+def test_action_commits_once(client, db, method, path, body):
+    """The state change and its SUCCESS event share one commit."""
+    qid = _create_queue(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    with _count_commits(db) as commits:
+        resp = getattr(client, method)(path.format(qid=qid), json=body)
+
+    assert resp.status_code in (200, 201)
+    assert commits["n"] == 1
+
+
+def test_blocked_attempts_are_batched(client, db):
+    """Rejected joins do not commit individually but still reach the timeline."""
+    qid = _create_queue(client)
+    client.patch(f"/queues/{qid}/pause")
+
+    with _count_commits(db) as commits:
+        for _ in range(3):
+            assert client.post(f"/queues/{qid}/join", json={"user_name": "Alice"}).status_code == 409
+
+    assert commits["n"] == 0
+    events = client.get(f"/queues/{qid}/events").get_json()
+    assert [e["result"] for e in events].count("BLOCKED") == 3
+
+
+def test_blocked_events_ride_with_next_commit(app, client, db):
+    """Pending BLOCKED rows are written in the next action's transaction."""
+    qid = _create_queue(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "1nvalid"})
+
+    with _count_commits(db) as commits:
+        client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    assert commits["n"] == 1
+    assert app.extensions["queuewise_events"].drain() == []
+    actions = {(e.action, e.result) for e in repo.get_events(qid)}
+    assert ("JOIN_ATTEMPT", "BLOCKED") in actions
+    assert ("JOIN", "SUCCESS") in actions
+
+
+def test_unit_of_work_rolls_back_on_error(client, db):
+    """Nothing inside a failed unit of work is persisted."""
+    qid = _create_queue(client)
+
+    with pytest.raises(RuntimeError):
+        with repo.unit_of_work():
+            repo.add_entry(qid, "Alice", 1)
+            repo.add_events([{"queue_id": qid, "action": "JOIN", "result": "SUCCESS"}])
+            raise RuntimeError("boom")
+
+    assert QueueEntry.query.filter_by(queue_id=qid).count() == 0
+    assert repo.get_events(qid) == []
+
+
+def test_rollback_requeues_buffered_events(app, client, db):
+    """BLOCKED rows drained into a rolled-back transaction are not lost."""
+    qid = _create_queue(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "1nvalid"})
+    sink = app.extensions["queuewise_events"]
+
+    with pytest.raises(RuntimeError):
+        with repo.unit_of_work():
+            repo.add_entry(qid, "Alice", 1)
+            log_event(qid, "JOIN", "SUCCESS")
+            assert sink.drain() == []
+            raise RuntimeError("boom")
+
+    assert [row["result"] for row in sink.drain()] == ["BLOCKED"]
+
+
+def test_failed_event_insert_does_not_fail_action(app, client, db, monkeypatch):
+    """The insert runs in a savepoint: the join commits, buffered rows stay queued."""
+    qid = _create_queue(client)
+    client.post(f"/queues/{qid}/join", json={"user_name": "1nvalid"})
+    errors = metrics.get("event_persist_errors_total")
+    event_row = logging_utils._event_row
+    # action is NOT NULL: the insert fails with an IntegrityError
+    monkeypatch.setattr(logging_utils, "_event_row",
+                        lambda *args: {**event_row(*args), "action": None})
+
+    resp = client.post(f"/queues/{qid}/join", json={"user_name": "Alice"})
+
+    assert resp.status_code == 201
+    assert QueueEntry.query.filter_by(queue_id=qid, user_name="Alice").count() == 1
+    assert metrics.get("event_persist_errors_total") == errors + 1
+    monkeypatch.undo()
+    client.get(f"/queues/{qid}/events")  # flushes the buffer
+    actions = {(e.action, e.result) for e in repo.get_events(qid)}
+    assert actions == {("JOIN_ATTEMPT", "BLOCKED")}
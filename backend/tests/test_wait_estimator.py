@@ -0,0 +1,242 @@
+"""Tests for service-time tracking and the EWMA wait estimator.
+
+Covers:
+  1. The EWMA step and the n-sample weight match a reference loop; the
+     sample is measured in the UPDATE from the clock as committed.
+  2. Serve and skip stamp served_at / skipped_at on the entry.
+  3. The first serve seeds the mean; later serves blend into it; a
+     skip only restarts the clock; a bulk serve weighs as n samples.
+  4. Status, summary and preview messages use the measured rate
+     (3 minutes per person until the first serve).
+  5. Reading an estimate costs no query over served history.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.estimator import ServiceRate, ewma_update, sample_weight, serve_update
+from app.models.queue import Queue
+from app.models.queue_entry import EntryStatus, QueueEntry
+from app.repositories import queue_repository as repo
+
+
+def _queue(client, names):
+    qid = client.post("/queues", json={"name": "Timed"}).get_json()["id"]
+    client.post(f"/queues/{qid}/join:batch", json={"user_names": names})
+    return qid
+
+
+def _started(db, qid, seconds_ago, joined=True):
+    """Pretend the service clock started `seconds_ago` (and everyone joined before)."""
+    start = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    if joined:
+        db.session.execute(
+            update(QueueEntry).where(QueueEntry.queue_id == qid)
+            .values(joined_at=start - timedelta(hours=1))
+        )
+    db.session.execute(update(Queue).where(Queue.id == qid).values(last_completed_at=start))
+    db.session.commit()
+
+
+def _estimator(db, qid):
+    db.session.expire_all()
+    q = db.session.get(Queue, qid)
+    return q.service_time_mean, q.service_time_var, q.service_samples
+
+
+def test_ewma_step_matches_reference():
+    mean, var = 100.0, 0.0
+    for x in (120.0, 80.0, 200.0):
+        mean, var = ewma_update(mean, var, x, 0.2)
+
+    ref_mean, ref_var = 100.0, 0.0
+    for x in (120.0, 80.0, 200.0):
+        diff = x - ref_mean
+        incr = 0.2 * diff
+        ref_mean += incr
+        ref_var = 0.8 * (ref_var + diff * incr)
+    assert (mean, var) == pytest.approx((ref_mean, ref_var))
+
+    single = 100.0
+    for _ in range(3):
+        single, _ = ewma_update(single, 0.0, 40.0, 0.2)
+    bulk, _ = ewma_update(100.0, 0.0, 40.0, sample_weight(0.2, 3))
+    assert bulk == pytest.approx(single)
+
+
+def _sample(db, qid, now, served, joined_at, last_completed_at, cap=3600):
+    """The sample bump_version folds in, read back as the mean of a fresh queue."""
+    db.session.execute(update(Queue).where(Queue.id == qid).values(
+        last_completed_at=last_completed_at, service_time_mean=None, service_time_var=0.0))
+    repo.bump_version(qid, estimate=serve_update(now, joined_at, served, 1.0, cap))
+    db.session.commit()
+    return _estimator(db, qid)[0]
+
+
+def test_sample_starts_at_later_of_join_and_last_serve_and_is_capped(client, db):
+    qid = _queue(client, ["Alice"])
+    now = datetime(2025, 1, 1, 12, 0)
+    assert _sample(db, qid, now, 1, now - timedelta(minutes=5), now - timedelta(minutes=2)) == pytest.approx(120)
+    assert _sample(db, qid, now, 1, now - timedelta(minutes=5), None) == pytest.approx(300)
+    assert _sample(db, qid, now, 2, now - timedelta(minutes=5), now - timedelta(hours=1)) == pytest.approx(150)
+    assert _sample(db, qid, now, 1, now - timedelta(hours=5), None) == pytest.approx(3600)
+    assert _sample(db, qid, now.replace(tzinfo=timezone.utc), 1,
+                   now - timedelta(minutes=1), None) == pytest.approx(60)
+    # A completion already committed later than `now` yields 0, not a negative sample
+    assert _sample(db, qid, now, 1, now - timedelta(minutes=5), now + timedelta(minutes=1)) == 0
+
+
+def test_concurrent_serves_do_not_count_an_interval_twice(client, db):
+    """Two workers that read the queue row before either serve committed."""
+    qid = _queue(client, ["Alice", "Bob"])
+    start = datetime(2025, 1, 1, 12, 0)
+    joined = start - timedelta(hours=1)
+    db.session.execute(update(Queue).where(Queue.id == qid).values(last_completed_at=start))
+
+    repo.bump_version(qid, estimate=serve_update(start + timedelta(seconds=600), joined, 1, 0.5, 3600))
+    repo.bump_version(qid, estimate=serve_update(start + timedelta(seconds=610), joined, 1, 0.5, 3600))
+    db.session.commit()
+
+    # Samples 600 then 10 (not 610): mean 600 -> 305
+    assert _estimator(db, qid)[0] == pytest.approx(305)
+    assert db.session.get(Queue, qid).last_completed_at == start + timedelta(seconds=610)
+
+
+def test_serve_and_skip_stamp_the_entry(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol"])
+    client.patch(f"/queues/{qid}/serve")
+    client.patch(f"/queues/{qid}/skip")
+
+    by_name = {e.user_name: e for e in db.session.query(QueueEntry)}
+    assert by_name["Alice"].served_at is not None and by_name["Alice"].skipped_at is None
+    assert by_name["Bob"].skipped_at is not None and by_name["Bob"].served_at is None
+    assert by_name["Carol"].served_at is None and by_name["Carol"].skipped_at is None
+
+    served = client.get(f"/queues/{qid}/status?status=SERVED").get_json()["entries"]
+    assert served[0]["served_at"] is not None
+
+
+def test_serves_update_the_estimate(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol"])
+    assert _estimator(db, qid) == (None, 0.0, 0)
+
+    _started(db, qid, 600)
+    client.patch(f"/queues/{qid}/serve")
+    mean, var, samples = _estimator(db, qid)
+    assert mean == pytest.approx(600, abs=2) and var == pytest.approx(0) and samples == 1
+
+    _started(db, qid, 100, joined=False)
+    client.patch(f"/queues/{qid}/serve")
+    mean, var, samples = _estimator(db, qid)
+    assert mean == pytest.approx(600 + 0.2 * (100 - 600), abs=2)
+    assert var == pytest.approx(0.8 * 0.2 * 500 ** 2, rel=0.01)
+    assert samples == 2
+
+
+def test_skip_restarts_the_clock_without_a_sample(client, db):
+    qid = _queue(client, ["Alice", "Bob"])
+    _started(db, qid, 600)
+
+    client.patch(f"/queues/{qid}/skip")
+
+    mean, _, samples = _estimator(db, qid)
+    assert (mean, samples) == (None, 0)
+    clock = db.session.get(Queue, qid).last_completed_at
+    assert datetime.now(timezone.utc).replace(tzinfo=None) - clock < timedelta(seconds=5)
+
+
+def test_bulk_serve_weighs_as_n_samples(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave"])
+    _started(db, qid, 300)
+    client.patch(f"/queues/{qid}/serve")
+
+    _started(db, qid, 180, joined=False)
+    client.patch(f"/queues/{qid}/serve?count=3")
+
+    mean, _, samples = _estimator(db, qid)
+    assert mean == pytest.approx(300 + sample_weight(0.2, 3) * (60 - 300), abs=2)
+    assert samples == 4
+    served = db.session.query(QueueEntry).filter(QueueEntry.served_at.isnot(None)).count()
+    assert served == 4
+
+
+def test_default_rate_until_first_serve(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol"])
+
+    status = client.get(f"/queues/{qid}/status").get_json()
+    summary = client.get(f"/queues/{qid}/summary").get_json()
+    preview = client.get(f"/queues/{qid}/preview").get_json()
+
+    assert status["wait_explanations"]["Carol"].endswith("Estimated wait: ~6 minutes.")
+    assert summary["service_time_seconds"] == 180
+    assert preview["projected_wait_change"] == "~3 minutes faster for remaining"
+
+
+def test_messages_follow_the_measured_rate(client, db):
+    qid = _queue(client, ["Alice", "Bob", "Carol", "Dave"])
+    _started(db, qid, 600)
+    client.patch(f"/queues/{qid}/serve")
+
+    status = client.get(f"/queues/{qid}/status").get_json()
+    summary = client.get(f"/queues/{qid}/summary").get_json()
+    preview = client.get(f"/queues/{qid}/preview").get_json()
+
+    assert status["wait_explanations"]["Carol"].endswith("Estimated wait: ~10 minutes.")
+    assert summary["estimated_wait"].endswith("Estimated wait: ~20 minutes.")
+    assert summary["service_time_seconds"] == pytest.approx(600, abs=2)
+    assert preview["projected_wait_change"] == "~10 minutes faster for remaining"
+
+
+def test_spread_is_shown_once_it_reaches_a_minute():
+    from app.ai.explainer import explain_wait_position
+
+    steady = ServiceRate(120.0, 10.0, 5)
+    noisy = ServiceRate(120.0, 90.0, 5)
+
+    assert explain_wait_position("Bob", 4, steady).endswith("~8 minutes.")
+    assert explain_wait_position("Bob", 4, noisy).endswith("~8 ± 3 minutes.")
+    assert explain_wait_position("Bob", 1, ServiceRate(50.0)).endswith("~1 minute.")
+
+
+def test_estimate_reads_do_not_scan_history(app, client, db, query_counter):
+    qid = _queue(client, ["Alice", "Bob", "Carol"])
+    client.patch(f"/queues/{qid}/serve?count=2")
+    app.extensions["queuewise_cache"].clear()
+
+    with query_counter() as counted:
+        client.get(f"/queues/{qid}/summary")
+        client.get(f"/queues/{qid}/preview")
+
+    # ETag check plus the usual two-query snapshot load; no aggregates
+    assert counted.count == 3
+    assert not any(agg in s.lower() for s in counted.statements for agg in ("count(", "avg(", "max("))
+
+
+def test_serve_updates_estimate_in_the_version_bump(client, db, query_counter):
+    qid = _queue(client, ["Alice", "Bob"])
+
+    with query_counter() as counted:
+        client.patch(f"/queues/{qid}/serve")
+
+    queue_updates = [s for s in counted.statements if s.startswith("UPDATE queues")]
+    assert len(queue_updates) == 1
+    assert "service_time_mean" in queue_updates[0] and "version" in queue_updates[0]
+
+
+def test_archive_keeps_service_stamps(app, client, db):
+    from app.models.queue_entry_archive import QueueEntryArchive
+    from app.retention import run_entry_archival
+
+    qid = _queue(client, ["Alice", "Bob"])
+    client.patch(f"/queues/{qid}/serve")
+    client.patch(f"/queues/{qid}/skip")
+    app.config.update(EVENT_RETENTION_BATCH_PAUSE=0)
+    run_entry_archival(app, now=datetime.now(timezone.utc) + timedelta(days=30))
+
+    archived = {a.user_name: a for a in db.session.query(QueueEntryArchive)}
+    assert archived["Alice"].status == EntryStatus.SERVED and archived["Alice"].served_at is not None
+    assert archived["Bob"].skipped_at is not None
+    history = client.get(f"/queues/{qid}/history").get_json()["entries"]
+    assert history[0]["served_at"] is not None
@@ -0,0 +1,66 @@
+"""Tests for batch wait-time explanations.
+
+Covers:
+  1. explain_all_wait_times matches explain_wait_time per user.
+  2. Non-waiting entries are ignored but do not shift positions.
+  3. Work grows linearly with queue length.
+"""
+
+from app.ai.explainer import explain_all_wait_times, explain_wait_time
+from app.models.queue_entry import EntryStatus
+
+
+class _CountingEntry:
+    """Minimal entry stand-in that counts reads of `status`."""
+
+    reads = 0
+
+    def __init__(self, user_name, status=EntryStatus.WAITING):
+        self.user_name = user_name
+        self._status = status
+
+    @property
+    def status(self):
+        _CountingEntry.reads += 1
+        return self._status
+
+
+def _entries(n):
+    return [_CountingEntry(f"User{i}") for i in range(n)]
+
+
+def test_batch_matches_single_explanations():
+    """Every waiting user gets the same message as the per-user API."""
+    entries = _entries(5)
+    entries[1]._status = EntryStatus.SERVED
+    entries[3]._status = EntryStatus.SKIPPED
+
+    batch = explain_all_wait_times(entries)
+
+    assert set(batch) == {"User0", "User2", "User4"}
+    for name, message in batch.items():
+        assert message == explain_wait_time(entries, name)
+
+
+def test_batch_positions_skip_terminal_entries():
+    """People ahead counts only WAITING entries."""
+    entries = _entries(3)
+    entries[0]._status = EntryStatus.SERVED
+
+    batch = explain_all_wait_times(entries)
+
+    assert "next" in batch["User1"].lower()
+    assert "1 person ahead" in batch["User2"]
+
+
+def test_batch_work_is_linear():
+    """A 10x longer queue costs ~10x the status reads, not ~100x."""
+    _CountingEntry.reads = 0
+    explain_all_wait_times(_entries(200))
+    small = _CountingEntry.reads
+
+    _CountingEntry.reads = 0
+    explain_all_wait_times(_entries(2000))
+    large = _CountingEntry.reads
+
+    assert large == small * 10
@@ -94,19 +94,33 @@ export default function App() {
         }
     }, [showToast]);
 
-    // Poll every 3 seconds when a queue is active
+    // Subscribe to server-pushed updates while a queue is active
     useEffect(() => {
         if (queueId === null) return;
         refreshStatus(queueId);
-        refreshSummary(queueId);
         refreshEvents(queueId);
-        const interval = setInterval(() => {
-            refreshStatus(queueId);
-            refreshSummary(queueId);
-            refreshEvents(queueId);
-        }, 3000);
-        return () => clearInterval(interval);
-    }, [queueId, refreshStatus, refreshSummary, refreshEvents]);
+        // The stream carries the first page of WAITING entries only, so
+        // the full board is refetched (page by page) when it changes
+        return api.subscribeQueue(queueId, {
+            onSnapshot: (data) => {
+                setSummary(data.summary);
+                setIsPaused(data.status.queue_status === "PAUSED");
+                refreshStatus(queueId);
+            },
+            onUpdate: (delta) => {
+                if (delta.status) {
+                    if (delta.status.queue_status) {
+                        setIsPaused(delta.status.queue_status === "PAUSED");
+                    }
+                    refreshStatus(queueId);
+                }
+                if (delta.summary) {
+                    setSummary((prev) => (prev ? { ...prev, ...delta.summary } : prev));
+                }
+                refreshEvents(queueId);
+            },
+        });
+    }, [queueId, refreshStatus, refreshEvents]);
 
     // Load queues when dashboard is shown
     useEffect(() => {
@@ -23,6 +23,8 @@ import type {
     SummaryResponse,
     PreviewResponse,
     EventItem,
+    StreamSnapshot,
+    StreamUpdate,
 } from "./types";
 
 const HEADERS = { "Content-Type": "application/json" };
@@ -67,11 +69,43 @@ export async function createQueue(name: string): Promise<CreateQueueResponse> {
     return data;
 }
 
-export async function getQueueStatus(queueId: number): Promise<ApiResult<QueueStatus>> {
-    const res = await fetch(`/queues/${queueId}/status`);
+async function getStatusPage(
+    queueId: number,
+    status: string,
+    afterPosition = 0,
+): Promise<ApiResult<QueueStatus>> {
+    const res = await fetch(`/queues/${queueId}/status?status=${status}&after_position=${afterPosition}`);
     return handleResponse<QueueStatus>(res);
 }
 
+/**
+ * Every WAITING entry (following next_cursor page by page), then the
+ * first page of SERVED and of SKIPPED entries.
+ *
+ * WHY WAITING is requested explicitly:
+ *   An unfiltered page is the first N entries of any status by
+ *   position, so once N people have been served it holds no one
+ *   who is still waiting.
+ */
+export async function getQueueStatus(queueId: number): Promise<ApiResult<QueueStatus>> {
+    const first = await getStatusPage(queueId, "WAITING");
+    const status = { ...first.data, entries: [...first.data.entries] };
+    let cursor = first.data.next_cursor;
+    while (cursor !== null) {
+        const { data } = await getStatusPage(queueId, "WAITING", cursor);
+        status.entries.push(...data.entries);
+        status.wait_explanations = { ...status.wait_explanations, ...data.wait_explanations };
+        cursor = data.next_cursor;
+    }
+    const [served, skipped] = await Promise.all([
+        getStatusPage(queueId, "SERVED"),
+        getStatusPage(queueId, "SKIPPED"),
+    ]);
+    status.entries.push(...served.data.entries, ...skipped.data.entries);
+    status.next_cursor = null;
+    return { ...first, data: status };
+}
+
 // --- Actions (with dry-run and request-ID capture) ---
 
 export async function joinQueue(
@@ -149,6 +183,33 @@ export async function getEvents(queueId: number, limit: number = 20): Promise<Ev
     return data;
 }
 
+// --- Live updates (Server-Sent Events) ---
+
+/**
+ * Subscribe to GET /queues/{id}/stream.
+ *
+ * The server sends a full snapshot on connect and then only the fields
+ * that changed after each successful action. EventSource reconnects on
+ * its own and replays Last-Event-ID, so a reconnect without missed
+ * changes does not resend the snapshot. Returns an unsubscribe function.
+ */
+export function subscribeQueue(
+    queueId: number,
+    handlers: {
+        onSnapshot: (data: StreamSnapshot) => void;
+        onUpdate: (data: StreamUpdate) => void;
+    },
+): () => void {
+    const source = new EventSource(`/queues/${queueId}/stream`);
+    source.addEventListener("snapshot", (e) => {
+        handlers.onSnapshot(JSON.parse((e as MessageEvent).data));
+    });
+    source.addEventListener("update", (e) => {
+        handlers.onUpdate(JSON.parse((e as MessageEvent).data));
+    });
+    return () => source.close();
+}
+
 // --- Pause / Resume ---
 
 export async function pauseQueue(queueId: number): Promise<ApiResult<{ queue_id: number; status: string }>> {
@@ -13,6 +13,8 @@ export interface QueueStatus {
     queue_name: string;
     queue_status: string;
     entries: QueueEntry[];
+    /** Pass as ?after_position= to fetch the next page; null on the last page. */
+    next_cursor: number | null;
     explanation: string;
     wait_explanations: Record<string, string>;
 }
@@ -38,6 +40,18 @@ export interface SummaryResponse {
     explanation: string;
 }
 
+/** Full payload pushed on connect by GET /queues/{id}/stream. */
+export interface StreamSnapshot {
+    status: QueueStatus;
+    summary: SummaryResponse;
+}
+
+/** Changed fields pushed by GET /queues/{id}/stream after each action. */
+export interface StreamUpdate {
+    status?: Partial<QueueStatus>;
+    summary?: Partial<SummaryResponse>;
+}
+
 /** Preview response (GET /queues/{id}/preview). */
 export interface PreviewResponse {
     next_if_served: string;